@@ -0,0 +1,54 @@
+"""add_collection_versions
+
+Revision ID: 0e2895d72cdb
+Revises: da0502e11e95
+Create Date: 2026-01-09 14:03:21.618405
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0e2895d72cdb'
+down_revision: Union[str, Sequence[str], None] = 'da0502e11e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('collection_versions',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO collection_versions (name) VALUES ('inbox_items'), ('matters')")
+    op.execute("""
+        CREATE FUNCTION bump_collection_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE collection_versions SET version = version + 1 WHERE name = TG_ARGV[0];
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        "CREATE TRIGGER inbox_items_bump_inbox_items_version "
+        "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON inbox_items "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version('inbox_items')"
+    )
+    op.execute(
+        "CREATE TRIGGER matters_bump_matters_version "
+        "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON matters "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version('matters')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER matters_bump_matters_version ON matters")
+    op.execute("DROP TRIGGER inbox_items_bump_inbox_items_version ON inbox_items")
+    op.execute("DROP FUNCTION bump_collection_version()")
+    op.drop_table('collection_versions')
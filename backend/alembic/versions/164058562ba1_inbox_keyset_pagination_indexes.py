@@ -0,0 +1,31 @@
+"""inbox_keyset_pagination_indexes
+
+Revision ID: 164058562ba1
+Revises: 9af3bd62cdfd
+Create Date: 2025-12-18 16:22:47.190384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '164058562ba1'
+down_revision: Union[str, Sequence[str], None] = '9af3bd62cdfd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # GET /inbox orders by (created_at, id) and filters by status
+    op.create_index('ix_inbox_items_created_at_id', 'inbox_items', ['created_at', 'id'])
+    op.create_index('ix_inbox_items_status_created_at_id', 'inbox_items', ['status', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_inbox_items_status_created_at_id', table_name='inbox_items')
+    op.drop_index('ix_inbox_items_created_at_id', table_name='inbox_items')
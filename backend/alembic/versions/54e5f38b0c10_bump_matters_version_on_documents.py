@@ -0,0 +1,31 @@
+"""bump_matters_version_on_documents
+
+Revision ID: 54e5f38b0c10
+Revises: 0e2895d72cdb
+Create Date: 2026-01-09 15:27:48.204719
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '54e5f38b0c10'
+down_revision: Union[str, Sequence[str], None] = '0e2895d72cdb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE TRIGGER documents_bump_matters_version "
+        "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON documents "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version('matters')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER documents_bump_matters_version ON documents")
@@ -0,0 +1,38 @@
+"""add_row_versions
+
+Revision ID: 5c447a226b91
+Revises: 84d9259a66a4
+Create Date: 2026-01-06 16:41:27.330918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c447a226b91'
+down_revision: Union[str, Sequence[str], None] = '84d9259a66a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('inbox_items', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.execute("UPDATE inbox_items SET updated_at = created_at")
+    op.add_column('inbox_items', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.create_index('ix_inbox_items_updated_at', 'inbox_items', ['updated_at'])
+
+    op.add_column('matters', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.create_index('ix_matters_updated_at', 'matters', ['updated_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_matters_updated_at', table_name='matters')
+    op.drop_column('matters', 'version')
+    op.drop_index('ix_inbox_items_updated_at', table_name='inbox_items')
+    op.drop_column('inbox_items', 'version')
+    op.drop_column('inbox_items', 'updated_at')
@@ -0,0 +1,40 @@
+"""add_documents_full_text_search
+
+Revision ID: 74dbcb9eafe3
+Revises: 96b6c6edbea5
+Create Date: 2025-12-27 10:12:44.208731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '74dbcb9eafe3'
+down_revision: Union[str, Sequence[str], None] = '96b6c6edbea5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column(
+        'content_tsv',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(content_text, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('ix_documents_content_tsv', 'documents', ['content_tsv'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_content_tsv', table_name='documents')
+    op.drop_column('documents', 'content_tsv')
@@ -0,0 +1,37 @@
+"""add_inbox_events
+
+Revision ID: 84d9259a66a4
+Revises: cf8cc8c6ab10
+Create Date: 2026-01-03 11:26:09.513842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '84d9259a66a4'
+down_revision: Union[str, Sequence[str], None] = 'cf8cc8c6ab10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('inbox_events',
+        sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        sa.Column('item_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_inbox_events_created_at', 'inbox_events', ['created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_inbox_events_created_at', table_name='inbox_events')
+    op.drop_table('inbox_events')
@@ -0,0 +1,34 @@
+"""index_matter_attributes
+
+Revision ID: 86b21c3736d8
+Revises: 164058562ba1
+Create Date: 2025-12-19 11:05:14.862003
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '86b21c3736d8'
+down_revision: Union[str, Sequence[str], None] = '164058562ba1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # attributes is already JSONB; the GIN index serves @> and ? filters
+    op.create_index('ix_matters_attributes', 'matters', ['attributes'], postgresql_using='gin')
+    # GET /matters orders by (created_at, id), optionally filtered by category
+    op.create_index('ix_matters_created_at_id', 'matters', ['created_at', 'id'])
+    op.create_index('ix_matters_category_created_at_id', 'matters', ['category', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_matters_category_created_at_id', table_name='matters')
+    op.drop_index('ix_matters_created_at_id', table_name='matters')
+    op.drop_index('ix_matters_attributes', table_name='matters')
@@ -0,0 +1,44 @@
+"""add_vector_search_indexes
+
+Revision ID: 96b6c6edbea5
+Revises: 75e2631d7ed7
+Create Date: 2025-12-23 15:30:18.664390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '96b6c6edbea5'
+down_revision: Union[str, Sequence[str], None] = '75e2631d7ed7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # HNSW over cosine distance; recall is tuned per query with hnsw.ef_search
+    op.create_index(
+        'ix_document_chunks_embedding_hnsw', 'document_chunks', ['embedding'],
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_cosine_ops'},
+    )
+    op.create_index(
+        'ix_documents_content_embedding_hnsw', 'documents', ['content_embedding'],
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'content_embedding': 'vector_cosine_ops'},
+    )
+    # Matter pre-filters join documents on matter_id
+    op.create_index('ix_documents_matter_id', 'documents', ['matter_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_matter_id', table_name='documents')
+    op.drop_index('ix_documents_content_embedding_hnsw', table_name='documents')
+    op.drop_index('ix_document_chunks_embedding_hnsw', table_name='document_chunks')
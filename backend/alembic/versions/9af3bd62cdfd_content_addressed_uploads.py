@@ -0,0 +1,34 @@
+"""content_addressed_uploads
+
+Revision ID: 9af3bd62cdfd
+Revises: d129d07888e9
+Create Date: 2025-12-17 10:41:09.553811
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9af3bd62cdfd'
+down_revision: Union[str, Sequence[str], None] = 'd129d07888e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing UUID-named uploads keep a NULL hash and are never deduplicated
+    op.add_column('inbox_items', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_inbox_items_content_hash', 'inbox_items', ['content_hash'])
+    # Reference counting looks up items by file path
+    op.create_index('ix_inbox_items_file_path', 'inbox_items', ['file_path'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_inbox_items_file_path', table_name='inbox_items')
+    op.drop_index('ix_inbox_items_content_hash', table_name='inbox_items')
+    op.drop_column('inbox_items', 'content_hash')
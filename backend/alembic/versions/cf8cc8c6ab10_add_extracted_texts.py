@@ -0,0 +1,46 @@
+"""add_extracted_texts
+
+Revision ID: cf8cc8c6ab10
+Revises: 74dbcb9eafe3
+Create Date: 2025-12-29 14:03:51.927104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cf8cc8c6ab10'
+down_revision: Union[str, Sequence[str], None] = '74dbcb9eafe3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('extracted_texts',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('compression', sa.String(), nullable=False),
+        sa.Column('page_count', sa.Integer(), nullable=False),
+        sa.Column('char_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('content_hash')
+    )
+    op.add_column('documents', sa.Column('source_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_documents_source_hash', 'documents', ['source_hash'])
+    op.create_foreign_key(
+        'fk_documents_source_hash_extracted_texts', 'documents', 'extracted_texts',
+        ['source_hash'], ['content_hash'], ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_documents_source_hash_extracted_texts', 'documents', type_='foreignkey')
+    op.drop_index('ix_documents_source_hash', table_name='documents')
+    op.drop_column('documents', 'source_hash')
+    op.drop_table('extracted_texts')
@@ -0,0 +1,29 @@
+"""add_inbox_item_timings
+
+Revision ID: da0502e11e95
+Revises: 5c447a226b91
+Create Date: 2026-01-08 10:12:54.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'da0502e11e95'
+down_revision: Union[str, Sequence[str], None] = '5c447a226b91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('inbox_items', sa.Column('timings', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('inbox_items', 'timings')
@@ -1,7 +1,13 @@
 from fastapi import APIRouter
 from .endpoints.inbox import router as inbox_router
 from .endpoints.matters import router as matters_router
+from .endpoints.search import router as search_router
+from .endpoints.health import router as health_router
+from .endpoints.metrics import router as metrics_router
 
 api_router = APIRouter()
 api_router.include_router(inbox_router, tags=["inbox"])
-api_router.include_router(matters_router, prefix="/matters", tags=["matters"])
\ No newline at end of file
+api_router.include_router(matters_router, prefix="/matters", tags=["matters"])
+api_router.include_router(search_router, prefix="/search", tags=["search"])
+api_router.include_router(health_router, prefix="/health", tags=["health"])
+api_router.include_router(metrics_router, tags=["metrics"])
\ No newline at end of file
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from app.core.database import engine
+from app.core.pool import pool_status
+
+router = APIRouter()
+
+@router.get("/pool")
+async def get_pool_status():
+    """Connection pool statistics of this process.
+
+    Counts are per process; with several uvicorn workers each reports its own pool.
+    """
+    return pool_status(engine.pool)
\ No newline at end of file
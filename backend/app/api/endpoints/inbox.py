@@ -1,105 +1,375 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request, Response, Query, Header, Path
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.core.database import get_db
+from sqlalchemy import select, func
+from app.core.database import get_db, async_session
 from app.models.inbox import InboxItem
-from app.services.storage import LocalStorage
+from app.services.storage import LocalStorage, UploadTooLarge
 from app.services.extraction import DocumentExtractionService
-from app.schemas.inbox import InboxItemResponse
+from app.services.ocr import OcrError
+from app.services.previews import PreviewService
+from app.services.queue import JobQueue
+from app.services.text_store import load_pages, save_pages
+from app.services.events import inbox_event_broker, publish_inbox_event, stream_inbox_events
+from app.schemas.inbox import InboxItemResponse, InboxItemSummary, InboxStatus
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page, next_cursor
+from app.core.etag import collection_version, etag_matches, make_etag, not_modified, set_etag
+from app.core.static import IMMUTABLE_CACHE_CONTROL
+from app.core.metrics import UPLOAD_BYTES, observe_stage
+from app.core.tracing import trace_id_for, tracer
+from app.core.profiling import profile_token_valid
+from datetime import datetime, timezone
+from typing import Optional
+import uuid
 import logging
 
 router = APIRouter()
 storage = LocalStorage()
 extraction_service = DocumentExtractionService()
+preview_service = PreviewService()
+job_queue = JobQueue()
 
 logger = logging.getLogger(__name__)
 
-@router.get("/inbox", response_model=list[InboxItemResponse])
-async def get_inbox_items(db: AsyncSession = Depends(get_db)):
-    """Get all inbox items"""
+@router.get("/inbox", response_model=list[InboxItemSummary])
+async def get_inbox_items(
+    request: Request,
+    response: Response,
+    status: Optional[list[InboxStatus]] = Query(None),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a page of inbox items, newest first.
+
+    The list leaves out ``ai_payload``; fetch ``/inbox/{item_id}`` for the
+    full item. When more items exist, the ``X-Next-Cursor`` response header
+    holds the cursor for the next page. Responses carry an ``ETag``; a
+    matching ``If-None-Match`` gets an empty 304 without loading the page.
+    """
+    filters = []
+    if status:
+        filters.append(InboxItem.status.in_(status))
+    if created_after:
+        filters.append(InboxItem.created_at >= created_after)
+    if created_before:
+        filters.append(InboxItem.created_at < created_before)
+
+    etag = make_etag("inbox", request.url.query, *await collection_version(db, "inbox_items", InboxItem))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    query = select(
+        InboxItem.id,
+        InboxItem.original_filename,
+        InboxItem.file_path,
+        InboxItem.status,
+        InboxItem.created_at,
+    ).where(*filters)
+
     result = await db.execute(
-        select(InboxItem).order_by(InboxItem.created_at.desc())
+        keyset_page(query, InboxItem.created_at, InboxItem.id, cursor=cursor, limit=limit)
+    )
+    rows, cursor = next_cursor(result.all(), limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    return [InboxItemSummary.model_validate(row) for row in rows]
+
+@router.get("/inbox/events")
+async def inbox_events(
+    last_event_id: Optional[int] = Query(None, ge=0),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """Stream inbox status changes as server-sent events.
+
+    Browsers resend ``Last-Event-ID`` when they reconnect and receive the
+    changes they missed; ``last_event_id`` does the same for a first
+    connection. Without either, only changes from now on are sent.
+    """
+    if last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+    return StreamingResponse(
+        stream_inbox_events(inbox_event_broker, async_session, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    items = result.scalars().all()
-    return [InboxItemResponse.from_orm(item) for item in items]
 
 @router.get("/inbox/{item_id}", response_model=InboxItemResponse)
-async def get_inbox_item(item_id: str, db: AsyncSession = Depends(get_db)):
-    """Get a specific inbox item"""
+async def get_inbox_item(item_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    """Get a specific inbox item; revalidate with ``If-None-Match`` to skip the payload"""
+    result = await db.execute(
+        select(InboxItem.version, InboxItem.updated_at).where(InboxItem.id == item_id)
+    )
+    current = result.first()
+    if current is None:
+        raise HTTPException(status_code=404, detail="Inbox item not found")
+    etag = make_etag("inbox-item", item_id, current.version, current.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     inbox_item = await db.get(InboxItem, item_id)
     if not inbox_item:
         raise HTTPException(status_code=404, detail="Inbox item not found")
+    set_etag(response, etag)
     return InboxItemResponse.from_orm(inbox_item)
 
+@router.get("/inbox/{item_id}/pages/{page}/thumbnail", response_class=FileResponse)
+async def get_page_thumbnail(item_id: str, page: int = Path(..., ge=1), db: AsyncSession = Depends(get_db)):
+    """Low-resolution JPEG of a one-based PDF page.
+
+    Thumbnails are rendered in the background after processing; a page that
+    is not cached yet is rendered on demand.
+    """
+    result = await db.execute(
+        select(InboxItem.file_path, InboxItem.content_hash).where(InboxItem.id == item_id)
+    )
+    item = result.first()
+    if item is None:
+        raise HTTPException(status_code=404, detail="Inbox item not found")
+    if not item.content_hash or not item.file_path.lower().endswith(".pdf"):
+        raise HTTPException(status_code=404, detail="Inbox item has no page previews")
+
+    thumbnail = preview_service.thumbnail_path(item.content_hash, page)
+    if not thumbnail.exists():
+        if not preview_service.available:
+            raise HTTPException(status_code=503, detail="Page previews are not available")
+        try:
+            thumbnail = await preview_service.render_thumbnail(
+                str(storage.resolve(item.file_path)), item.content_hash, page
+            )
+        except OcrError:
+            # pdftoppm fails for pages past the end of the document
+            raise HTTPException(status_code=404, detail="Page not found")
+
+    return FileResponse(thumbnail, media_type="image/jpeg", headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL})
+
+async def lock_file_path(db: AsyncSession, file_path: str) -> None:
+    """Serialize uploads and deletions of the same blob until the transaction ends"""
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(file_path))))
+
+async def release_file(db: AsyncSession, file_path: str) -> None:
+    """Delete a stored blob once no inbox item references it; commits the session"""
+    await lock_file_path(db, file_path)
+    references = await db.scalar(
+        select(func.count()).select_from(InboxItem).where(InboxItem.file_path == file_path)
+    )
+    if references == 0:
+        await storage.delete(file_path)
+    await db.commit()
+
 @router.post("/inbox/upload", response_model=InboxItemResponse)
 async def upload_file(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db)
 ):
-    """Upload a file and create an inbox item for processing"""
-    try:
-        # Save file to storage
-        file_path = await storage.save_file(file)
-        
-        # Create database entry
-        inbox_item = InboxItem(
-            original_filename=file.filename,
-            file_path=file_path,
-            status="processing"
-        )
-        
-        db.add(inbox_item)
-        await db.commit()
-        await db.refresh(inbox_item)
-        
-        # Add background task for document processing
-        background_tasks.add_task(
-            process_inbox_item,
-            inbox_item.id,
-            file_path
-        )
-        
-        return InboxItemResponse.from_orm(inbox_item)
-        
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Upload failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
-
-async def process_inbox_item(item_id: str, file_path: str):
-    """Background task to process uploaded document"""
-    try:
-        logger.info(f"Starting processing for item {item_id}")
-
-        # Extract text from PDF
-        text = await extraction_service.extract_text(file_path)
-
-        # Analyze with LLM
-        analysis_result = await extraction_service.analyze_with_llm(text)
-
-        # Update database with results
-        from app.core.database import async_session
-        async with async_session() as session:
-            inbox_item = await session.get(InboxItem, item_id)
-            if inbox_item:
-                inbox_item.ai_payload = analysis_result
+    """Upload a file and create an inbox item for processing.
+
+    Files are stored by content hash. Re-uploading a document that has
+    already been analyzed links to the existing blob and reuses its analysis
+    instead of running the pipeline again.
+    """
+    staged = None
+    stored = None
+    item_id = uuid.uuid4()
+    # The item id is chosen up front so the whole upload belongs to the item's trace
+    with tracer.span("upload_file", trace_id=trace_id_for(item_id), filename=file.filename):
+        try:
+            with observe_stage("upload") as upload_span:
+                # Stream file to a staging area while hashing it
+                staged = await storage.stage(file)
+                file_path = storage.blob_path(staged.sha256, staged.extension)
+
+                await lock_file_path(db, file_path)
+                stored = await storage.commit(staged)
+            UPLOAD_BYTES.labels(str(stored.deduplicated).lower()).inc(stored.size)
+
+            previous = None
+            if stored.deduplicated:
+                result = await db.execute(
+                    select(InboxItem)
+                    .where(
+                        InboxItem.content_hash == stored.sha256,
+                        InboxItem.status.in_(("review", "done")),
+                        InboxItem.ai_payload.isnot(None),
+                    )
+                    .order_by(InboxItem.created_at.desc())
+                    .limit(1)
+                )
+                previous = result.scalars().first()
+
+            # Create database entry
+            inbox_item = InboxItem(
+                id=item_id,
+                original_filename=file.filename,
+                file_path=stored.filename,
+                content_hash=stored.sha256,
+                status="processing",
+                timings={"upload_ms": round(upload_span.duration_ms, 1)},
+            )
+            if previous is not None:
+                logger.info(f"Upload duplicates inbox item {previous.id}; reusing its analysis")
                 inbox_item.status = "review"
-                await session.commit()
-                logger.info(f"Successfully processed item {item_id}")
-            else:
-                logger.error(f"Inbox item {item_id} not found")
-
-    except Exception as e:
-        logger.error(f"Processing failed for item {item_id}: {str(e)}")
-        # Update status to error in database
+                inbox_item.ai_payload = dict(previous.ai_payload)
+
+            db.add(inbox_item)
+            await db.flush()
+            await publish_inbox_event(db, inbox_item.id, inbox_item.status)
+
+            if previous is None:
+                # Queue document processing in the same transaction as the item
+                await job_queue.enqueue(
+                    db,
+                    "process_inbox_item",
+                    {"item_id": str(inbox_item.id), "file_path": stored.filename}
+                )
+
+            await db.commit()
+            await db.refresh(inbox_item)
+
+            return InboxItemResponse.from_orm(inbox_item)
+
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except Exception as e:
+            await db.rollback()
+            if stored is not None:
+                await release_file(db, stored.filename)
+            elif staged is not None:
+                await storage.discard(staged)
+            logger.error(f"Upload failed: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+@router.delete("/inbox/{item_id}", status_code=204)
+async def delete_inbox_item(item_id: str, db: AsyncSession = Depends(get_db)):
+    """Discard an inbox item; its file is removed once nothing else references it"""
+    inbox_item = await db.get(InboxItem, item_id)
+    if not inbox_item:
+        raise HTTPException(status_code=404, detail="Inbox item not found")
+    if inbox_item.status == "done":
+        raise HTTPException(status_code=409, detail="Inbox item has already been filed")
+
+    file_path = inbox_item.file_path
+    await publish_inbox_event(db, inbox_item.id, "deleted")
+    await db.delete(inbox_item)
+    await db.flush()
+    await release_file(db, file_path)
+
+    return Response(status_code=204)
+
+@router.post("/inbox/{item_id}/reprocess", response_model=InboxItemResponse)
+async def reprocess_inbox_item(
+    item_id: str,
+    force: bool = False,
+    profile: bool = False,
+    x_profile: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Run the processing pipeline again; ``force`` ignores cached LLM analyses.
+
+    ``profile`` profiles the processing job; it needs the admin ``X-Profile`` token.
+    """
+    inbox_item = await db.get(InboxItem, item_id)
+    if not inbox_item:
+        raise HTTPException(status_code=404, detail="Inbox item not found")
+    if inbox_item.status == "done":
+        raise HTTPException(status_code=409, detail="Inbox item has already been filed")
+
+    if profile and not profile_token_valid(x_profile):
+        raise HTTPException(status_code=403, detail="Profiling requires a valid X-Profile token")
+
+    inbox_item.status = "processing"
+    await publish_inbox_event(db, inbox_item.id, inbox_item.status)
+    payload = {"item_id": str(inbox_item.id), "file_path": inbox_item.file_path, "force": force}
+    if profile:
+        payload["profile"] = True
+    await job_queue.enqueue(db, "process_inbox_item", payload)
+    await db.commit()
+    await db.refresh(inbox_item)
+
+    return InboxItemResponse.from_orm(inbox_item)
+
+def stage_timings(inbox_item: InboxItem, pages: list[str], timings: dict) -> dict:
+    """Per-stage summary stored on the item; replaces the figures of earlier runs"""
+    summary = {"upload_ms": (inbox_item.timings or {}).get("upload_ms"), "pages": len(pages), **timings}
+    summary["to_review_ms"] = round((datetime.now(timezone.utc) - inbox_item.created_at).total_seconds() * 1000, 1)
+    return summary
+
+async def process_inbox_item(item_id: str, file_path: str, final_attempt: bool = True, force: bool = False):
+    """Process an uploaded document; run by the job worker.
+
+    When ``final_attempt`` is False, failures are re-raised so the job queue can
+    retry, and the item stays in ``processing``. Text extracted earlier from
+    the same file is reused; ``force`` re-extracts it and bypasses the LLM
+    analysis cache. Each run is traced under the item's trace id, and a
+    successful one stores its stage durations in ``timings``.
+    """
+    with tracer.span(
+        "process_inbox_item", trace_id=trace_id_for(item_id), force=force, final_attempt=final_attempt
+    ) as root:
         try:
-            from app.core.database import async_session
+            logger.info(f"Starting processing for item {item_id}")
+
+            timings = {}
+            pages = None
             async with async_session() as session:
                 inbox_item = await session.get(InboxItem, item_id)
-                if inbox_item:
-                    inbox_item.status = "error"
-                    inbox_item.ai_payload = {"error": str(e)}
-                    await session.commit()
-        except Exception as db_error:
-            logger.error(f"Failed to update error status for item {item_id}: {str(db_error)}")
\ No newline at end of file
+                content_hash = inbox_item.content_hash if inbox_item else None
+                if content_hash and not force:
+                    pages = await load_pages(session, content_hash)
+
+            if pages is None:
+                # Extract text from PDF, page by page, and keep it for reuse
+                with observe_stage("extract") as span:
+                    pages = await extraction_service.extract_pages(str(storage.resolve(file_path)), content_hash)
+                    span.set_attribute("pages", len(pages))
+                timings["extract_ms"] = round(span.duration_ms, 1)
+                if content_hash:
+                    async with async_session() as session:
+                        await save_pages(session, content_hash, pages)
+                        await session.commit()
+
+            # Analyze with LLM
+            with observe_stage("analyze") as span:
+                analysis_result = await extraction_service.analyze_with_llm(pages, force=force)
+            timings["analyze_ms"] = round(span.duration_ms, 1)
+
+            # Update database with results
+            with observe_stage("persist"):
+                async with async_session() as session:
+                    inbox_item = await session.get(InboxItem, item_id)
+                    if inbox_item:
+                        inbox_item.ai_payload = analysis_result
+                        inbox_item.status = "review"
+                        inbox_item.timings = stage_timings(inbox_item, pages, timings)
+                        await publish_inbox_event(session, inbox_item.id, inbox_item.status)
+                        if content_hash and file_path.lower().endswith(".pdf"):
+                            await job_queue.enqueue(
+                                session,
+                                "render_previews",
+                                {"file_path": file_path, "content_hash": content_hash, "page_count": len(pages)}
+                            )
+                        await session.commit()
+                        logger.info(f"Successfully processed item {item_id}")
+                    else:
+                        logger.error(f"Inbox item {item_id} not found")
+
+        except Exception as e:
+            logger.error(f"Processing failed for item {item_id}: {str(e)}")
+            root.status = "error"
+            root.error = f"{type(e).__name__}: {e}"
+            if not final_attempt:
+                raise
+            # Update status to error in database
+            try:
+                async with async_session() as session:
+                    inbox_item = await session.get(InboxItem, item_id)
+                    if inbox_item:
+                        inbox_item.status = "error"
+                        inbox_item.ai_payload = {"error": str(e)}
+                        await publish_inbox_event(session, inbox_item.id, inbox_item.status)
+                        await session.commit()
+            except Exception as db_error:
+                logger.error(f"Failed to update error status for item {item_id}: {str(db_error)}")
\ No newline at end of file
@@ -1,13 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import selectinload
 from app.core.database import get_db
 from app.models.matters import Matter
 from app.models.documents import Document
 from app.models.inbox import InboxItem
-from app.schemas.matters import MatterCreate, MatterResponse
+from app.services.queue import JobQueue
+from app.services.text_store import load_pages, load_pages_many, join_pages
+from app.services.events import publish_inbox_event, publish_inbox_events
+from app.schemas.matters import (
+    BulkTriageRequest, BulkTriageResponse, MatterCreate, MatterDetail, MatterResponse, MatterStatus, TriageResult
+)
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page, next_cursor
+from app.core.etag import collection_version, etag_matches, make_etag, not_modified, set_etag
+from typing import Optional
+from uuid import UUID
+import json
+import uuid
 
 router = APIRouter()
+job_queue = JobQueue()
+
+def document_fields(inbox_item, pages: Optional[list[str]]) -> dict:
+    """Column values of the document filed from an inbox item and its extracted pages"""
+    return {
+        "title": inbox_item.original_filename,
+        "source_hash": inbox_item.content_hash if pages is not None else None,
+        "content_text": join_pages(pages) if pages else None,
+    }
+
+async def document_from_inbox_item(db: AsyncSession, matter_id, inbox_item: InboxItem) -> Document:
+    """Build the document for an inbox item from its stored extracted text"""
+    pages = await load_pages(db, inbox_item.content_hash) if inbox_item.content_hash else None
+    return Document(matter_id=matter_id, **document_fields(inbox_item, pages))
+
+async def document_stats(db: AsyncSession, matter_ids) -> dict:
+    """``(document count, latest document time)`` per matter, in one grouped query"""
+    if not matter_ids:
+        return {}
+    result = await db.execute(
+        select(Document.matter_id, func.count(), func.max(Document.created_at))
+        .where(Document.matter_id.in_(matter_ids))
+        .group_by(Document.matter_id)
+    )
+    return {matter_id: (count, last_document_at) for matter_id, count, last_document_at in result.all()}
+
+def matter_response(schema, matter: Matter, document_count: int, last_document_at):
+    """Matter response with its document count and latest activity"""
+    return schema.model_validate(matter).model_copy(update={
+        "document_count": document_count,
+        "last_activity_at": max(filter(None, (matter.updated_at, last_document_at)), default=None),
+    })
+
+async def lock_inbox_items(db: AsyncSession, item_ids, *columns) -> dict:
+    """Lock inbox items for filing, keyed by id.
+
+    Every endpoint that files items takes these row locks first, in id
+    order, so concurrent or overlapping requests cannot file an item twice
+    or deadlock. ``columns`` selects just those columns instead of items.
+    """
+    query = select(*columns) if columns else select(InboxItem)
+    result = await db.execute(
+        query.where(InboxItem.id.in_(set(item_ids)))
+        .order_by(InboxItem.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    rows = result.all() if columns else result.scalars().all()
+    return {row.id: row for row in rows}
+
+def filing_error(item) -> Optional[str]:
+    """Why a locked inbox item cannot be filed, if it cannot"""
+    if item.status == "done":
+        return "Inbox item has already been filed"
+    if item.status == "processing":
+        return "Inbox item is still being processed"
+    return None
+
+async def lock_inbox_item_for_filing(db: AsyncSession, inbox_item_id) -> InboxItem:
+    """Lock one inbox item, raising 404 or 409 when it cannot be filed"""
+    inbox_item = next(iter((await lock_inbox_items(db, [inbox_item_id])).values()), None)
+    if not inbox_item:
+        raise HTTPException(status_code=404, detail="Inbox item not found")
+    error = filing_error(inbox_item)
+    if error:
+        raise HTTPException(status_code=409, detail=error)
+    return inbox_item
+
+async def enqueue_embedding(db: AsyncSession, document: Document) -> None:
+    """Queue embedding of a new document in the caller's transaction"""
+    await db.flush()
+    await job_queue.enqueue(db, "embed_documents", {"document_ids": [str(document.id)]})
 
 @router.post("/", response_model=MatterResponse)
 async def create_matter(
@@ -16,10 +100,7 @@ async def create_matter(
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new matter and archive the inbox item as a document"""
-    # Get the inbox item
-    inbox_item = await db.get(InboxItem, inbox_item_id)
-    if not inbox_item:
-        raise HTTPException(status_code=404, detail="Inbox item not found")
+    inbox_item = await lock_inbox_item_for_filing(db, inbox_item_id)
 
     # Create the matter
     matter = Matter(
@@ -28,23 +109,93 @@ async def create_matter(
         attributes=matter_data.attributes
     )
     db.add(matter)
-    await db.commit()
-    await db.refresh(matter)
+    await db.flush()
 
     # Create document from inbox item
-    document = Document(
-        matter_id=matter.id,
-        title=inbox_item.original_filename,
-        content_text=str(inbox_item.ai_payload) if inbox_item.ai_payload else None
-    )
+    document = await document_from_inbox_item(db, matter.id, inbox_item)
     db.add(document)
+    await enqueue_embedding(db, document)
 
     # Archive the inbox item
     inbox_item.status = "done"
+    await publish_inbox_event(db, inbox_item.id, inbox_item.status)
 
     await db.commit()
 
-    return MatterResponse.from_orm(matter)
+    return matter_response(MatterResponse, matter, 1, None)
+
+@router.post("/triage", response_model=BulkTriageResponse)
+async def bulk_triage(triage: BulkTriageRequest, db: AsyncSession = Depends(get_db)):
+    """File many inbox items in one transaction.
+
+    Each decision creates a new matter for its inbox item or attaches the
+    item to an existing matter. The inbox items are locked first, so
+    concurrent requests cannot file the same item twice. Decisions that
+    cannot be applied are rejected individually; the rest are filed.
+    """
+    items = await lock_inbox_items(
+        db,
+        (decision.inbox_item_id for decision in triage.decisions),
+        InboxItem.id, InboxItem.status, InboxItem.original_filename, InboxItem.content_hash,
+    )
+
+    attach_ids = {decision.matter_id for decision in triage.decisions if decision.action == "attach"}
+    existing_matters = set()
+    if attach_ids:
+        existing_matters = set(await db.scalars(select(Matter.id).where(Matter.id.in_(attach_ids))))
+    pages = await load_pages_many(db, (item.content_hash for item in items.values()))
+
+    results = []
+    matters = []
+    documents = []
+    filed = []
+    for decision in triage.decisions:
+        item = items.get(decision.inbox_item_id)
+        if item is None:
+            error = "Inbox item not found"
+        elif item.id in filed:
+            error = "Inbox item appears more than once"
+        else:
+            error = filing_error(item)
+            if not error and decision.action == "attach" and decision.matter_id not in existing_matters:
+                error = "Matter not found"
+        if error:
+            results.append(TriageResult(inbox_item_id=decision.inbox_item_id, status="rejected", error=error))
+            continue
+
+        if decision.action == "create":
+            matter_id = uuid.uuid4()
+            matters.append({
+                "id": matter_id,
+                "title": decision.matter.title,
+                "category": decision.matter.category,
+                "attributes": decision.matter.attributes,
+            })
+        else:
+            matter_id = decision.matter_id
+        document_id = uuid.uuid4()
+        documents.append({
+            "id": document_id,
+            "matter_id": matter_id,
+            **document_fields(item, pages.get(item.content_hash)),
+        })
+        filed.append(item.id)
+        results.append(TriageResult(
+            inbox_item_id=item.id, status="filed", matter_id=matter_id, document_id=document_id
+        ))
+
+    if matters:
+        await db.execute(insert(Matter), matters)
+    if documents:
+        await db.execute(insert(Document), documents)
+        await db.execute(update(InboxItem).where(InboxItem.id.in_(filed)).values(status="done"))
+        await publish_inbox_events(db, [(item_id, "done") for item_id in filed])
+        await job_queue.enqueue(
+            db, "embed_documents", {"document_ids": [str(document["id"]) for document in documents]}
+        )
+    await db.commit()
+
+    return BulkTriageResponse(filed=len(filed), rejected=len(results) - len(filed), results=results)
 
 @router.post("/{matter_id}/documents")
 async def attach_document_to_matter(
@@ -58,31 +209,91 @@ async def attach_document_to_matter(
     if not matter:
         raise HTTPException(status_code=404, detail="Matter not found")
 
-    # Get the inbox item
-    inbox_item = await db.get(InboxItem, inbox_item_id)
-    if not inbox_item:
-        raise HTTPException(status_code=404, detail="Inbox item not found")
+    inbox_item = await lock_inbox_item_for_filing(db, inbox_item_id)
 
     # Create document
-    document = Document(
-        matter_id=matter.id,
-        title=inbox_item.original_filename,
-        content_text=str(inbox_item.ai_payload) if inbox_item.ai_payload else None
-    )
+    document = await document_from_inbox_item(db, matter.id, inbox_item)
     db.add(document)
+    await enqueue_embedding(db, document)
 
     # Archive the inbox item
     inbox_item.status = "done"
+    await publish_inbox_event(db, inbox_item.id, inbox_item.status)
 
     await db.commit()
 
     return {"message": "Document attached successfully"}
 
 @router.get("/", response_model=list[MatterResponse])
-async def get_matters(db: AsyncSession = Depends(get_db)):
-    """Get all matters"""
+async def get_matters(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    status: Optional[list[MatterStatus]] = Query(None),
+    attributes: Optional[str] = Query(None, description='JSON object the attributes must contain, e.g. {"landlord": "Parkside"}'),
+    has_key: Optional[list[str]] = Query(None, description="Attribute keys that must be present"),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a page of matters, newest first.
+
+    Attribute filters use the GIN index on ``attributes``. When more matters
+    exist, the ``X-Next-Cursor`` response header holds the cursor for the
+    next page. Responses carry an ``ETag``; a matching ``If-None-Match``
+    gets an empty 304 without loading the page.
+    """
+    filters = []
+    if category:
+        filters.append(Matter.category == category)
+    if status:
+        filters.append(Matter.status.in_(status))
+    if attributes:
+        try:
+            contained = json.loads(attributes)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="attributes must be a JSON object")
+        if not isinstance(contained, dict):
+            raise HTTPException(status_code=400, detail="attributes must be a JSON object")
+        filters.append(Matter.attributes.contains(contained))
+    for key in has_key or []:
+        filters.append(Matter.attributes.has_key(key))
+
+    # Filing documents changes the counts and activity shown, and bumps the matters version too
+    etag = make_etag("matters", request.url.query, *await collection_version(db, "matters", Matter))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    query = select(Matter).where(*filters)
+
+    result = await db.execute(
+        keyset_page(query, Matter.created_at, Matter.id, cursor=cursor, limit=limit)
+    )
+    matters, cursor = next_cursor(result.scalars().all(), limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    stats = await document_stats(db, [matter.id for matter in matters])
+    return [matter_response(MatterResponse, matter, *stats.get(matter.id, (0, None))) for matter in matters]
+
+@router.get("/{matter_id}", response_model=MatterDetail)
+async def get_matter(matter_id: UUID, db: AsyncSession = Depends(get_db)):
+    """Get a matter with its documents.
+
+    Documents are loaded with one extra query and without their text,
+    embedding or search vector; search or the document itself serve those.
+    """
     result = await db.execute(
-        select(Matter).order_by(Matter.created_at.desc())
+        select(Matter)
+        .where(Matter.id == matter_id)
+        .options(
+            selectinload(Matter.documents).load_only(
+                Document.id, Document.matter_id, Document.title, Document.source_hash, Document.created_at
+            )
+        )
     )
-    matters = result.scalars().all()
-    return [MatterResponse.from_orm(matter) for matter in matters]
\ No newline at end of file
+    matter = result.scalars().first()
+    if not matter:
+        raise HTTPException(status_code=404, detail="Matter not found")
+    last_document_at = max((document.created_at for document in matter.documents), default=None)
+    return matter_response(MatterDetail, matter, len(matter.documents), last_document_at)
\ No newline at end of file
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.core.metrics import render_metrics
+from app.models.inbox import InboxItem
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(db: AsyncSession = Depends(get_db)):
+    """Prometheus scrape endpoint"""
+    result = await db.execute(select(InboxItem.status, func.count()).group_by(InboxItem.status))
+    return Response(render_metrics(dict(result.all())), media_type=CONTENT_TYPE_LATEST)
\ No newline at end of file
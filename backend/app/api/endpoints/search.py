@@ -0,0 +1,253 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal
+from app.core.database import get_db
+from app.models.matters import Matter
+from app.models.documents import Document, TEXT_SEARCH_CONFIG
+from app.models.document_chunks import DocumentChunk
+from app.services.embeddings import get_embedding_provider
+from app.schemas.search import SemanticSearchResult, HybridSearchResult
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+DEFAULT_EF_SEARCH = int(os.getenv("SEARCH_EF_SEARCH", "40"))
+# pgvector rejects larger hnsw.ef_search values
+MAX_EF_SEARCH = 1000
+# pgvector >= 0.8 keeps scanning the HNSW graph until enough rows pass the filters
+ITERATIVE_SCAN = os.getenv("SEARCH_ITERATIVE_SCAN", "relaxed_order")
+# Chunks fetched per requested document, since several chunks of one document may rank first
+CHUNK_OVERFETCH = int(os.getenv("SEARCH_CHUNK_OVERFETCH", "4"))
+SNIPPET_CHARS = 300
+# Candidates taken from each ranking before fusion
+HYBRID_CANDIDATES = int(os.getenv("SEARCH_HYBRID_CANDIDATES", "100"))
+# Reciprocal rank fusion constant; higher values flatten the gap between top ranks
+RRF_K = int(os.getenv("SEARCH_RRF_K", "60"))
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10"
+
+def best_chunk_per_document(rows: list, limit: int) -> list:
+    """Keep the closest chunk of each document, ordered by distance"""
+    best = {}
+    for row in rows:
+        current = best.get(row.document_id)
+        if current is None or row.distance < current.distance:
+            best[row.document_id] = row
+    return sorted(best.values(), key=lambda row: row.distance)[:limit]
+
+def search_filters(matter_id, category, created_after, created_before) -> list:
+    """Pre-filters on documents joined with their matter"""
+    filters = []
+    if matter_id:
+        filters.append(Document.matter_id == matter_id)
+    if category:
+        filters.append(Matter.category == category)
+    if created_after:
+        filters.append(Document.created_at >= created_after)
+    if created_before:
+        filters.append(Document.created_at < created_before)
+    return filters
+
+def ef_search_for(requested: Optional[int], fetch: int) -> int:
+    """``ef_search`` of at least ``fetch`` rows, within pgvector's limit"""
+    return min(max(requested or DEFAULT_EF_SEARCH, fetch), MAX_EF_SEARCH)
+
+async def set_search_params(db: AsyncSession, ef_search: int, filtered: bool) -> None:
+    """Tune the HNSW scan for the current transaction only"""
+    ef_search = min(ef_search, MAX_EF_SEARCH)
+    await db.execute(select(func.set_config("hnsw.ef_search", str(ef_search), True)))
+    if filtered and ITERATIVE_SCAN:
+        await db.execute(select(func.set_config("hnsw.iterative_scan", ITERATIVE_SCAN, True)))
+
+@router.get("/semantic", response_model=list[SemanticSearchResult])
+async def semantic_search(
+    q: str = Query(..., min_length=1),
+    matter_id: Optional[UUID] = None,
+    category: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    limit: int = Query(10, ge=1, le=100),
+    ef_search: Optional[int] = Query(None, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Approximate nearest-neighbour search over document chunks.
+
+    Uses the HNSW index on ``document_chunks.embedding``; ``ef_search``
+    trades recall for latency and is raised to at least the number of
+    chunks fetched, so a full page can be returned.
+    """
+    provider = get_embedding_provider()
+    if provider is None:
+        raise HTTPException(status_code=503, detail="Embeddings are not configured")
+
+    vectors = await provider.embed([q])
+    distance = DocumentChunk.embedding.cosine_distance(vectors[0])
+    fetch = min(limit * CHUNK_OVERFETCH, MAX_EF_SEARCH)
+
+    query = (
+        select(
+            DocumentChunk.document_id,
+            DocumentChunk.chunk_index,
+            DocumentChunk.content,
+            Document.title.label("document_title"),
+            Document.created_at,
+            Matter.id.label("matter_id"),
+            Matter.title.label("matter_title"),
+            Matter.category,
+            distance.label("distance"),
+        )
+        .join(Document, Document.id == DocumentChunk.document_id)
+        .join(Matter, Matter.id == Document.matter_id)
+        .where(DocumentChunk.embedding.isnot(None))
+    )
+    filters = search_filters(matter_id, category, created_after, created_before)
+    if filters:
+        query = query.where(*filters)
+
+    await set_search_params(db, ef_search_for(ef_search, fetch), bool(filters))
+    result = await db.execute(query.order_by(distance).limit(fetch))
+    rows = best_chunk_per_document(result.all(), limit)
+
+    return [
+        SemanticSearchResult(
+            document_id=row.document_id,
+            document_title=row.document_title,
+            matter_id=row.matter_id,
+            matter_title=row.matter_title,
+            category=row.category,
+            chunk_index=row.chunk_index,
+            snippet=row.content[:SNIPPET_CHARS],
+            score=1 - row.distance,
+            created_at=row.created_at,
+        )
+        for row in rows
+    ]
+
+
+@router.get("/hybrid", response_model=list[HybridSearchResult])
+async def hybrid_search(
+    q: str = Query(..., min_length=1),
+    matter_id: Optional[UUID] = None,
+    category: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    ef_search: Optional[int] = Query(None, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Keyword and semantic search fused with reciprocal rank fusion.
+
+    Full-text matches on ``documents.content_tsv`` (GIN index) and nearest
+    chunks (HNSW index) are ranked separately, each document scores
+    ``1 / (RRF_K + rank)`` per ranking it appears in, and only the requested
+    page is highlighted, all in a single statement. Without an embedding
+    provider the search is keyword-only.
+    """
+    filters = search_filters(matter_id, category, created_after, created_before)
+    candidates = max(HYBRID_CANDIDATES, offset + limit)
+    tsquery = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, q)
+    text_rank = func.ts_rank_cd(Document.content_tsv, tsquery)
+
+    keyword = (
+        select(
+            Document.id.label("document_id"),
+            func.row_number().over(order_by=(text_rank.desc(), Document.id)).label("rank"),
+        )
+        .join(Matter, Matter.id == Document.matter_id)
+        .where(Document.content_tsv.op("@@")(tsquery), *filters)
+        .order_by(text_rank.desc(), Document.id)
+        .limit(candidates)
+        .cte("keyword")
+    )
+
+    provider = get_embedding_provider()
+    if provider is not None:
+        # One HNSW scan yields at most MAX_EF_SEARCH chunks; deeper pages rank by keyword only
+        nearest_fetch = min(candidates * CHUNK_OVERFETCH, MAX_EF_SEARCH)
+        vectors = await provider.embed([q])
+        distance = DocumentChunk.embedding.cosine_distance(vectors[0])
+        nearest = (
+            select(DocumentChunk.document_id, distance.label("distance"))
+            .join(Document, Document.id == DocumentChunk.document_id)
+            .join(Matter, Matter.id == Document.matter_id)
+            .where(DocumentChunk.embedding.isnot(None), *filters)
+            .order_by(distance)
+            .limit(nearest_fetch)
+            .cte("nearest_chunks")
+        )
+        semantic = (
+            select(
+                nearest.c.document_id,
+                func.row_number().over(order_by=func.min(nearest.c.distance)).label("rank"),
+            )
+            .group_by(nearest.c.document_id)
+            .cte("semantic")
+        )
+        semantic_rank = semantic.c.rank
+        fused_from = keyword.outerjoin(semantic, keyword.c.document_id == semantic.c.document_id, full=True)
+        document_id = func.coalesce(keyword.c.document_id, semantic.c.document_id)
+        score = (
+            func.coalesce(literal(1.0) / (RRF_K + keyword.c.rank), 0)
+            + func.coalesce(literal(1.0) / (RRF_K + semantic.c.rank), 0)
+        )
+        await set_search_params(db, ef_search_for(ef_search, nearest_fetch), bool(filters))
+    else:
+        semantic_rank = literal(None)
+        fused_from = keyword
+        document_id = keyword.c.document_id
+        score = literal(1.0) / (RRF_K + keyword.c.rank)
+
+    page = (
+        select(
+            document_id.label("document_id"),
+            keyword.c.rank.label("keyword_rank"),
+            semantic_rank.label("semantic_rank"),
+            score.label("score"),
+        )
+        .select_from(fused_from)
+        .order_by(score.desc(), document_id)
+        .offset(offset)
+        .limit(limit)
+        .cte("page")
+    )
+
+    result = await db.execute(
+        select(
+            page.c.document_id,
+            page.c.keyword_rank,
+            page.c.semantic_rank,
+            page.c.score,
+            Document.title.label("document_title"),
+            Document.created_at,
+            Matter.id.label("matter_id"),
+            Matter.title.label("matter_title"),
+            Matter.category,
+            func.ts_headline(TEXT_SEARCH_CONFIG, Document.content_text, tsquery, HEADLINE_OPTIONS).label("highlight"),
+        )
+        .join(Document, Document.id == page.c.document_id)
+        .join(Matter, Matter.id == Document.matter_id)
+        .order_by(page.c.score.desc(), page.c.document_id)
+    )
+
+    return [
+        HybridSearchResult(
+            document_id=row.document_id,
+            document_title=row.document_title,
+            matter_id=row.matter_id,
+            matter_title=row.matter_title,
+            category=row.category,
+            score=float(row.score),
+            keyword_rank=row.keyword_rank,
+            semantic_rank=row.semantic_rank,
+            # Only keyword matches have something to highlight
+            highlight=row.highlight if row.keyword_rank is not None else None,
+            created_at=row.created_at,
+        )
+        for row in result.all()
+    ]
\ No newline at end of file
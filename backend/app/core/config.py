@@ -0,0 +1,54 @@
+from functools import lru_cache
+from typing import Literal, Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class DatabaseSettings(BaseSettings):
+    """Database connection and pool settings, read from the environment.
+
+    Each API or worker process holds up to ``db_pool_size + db_max_overflow``
+    connections, so size them so that all processes together stay below
+    Postgres' ``max_connections``. A worker needs about one connection per
+    ``WORKER_CONCURRENCY`` claim loop plus one for heartbeats.
+    """
+
+    model_config = SettingsConfigDict(extra="ignore")
+
+    postgres_user: Optional[str] = None
+    postgres_password: Optional[str] = None
+    postgres_host: Optional[str] = None
+    postgres_db: Optional[str] = None
+    # Overrides the POSTGRES_* parts when set
+    database_url: Optional[str] = None
+
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    # Seconds to wait for a free connection before raising
+    db_pool_timeout: float = 30.0
+    # Replace connections older than this many seconds (-1 never)
+    db_pool_recycle: int = 1800
+    # Test connections with a round trip on checkout, so restarts of Postgres are survived
+    db_pool_pre_ping: bool = True
+    # asyncpg prepared statement cache per connection; 0 when behind PgBouncer in transaction mode
+    db_statement_cache_size: int = 100
+    # "statements" logs every SQL statement, "debug" also logs result rows
+    db_echo: Literal["off", "statements", "debug"] = "off"
+    # Statements slower than this are logged, without their parameters
+    db_slow_query_ms: float = 200.0
+    # Repeats of one statement shape within a request or job reported as a probable N+1
+    db_n_plus_one_threshold: int = 10
+    # Add X-DB-Query-Count and X-DB-Time-Ms to every response; for development only
+    db_debug_headers: bool = False
+
+    @property
+    def url(self) -> str:
+        if self.database_url:
+            return self.database_url
+        return f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}/{self.postgres_db}"
+
+    @property
+    def echo(self):
+        return {"off": False, "statements": True, "debug": "debug"}[self.db_echo]
+
+@lru_cache
+def get_database_settings() -> DatabaseSettings:
+    return DatabaseSettings()
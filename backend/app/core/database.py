@@ -1,11 +1,27 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 from sqlalchemy import MetaData
-import os
+from app.core.config import get_database_settings
+from app.core.pool import InstrumentedQueuePool
+from app.core.query_monitor import QueryMonitor
 
-DATABASE_URL = f"postgresql+asyncpg://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}@{os.getenv('POSTGRES_HOST')}/{os.getenv('POSTGRES_DB')}"
+settings = get_database_settings()
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+DATABASE_URL = settings.url
+
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=settings.echo,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    connect_args={"statement_cache_size": settings.db_statement_cache_size},
+)
+
+QueryMonitor(settings.db_slow_query_ms, settings.db_n_plus_one_threshold).install(engine.sync_engine)
 
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -0,0 +1,44 @@
+import hashlib
+from datetime import datetime
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.collection_versions import CollectionVersion
+
+# Clients may store responses but must revalidate them on every use
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts) -> str:
+    """Strong entity tag over the given version markers"""
+    raw = "|".join(part.isoformat() if isinstance(part, datetime) else str(part) for part in parts)
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether ``If-None-Match`` names the current representation (weak comparison, as RFC 9110 requires)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+async def collection_version(db: AsyncSession, name: str, model) -> tuple:
+    """Version marker of a whole collection in constant time.
+
+    The trigger-maintained counter in ``collection_versions`` catches
+    inserts, updates and deletes regardless of commit order; the latest
+    ``updated_at`` comes from its index. Filters are left out, so a change
+    anywhere in the collection changes the ETag of every filtered view.
+    """
+    latest = select(func.max(model.updated_at)).scalar_subquery()
+    result = await db.execute(
+        select(CollectionVersion.version, latest).where(CollectionVersion.name == name)
+    )
+    return tuple(result.one_or_none() or (0, None))
@@ -0,0 +1,144 @@
+"""Prometheus metrics.
+
+With several uvicorn workers, or the job worker next to the API, set
+``PROMETHEUS_MULTIPROC_DIR`` to a directory shared by all processes: each
+process then writes its samples there and ``/metrics`` on any API process
+reports the sum over all of them. The directory must be emptied before the
+processes start (docker-compose runs ``metrics-init`` for this), and each
+process removes its own files when it exits; the counters of a restarted
+process start from zero again, which Prometheus treats as a counter reset.
+"""
+import os
+import socket
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, multiprocess, values
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.tracing import tracer
+
+def _process_identifier() -> str:
+    # Containers sharing the directory may run processes with the same pid
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    values.ValueClass = values.MultiProcessValue(process_identifier=_process_identifier)
+
+# Pipeline stages take from milliseconds (cache hits) to minutes (OCR, long LLM analyses)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "byro_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+STAGE_DURATION = Histogram(
+    "byro_pipeline_stage_duration_seconds",
+    "Duration of document pipeline stages",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+PAGES_EXTRACTED = Counter(
+    "byro_pages_extracted_total",
+    "Pages whose text was extracted; rate() gives pages per second",
+    ["engine"],
+)
+UPLOAD_BYTES = Counter(
+    "byro_upload_bytes_total",
+    "Bytes received in uploads",
+    ["deduplicated"],
+)
+LLM_REQUESTS = Counter(
+    "byro_llm_requests_total",
+    "LLM API calls, counting each retry",
+    ["operation", "outcome"],
+)
+LLM_TOKENS = Counter(
+    "byro_llm_tokens_total",
+    "Tokens reported by the LLM API",
+    ["operation", "kind"],
+)
+LLM_REQUEST_DURATION = Histogram(
+    "byro_llm_request_duration_seconds",
+    "Latency of single LLM API calls",
+    ["operation"],
+    buckets=STAGE_BUCKETS,
+)
+
+def multiprocess_enabled() -> bool:
+    return bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+@contextmanager
+def observe_stage(stage: str, **attributes):
+    """Record the duration of a pipeline stage, whether it succeeds or fails.
+
+    The stage is also traced as a span, a child of the current span.
+    """
+    with tracer.span(stage, **attributes) as span:
+        started = time.perf_counter()
+        try:
+            yield span
+        finally:
+            STAGE_DURATION.labels(stage).observe(time.perf_counter() - started)
+
+class _Snapshot:
+    """Collector for values computed at scrape time"""
+
+    def __init__(self, families):
+        self.families = families
+
+    def collect(self):
+        return self.families
+
+def render_metrics(inbox_counts: dict[str, int]) -> bytes:
+    """All metrics in the Prometheus text format, plus inbox items by status"""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    queue = GaugeMetricFamily("byro_inbox_items", "Inbox items by status", labels=["status"])
+    for status, count in sorted(inbox_counts.items()):
+        queue.add_metric([status], count)
+    snapshot = CollectorRegistry()
+    snapshot.register(_Snapshot([queue]))
+    return generate_latest(registry) + generate_latest(snapshot)
+
+def mark_process_dead() -> None:
+    """Remove this process' files from the shared directory on shutdown, so it does not grow with restarts"""
+    if multiprocess_enabled():
+        for path in Path(os.environ["PROMETHEUS_MULTIPROC_DIR"]).glob(f"*_{_process_identifier()}.db"):
+            path.unlink(missing_ok=True)
+
+class MetricsMiddleware:
+    """Records the latency of every HTTP request by its route template.
+
+    Requests that match no route are grouped under ``unmatched`` so scanners
+    cannot create unbounded label values.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status)
+            ).observe(time.perf_counter() - started)
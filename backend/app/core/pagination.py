@@ -0,0 +1,40 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(created_at: datetime, item_id: uuid.UUID) -> str:
+    """Opaque cursor pointing just past the given row"""
+    raw = json.dumps([created_at.isoformat(), str(item_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, item_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(item_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+def keyset_page(query, created_at_column, id_column, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Order newest first on (created_at, id) and continue after ``cursor``.
+
+    One extra row is fetched so callers can tell whether a next page exists;
+    pass the rows to ``next_cursor`` to trim it.
+    """
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        query = query.where(tuple_(created_at_column, id_column) < tuple_(created_at, item_id))
+    return query.order_by(created_at_column.desc(), id_column.desc()).limit(limit + 1)
+
+def next_cursor(rows: list, limit: int) -> tuple[list, str | None]:
+    """Trim the look-ahead row and return the cursor for the following page"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
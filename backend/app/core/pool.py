@@ -0,0 +1,63 @@
+import time
+from dataclasses import dataclass
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+@dataclass
+class CheckoutStats:
+    # Checkout attempts, including those that timed out
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that measures how long checkouts take.
+
+    Checkout time covers waiting for a free connection, opening overflow
+    connections and the pre-ping round trip, i.e. everything a request
+    waits for before its first statement.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.checkout_stats = self.checkout_stats
+        return pool
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.checkout_stats.timeouts += 1
+            raise
+        finally:
+            self.checkout_stats.record(time.perf_counter() - started)
+
+def pool_status(pool) -> dict:
+    """Live connection counts and cumulative checkout timings of a pool"""
+    status = {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # Negative while the pool has not yet opened pool_size connections
+        "overflow": pool.overflow(),
+    }
+    stats = getattr(pool, "checkout_stats", None)
+    if stats is not None:
+        status.update({
+            "checkouts": stats.checkouts,
+            "checkout_timeouts": stats.timeouts,
+            "checkout_wait_ms_avg": round(1000 * stats.wait_seconds_total / stats.checkouts, 3) if stats.checkouts else 0.0,
+            "checkout_wait_ms_max": round(1000 * stats.wait_seconds_max, 3),
+        })
+    return status
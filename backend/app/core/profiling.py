@@ -0,0 +1,209 @@
+"""On-demand sampling profiler for requests and jobs.
+
+A profiled request or job has the stack of its thread sampled every
+``PROFILE_INTERVAL_MS`` by a background thread. Samples are written to
+``PROFILE_DIR`` in the collapsed stack format (``frame;frame;frame count``),
+which speedscope, flamegraph.pl and most flamegraph tools read directly.
+
+Requests are profiled when they carry ``X-Profile: <PROFILE_TOKEN>`` or are
+picked at random with probability ``PROFILE_SAMPLE_RATE``; jobs likewise by
+rate, or when queued with ``"profile": true``. Event streams are never
+profiled, and sampling stops after ``PROFILE_MAX_SECONDS``. Async work shares the event
+loop thread, so a request's profile also contains whatever else the loop ran
+meanwhile; time spent waiting shows up as the loop's ``select``. Work sent to
+the extraction process pool is sampled inside the pool process and merged
+under ``[pool process]``.
+"""
+import asyncio
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "byro_data/profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# Empty disables the X-Profile header
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_MAX_BYTES = int(os.getenv("PROFILE_MAX_BYTES", str(2 * 1024 * 1024)))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "120"))
+MAX_STACK_DEPTH = 200
+
+_SITE_PACKAGES = re.compile(r".*[/\\](?:site|dist)-packages[/\\]")
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = _SITE_PACKAGES.sub("", code.co_filename)
+    if filename.startswith(os.getcwd()):
+        filename = os.path.relpath(filename)
+    # Semicolons separate frames in the collapsed format
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+def collapse_stack(frame) -> str:
+    """Stack of ``frame`` in collapsed form, outermost frame first"""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+class SamplingProfiler:
+    """Samples the stack of one thread from a background thread"""
+
+    def __init__(self, thread_id: int = None, interval_ms: float = None, max_seconds: float = None):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = (interval_ms or PROFILE_INTERVAL_MS) / 1000
+        self.max_seconds = max_seconds or PROFILE_MAX_SECONDS
+        self.samples: Counter = Counter()
+        # Set to drop the profile instead of writing it
+        self.discarded = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="byro-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def merge(self, samples: Counter, root: str) -> None:
+        for stack, count in samples.items():
+            self.samples[f"{root};{stack}"] += count
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval):
+            if time.monotonic() > deadline:
+                logger.warning(f"Stopped sampling after {self.max_seconds:.0f}s; the profile is truncated")
+                return
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[collapse_stack(frame)] += 1
+
+_active: ContextVar[Optional[SamplingProfiler]] = ContextVar("active_profiler", default=None)
+
+def profile_token_valid(token: Optional[str]) -> bool:
+    return bool(token and PROFILE_TOKEN and hmac.compare_digest(token, PROFILE_TOKEN))
+
+def should_profile(token: Optional[str] = None, requested: bool = False) -> bool:
+    """Whether to profile: a matching admin token, an explicit request, or the sampling rate"""
+    if profile_token_valid(token):
+        return True
+    return requested or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)
+
+def write_profile(label: str, samples: Counter, directory: str = None) -> Optional[Path]:
+    """Write samples as collapsed stacks, keeping at most ``PROFILE_MAX_FILES`` profiles.
+
+    Profiles over ``PROFILE_MAX_BYTES`` keep their heaviest stacks.
+    """
+    if not samples:
+        return None
+    directory = Path(directory or PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    lines = []
+    size = 0
+    for stack, count in samples.most_common():
+        line = f"{stack} {count}\n"
+        size += len(line.encode("utf-8"))
+        if size > PROFILE_MAX_BYTES:
+            break
+        lines.append(line)
+
+    existing = sorted(directory.glob("*.collapsed"), key=lambda path: path.stat().st_mtime)
+    for old in existing[:max(0, len(existing) - PROFILE_MAX_FILES + 1)]:
+        old.unlink(missing_ok=True)
+
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", label).strip("-")[:80]
+    path = directory / f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{slug}.collapsed"
+    path.write_text("".join(lines), encoding="utf-8")
+    return path
+
+@asynccontextmanager
+async def profiling(label: str):
+    """Sample the current thread until the block exits, then write the profile"""
+    profiler = SamplingProfiler()
+    token = _active.set(profiler)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active.reset(token)
+        if profiler.discarded:
+            return
+        try:
+            path = await asyncio.to_thread(write_profile, label, profiler.samples)
+            if path is not None:
+                logger.info(f"Wrote profile of {label} to {path}")
+        except OSError as e:
+            logger.warning(f"Failed to write profile of {label}: {str(e)}")
+
+def run_profiled(fn: Callable[..., Any], args: tuple, interval_ms: float) -> tuple[Any, Counter]:
+    """Call ``fn(*args)`` under a sampling profiler; runs inside a pool process"""
+    profiler = SamplingProfiler(interval_ms=interval_ms)
+    profiler.start()
+    try:
+        return fn(*args), profiler.samples
+    finally:
+        profiler.stop()
+
+async def run_in_pool(pool, fn: Callable[..., Any], *args: Any, timeout: float = None) -> Any:
+    """``pool.run`` that also profiles the pool process while the caller is being profiled"""
+    profiler = _active.get()
+    if profiler is None:
+        return await pool.run(fn, *args, timeout=timeout)
+    result, samples = await pool.run(run_profiled, fn, args, profiler.interval * 1000, timeout=timeout)
+    profiler.merge(samples, "[pool process]")
+    return result
+
+class ProfilingMiddleware:
+    """Profiles requests that carry the admin ``X-Profile`` token or are sampled.
+
+    Server-sent event streams stay open as long as the client does, so they
+    are skipped by their ``Accept`` header, and dropped if a response turns
+    out to be one anyway.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if b"text/event-stream" in headers.get(b"accept", b""):
+            await self.app(scope, receive, send)
+            return
+        token = headers.get(b"x-profile", b"").decode("latin-1")
+        if not should_profile(token):
+            await self.app(scope, receive, send)
+            return
+
+        async with profiling(f"{scope['method']} {scope['path']}") as profiler:
+            async def send_checking_stream(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                    if content_type.startswith(b"text/event-stream"):
+                        profiler.discarded = True
+                        profiler.stop()
+                await send(message)
+
+            await self.app(scope, receive, send_checking_stream)
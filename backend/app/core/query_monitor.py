@@ -0,0 +1,118 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Runs of positional placeholders, as expanded from IN lists and multi-row VALUES
+_PLACEHOLDER_RUN = re.compile(r"(?:\$\d+|%\(\w+\)s|\?)(?:\s*,\s*(?:\$\d+|%\(\w+\)s|\?))*")
+_WHITESPACE = re.compile(r"\s+")
+_SHAPE_CHARS = 200
+
+@dataclass
+class QueryStats:
+    """Statements run on behalf of one request or job"""
+    label: str
+    count: int = 0
+    seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def statement_shape(statement: str) -> str:
+    """Statement text with placeholder lists collapsed, so IN lists of any length share a shape"""
+    return _WHITESPACE.sub(" ", _PLACEHOLDER_RUN.sub("?", statement)).strip()
+
+@contextmanager
+def track_queries(label: str):
+    """Count and time the statements run in this context, including tasks it starts"""
+    stats = QueryStats(label)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+class QueryMonitor:
+    """Times every statement on an engine.
+
+    Statements slower than ``slow_ms`` are logged with their parameters
+    left out. Within a tracked request or job, a statement shape repeated
+    ``n_plus_one_threshold`` times is reported once as a probable N+1.
+    """
+
+    def __init__(self, slow_ms: float, n_plus_one_threshold: int):
+        self.slow_seconds = slow_ms / 1000
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    def install(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        event.listen(engine, "handle_error", self._error)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _error(self, context) -> None:
+        # Failed statements never reach after_cursor_execute
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _current.get()
+        if elapsed >= self.slow_seconds:
+            label = stats.label if stats is not None else "-"
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.1f} ms) in {label}: {statement_shape(statement)[:1000]} "
+                f"[{_parameter_count(parameters)} parameters redacted]"
+            )
+        if stats is None:
+            return
+        stats.count += 1
+        stats.seconds += elapsed
+        shape = statement_shape(statement)[:_SHAPE_CHARS]
+        stats.shapes[shape] += 1
+        if stats.shapes[shape] == self.n_plus_one_threshold:
+            logger.warning(f"Probable N+1 in {stats.label}: {self.n_plus_one_threshold}x {shape}")
+
+def _parameter_count(parameters) -> int:
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        return sum(len(row) for row in parameters)
+    return len(parameters or ())
+
+class QueryMonitorMiddleware:
+    """Tracks the statements of each HTTP request.
+
+    With ``debug_headers``, responses carry ``X-DB-Query-Count`` and
+    ``X-DB-Time-Ms`` for the statements run before the response started.
+    """
+
+    def __init__(self, app: ASGIApp, debug_headers: bool = False):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(f"{scope['method']} {scope['path']}") as stats:
+            async def send_with_stats(message: Message) -> None:
+                if self.debug_headers and message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-query-count", str(stats.count).encode()),
+                        (b"x-db-time-ms", f"{stats.seconds * 1000:.1f}".encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
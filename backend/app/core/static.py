@@ -0,0 +1,28 @@
+from pathlib import PurePath
+from fastapi.staticfiles import StaticFiles
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.types import Scope
+
+# Content-addressed files never change under the same URL
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+class ImmutableStaticFiles(StaticFiles):
+    """Static files that are named by their content and may be cached forever.
+
+    Starlette's FileResponse already answers ``Range`` requests with 206
+    partial content, so PDF viewers can fetch the pages they show first.
+    Hidden paths such as the ``.incoming`` staging directory of in-flight
+    uploads are never served.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if any(part.startswith(".") for part in PurePath(path).parts):
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if response.status_code in (200, 206, 304):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
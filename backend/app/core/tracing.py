@@ -0,0 +1,173 @@
+"""Lightweight tracing of inbox items through the processing pipeline.
+
+Spans follow the OpenTelemetry model (trace id, span id, parent, attributes,
+status) without its SDK. All spans of an inbox item share a trace id derived
+from the item id, so the upload request and the worker job that processes it
+form one trace without propagating context through the job queue.
+
+``TRACE_EXPORTER`` selects where finished spans go: ``none`` (default),
+``console`` (log lines), ``jsonl`` (one JSON object per line in
+``TRACE_FILE``) or ``package.module:Class`` for a custom exporter.
+"""
+import atexit
+import importlib
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")
+TRACE_FILE = os.getenv("TRACE_FILE", "byro_data/traces.jsonl")
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    # Wall clock for correlation with logs; durations use the monotonic clock
+    start_time: float = field(default_factory=time.time)
+    duration_ms: Optional[float] = None
+    status: str = "ok"
+    error: Optional[str] = None
+    attributes: dict = field(default_factory=dict)
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+class SpanExporter(ABC):
+    """Receives every finished span"""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        ...
+
+    def shutdown(self) -> None:
+        """Flush spans still buffered"""
+
+class ConsoleSpanExporter(SpanExporter):
+    def export(self, span: Span) -> None:
+        parent = f" parent={span.parent_id}" if span.parent_id else ""
+        logger.info(
+            f"span {span.name} trace={span.trace_id} span={span.span_id}{parent} "
+            f"{span.duration_ms:.1f}ms {span.status} {span.attributes}"
+        )
+
+class JsonlSpanExporter(SpanExporter):
+    """Appends spans to a JSON Lines file.
+
+    Spans are queued and written in batches by a background thread, so
+    exporting never waits on the disk.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = Path(path or TRACE_FILE)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write_loop, name="byro-span-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def export(self, span: Span) -> None:
+        self._queue.put(json.dumps(asdict(span), default=str))
+
+    def shutdown(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _write_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            lines = [self._queue.get()]
+            while True:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in lines
+            lines = [line for line in lines if line is not None]
+            if not lines:
+                continue
+            try:
+                with open(self.path, "a", encoding="utf-8") as handle:
+                    handle.write("\n".join(lines) + "\n")
+            except OSError as e:
+                logger.warning(f"Failed to write {len(lines)} spans to {self.path}: {str(e)}")
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps spans in a list; for tests"""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+def get_exporter(name: str) -> Optional[SpanExporter]:
+    if name == "none":
+        return None
+    if name == "console":
+        return ConsoleSpanExporter()
+    if name == "jsonl":
+        return JsonlSpanExporter()
+    module_name, _, attribute = name.partition(":")
+    try:
+        return getattr(importlib.import_module(module_name), attribute)()
+    except (ImportError, AttributeError, ValueError) as e:
+        logger.error(f"Unknown trace exporter '{name}', tracing disabled: {str(e)}")
+        return None
+
+def trace_id_for(item_id) -> str:
+    """Trace id shared by all spans of an inbox item"""
+    return uuid.UUID(str(item_id)).hex
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+class Tracer:
+    def __init__(self, exporter: Optional[SpanExporter] = None):
+        self.exporter = exporter
+
+    @contextmanager
+    def span(self, name: str, trace_id: str = None, **attributes):
+        """Time a block as a span, a child of the current span unless ``trace_id`` starts another trace"""
+        parent = _current_span.get()
+        if parent is not None and trace_id in (None, parent.trace_id):
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = trace_id or uuid.uuid4().hex, None
+        span = Span(name, trace_id, secrets.token_hex(8), parent_id, attributes=attributes)
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - started) * 1000
+            _current_span.reset(token)
+            self._export(span)
+
+    def _export(self, span: Span) -> None:
+        if self.exporter is None:
+            return
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            logger.warning(f"Failed to export span {span.name}: {str(e)}")
+
+tracer = Tracer(get_exporter(TRACE_EXPORTER))
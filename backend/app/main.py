@@ -1,25 +1,55 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from app.api import api_router
+from app.core.middleware import UploadSizeLimitMiddleware
+from app.core.static import ImmutableStaticFiles
+from app.core.config import get_database_settings
+from app.core.query_monitor import QueryMonitorMiddleware
+from app.core.metrics import MetricsMiddleware, mark_process_dead
+from app.core.profiling import ProfilingMiddleware
+from app.services.storage import MAX_UPLOAD_BYTES, LocalStorage
+from app.services.events import inbox_event_broker
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await inbox_event_broker.close()
+    mark_process_dead()
 
 app = FastAPI(
     title="Byro API",
     description="Digital Chief of Staff for the Modern Family Office",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+)
+
+# Registered before CORS so CORS headers are still added to 413 responses
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_bytes=MAX_UPLOAD_BYTES,
+    paths=("/inbox/upload",),
 )
 
+app.add_middleware(MetricsMiddleware)
+
+app.add_middleware(ProfilingMiddleware)
+
+app.add_middleware(QueryMonitorMiddleware, debug_headers=get_database_settings().db_debug_headers)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-DB-Query-Count", "X-DB-Time-Ms"],
 )
 
 app.include_router(api_router)
 
-app.mount("/static", StaticFiles(directory="byro_data/uploads"), name="static")
+# Uploads are named by content hash, so browsers may cache them indefinitely
+app.mount("/static", ImmutableStaticFiles(directory=LocalStorage().base_path), name="static")
 
 @app.get("/")
 async def root():
@@ -1,5 +1,11 @@
 from .inbox import InboxItem
 from .matters import Matter
 from .documents import Document
+from .document_chunks import DocumentChunk
+from .jobs import Job
+from .analysis_cache import AnalysisCacheEntry
+from .extracted_texts import ExtractedText
+from .inbox_events import InboxEvent
+from .collection_versions import CollectionVersion
 
-__all__ = ["InboxItem", "Matter", "Document"]
\ No newline at end of file
+__all__ = ["InboxItem", "Matter", "Document", "DocumentChunk", "Job", "AnalysisCacheEntry", "ExtractedText", "InboxEvent", "CollectionVersion"]
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Integer, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class AnalysisCacheEntry(Base):
+    __tablename__ = "llm_analysis_cache"
+    __table_args__ = (
+        Index("ix_llm_analysis_cache_last_used_at", "last_used_at"),
+    )
+
+    # SHA-256 over extracted text, model name and prompt version
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    result = Column(JSONB, nullable=False)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,50 @@
+from sqlalchemy import Column, String, BigInteger, DDL, event
+from app.core.database import Base
+
+class CollectionVersion(Base):
+    """Change counter of a cached collection; feeds list ETags.
+
+    Triggers bump the counter in the writing transaction, once per insert,
+    update or delete statement on the collection's tables, so ORM, Core and
+    bulk writes are all covered and the new value is visible exactly when
+    the change commits. Writers to one collection serialize on its row until
+    they commit.
+    """
+    __tablename__ = "collection_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, server_default="0")
+
+# Collection name -> tables whose writes change it
+COLLECTION_TABLES = {
+    "inbox_items": ("inbox_items",),
+    # Document counts and activity are shown in the matter list
+    "matters": ("matters", "documents"),
+}
+
+BUMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE collection_versions SET version = version + 1 WHERE name = TG_ARGV[0];
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+def collection_version_ddl() -> list[str]:
+    """Statements creating the counters and their triggers"""
+    statements = [BUMP_FUNCTION]
+    for name, tables in COLLECTION_TABLES.items():
+        statements.append(f"INSERT INTO collection_versions (name) VALUES ('{name}') ON CONFLICT DO NOTHING")
+        for table in tables:
+            statements.append(
+                f"CREATE TRIGGER {table}_bump_{name}_version "
+                f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version('{name}')"
+            )
+    return statements
+
+# Migrations create these too; this covers metadata.create_all, as used by the tests
+for statement in collection_version_ddl():
+    event.listen(Base.metadata, "after_create", DDL(statement))
+event.listen(Base.metadata, "after_drop", DDL("DROP FUNCTION IF EXISTS bump_collection_version()"))
\ No newline at end of file
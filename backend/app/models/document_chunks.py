@@ -0,0 +1,27 @@
+from sqlalchemy import Column, ForeignKey, String, Integer, UUID, Text, DateTime, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+import uuid
+from app.core.database import Base
+
+class DocumentChunk(Base):
+    __tablename__ = "document_chunks"
+    __table_args__ = (
+        UniqueConstraint("document_id", "chunk_index", name="uq_document_chunks_document_id_chunk_index"),
+        Index(
+            "ix_document_chunks_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    chunk_index = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
+    # SHA-256 of content; unchanged chunks keep their embedding
+    content_hash = Column(String(64), nullable=False, index=True)
+    embedding = Column(Vector(1536), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
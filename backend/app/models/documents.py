@@ -1,15 +1,44 @@
-from sqlalchemy import Column, ForeignKey, String, UUID, Text, DateTime
+from sqlalchemy import Column, ForeignKey, String, UUID, Text, DateTime, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from pgvector.sqlalchemy import Vector
 import uuid
 from app.core.database import Base
 
+# 'simple' keeps identifiers such as invoice numbers and VINs intact (no stemming)
+TEXT_SEARCH_CONFIG = "simple"
+
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index(
+            "ix_documents_content_embedding_hnsw",
+            "content_embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"content_embedding": "vector_cosine_ops"},
+        ),
+        Index("ix_documents_matter_id", "matter_id"),
+        Index("ix_documents_content_tsv", "content_tsv", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     matter_id = Column(UUID(as_uuid=True), ForeignKey("matters.id"), nullable=False)
     title = Column(String, nullable=False)
+    # Extracted text this document's content_text was copied from
+    source_hash = Column(String(64), ForeignKey("extracted_texts.content_hash", ondelete="SET NULL"), nullable=True, index=True)
     content_text = Column(Text, nullable=True)
     content_embedding = Column(Vector(1536), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    # Maintained by Postgres; deferred so it is never loaded with the row
+    content_tsv = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(content_text, '')), 'B')",
+            persisted=True,
+        ),
+    ))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    matter = relationship("Matter", back_populates="documents", lazy="raise")
\ No newline at end of file
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, LargeBinary, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ExtractedText(Base):
+    __tablename__ = "extracted_texts"
+
+    # SHA-256 of the source file, shared by every upload of the same content
+    content_hash = Column(String(64), primary_key=True)
+    # JSON list of page texts, zlib-compressed when large
+    data = Column(LargeBinary, nullable=False)
+    compression = Column(String, nullable=False, default="none")
+    page_count = Column(Integer, nullable=False)
+    char_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
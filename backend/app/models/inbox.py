@@ -1,14 +1,29 @@
-from sqlalchemy import Column, String, Enum, JSON, UUID, DateTime
-from sqlalchemy.sql import func
+from sqlalchemy import Column, String, Enum, Integer, JSON, UUID, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func, literal_column
 import uuid
 from app.core.database import Base
 
 class InboxItem(Base):
     __tablename__ = "inbox_items"
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), optionally filtered by status
+        Index("ix_inbox_items_created_at_id", "created_at", "id"),
+        Index("ix_inbox_items_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_inbox_items_updated_at", "updated_at"),
+    )
+    # Fetch server-generated updated_at/version with RETURNING instead of lazy loads
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     status = Column(Enum("processing", "review", "done", "error", name="inbox_status"), default="processing")
     original_filename = Column(String, nullable=False)
-    file_path = Column(String, nullable=False)
+    file_path = Column(String, nullable=False, index=True)
+    content_hash = Column(String(64), nullable=True, index=True)
     ai_payload = Column(JSON, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    # Milliseconds per pipeline stage of the latest run, e.g. {"extract_ms": 812.4, "analyze_ms": 20931.0}
+    timings = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Bumped on every ORM update; feeds ETags
+    version = Column(Integer, nullable=False, server_default="1", onupdate=literal_column("version + 1"))
\ No newline at end of file
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, BigInteger, Identity, UUID, DateTime, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class InboxEvent(Base):
+    __tablename__ = "inbox_events"
+    __table_args__ = (
+        Index("ix_inbox_events_created_at", "created_at"),
+    )
+
+    # Monotonic, used as the SSE event id clients resume from
+    id = Column(BigInteger, Identity(), primary_key=True)
+    item_id = Column(UUID(as_uuid=True), nullable=False)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
@@ -1,15 +1,31 @@
-from sqlalchemy import Column, String, Enum, JSON, UUID, DateTime
-from sqlalchemy.sql import func
+from sqlalchemy import Column, String, Enum, Integer, UUID, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func, literal_column
 import uuid
 from app.core.database import Base
 
 class Matter(Base):
     __tablename__ = "matters"
+    __table_args__ = (
+        # Default jsonb_ops so both containment (@>) and key (?) filters can use it
+        Index("ix_matters_attributes", "attributes", postgresql_using="gin"),
+        Index("ix_matters_created_at_id", "created_at", "id"),
+        Index("ix_matters_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_matters_updated_at", "updated_at"),
+    )
+    # Fetch server-generated updated_at/version with RETURNING instead of lazy loads
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
     category = Column(String, nullable=False)
-    attributes = Column(JSON, nullable=True)
+    attributes = Column(JSONB, nullable=True)
     status = Column(Enum("active", "expired", "terminated", name="matter_status"), default="active")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Bumped on every ORM update; feeds ETags
+    version = Column(Integer, nullable=False, server_default="1", onupdate=literal_column("version + 1"))
+
+    # Never lazy-loaded: async sessions cannot load on attribute access, so use selectinload
+    documents = relationship("Document", back_populates="matter", lazy="raise", order_by="Document.created_at")
\ No newline at end of file
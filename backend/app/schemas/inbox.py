@@ -1,8 +1,10 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
+InboxStatus = Literal["processing", "review", "done", "error"]
+
 class InboxItemBase(BaseModel):
     original_filename: str
     file_path: str
@@ -11,7 +13,16 @@ class InboxItemBase(BaseModel):
 class InboxItemResponse(InboxItemBase):
     id: UUID
     ai_payload: Optional[dict] = None
+    timings: Optional[dict] = None
     created_at: datetime
     
+    class Config:
+        from_attributes = True
+
+class InboxItemSummary(InboxItemBase):
+    """Lean list projection without the AI payload"""
+    id: UUID
+    created_at: datetime
+
     class Config:
         from_attributes = True
\ No newline at end of file
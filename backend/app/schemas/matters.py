@@ -1,8 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
+MatterStatus = Literal["active", "expired", "terminated"]
+
 class MatterBase(BaseModel):
     title: str
     category: str
@@ -16,6 +18,52 @@ class MatterResponse(MatterBase):
     status: str
     created_at: datetime
     updated_at: datetime
+    document_count: int = 0
+    # Latest change to the matter or any of its documents
+    last_activity_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class DocumentSummary(BaseModel):
+    """Document metadata without its text or embedding"""
+    id: UUID
+    title: str
+    source_hash: Optional[str] = None
+    created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class MatterDetail(MatterResponse):
+    documents: list[DocumentSummary] = []
+
+class TriageDecision(BaseModel):
+    """File one inbox item: ``create`` a new matter for it or ``attach`` it to an existing one"""
+    inbox_item_id: UUID
+    action: Literal["create", "attach"]
+    matter: Optional[MatterCreate] = None
+    matter_id: Optional[UUID] = None
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if self.action == "create" and self.matter is None:
+            raise ValueError("'create' decisions need a matter")
+        if self.action == "attach" and self.matter_id is None:
+            raise ValueError("'attach' decisions need a matter_id")
+        return self
+
+class BulkTriageRequest(BaseModel):
+    decisions: list[TriageDecision] = Field(..., min_length=1, max_length=500)
+
+class TriageResult(BaseModel):
+    inbox_item_id: UUID
+    status: Literal["filed", "rejected"]
+    matter_id: Optional[UUID] = None
+    document_id: Optional[UUID] = None
+    error: Optional[str] = None
+
+class BulkTriageResponse(BaseModel):
+    filed: int
+    rejected: int
+    results: list[TriageResult]
\ No newline at end of file
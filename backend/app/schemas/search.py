@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from datetime import datetime
+from uuid import UUID
+from typing import Optional
+
+class SemanticSearchResult(BaseModel):
+    document_id: UUID
+    document_title: str
+    matter_id: UUID
+    matter_title: str
+    category: str
+    chunk_index: int
+    snippet: str
+    score: float
+    created_at: datetime
+
+class HybridSearchResult(BaseModel):
+    document_id: UUID
+    document_title: str
+    matter_id: UUID
+    matter_title: str
+    category: str
+    score: float
+    keyword_rank: Optional[int] = None
+    semantic_rank: Optional[int] = None
+    highlight: Optional[str] = None
+    created_at: datetime
\ No newline at end of file
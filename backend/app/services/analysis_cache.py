@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import delete, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
+from app.core.database import async_session
+from app.models.analysis_cache import AnalysisCacheEntry
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LRUCache:
+    """Small in-process LRU used in front of the database cache"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+
+    def get(self, key: str) -> Optional[dict]:
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: str, value: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class AnalysisCache:
+    """Persistent cache of LLM analysis results keyed by content hash.
+
+    Lookups check the in-process LRU first, then the ``llm_analysis_cache``
+    table. Entries older than ``max_age_days`` or beyond ``max_bytes`` total
+    (least recently used first) are evicted every ``evict_every`` stores.
+    """
+
+    def __init__(
+        self,
+        session_factory=async_session,
+        memory_entries: int = None,
+        max_age_days: int = None,
+        max_bytes: int = None,
+        evict_every: int = None,
+    ):
+        self.session_factory = session_factory
+        self.memory = LRUCache(memory_entries if memory_entries is not None else int(os.getenv("ANALYSIS_CACHE_MEMORY_ENTRIES", "256")))
+        self.max_age_days = max_age_days or int(os.getenv("ANALYSIS_CACHE_MAX_AGE_DAYS", "90"))
+        self.max_bytes = max_bytes or int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+        self.evict_every = evict_every or int(os.getenv("ANALYSIS_CACHE_EVICT_EVERY", "100"))
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0, "evicted": 0}
+
+    @staticmethod
+    def make_key(text: str, model: str, prompt_version: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, prompt_version, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Optional[dict]:
+        result = self.memory.get(key)
+        if result is not None:
+            self.stats["memory_hits"] += 1
+            return result
+
+        async with self.session_factory() as session:
+            row = await session.execute(
+                update(AnalysisCacheEntry)
+                .where(AnalysisCacheEntry.key == key)
+                .values(hit_count=AnalysisCacheEntry.hit_count + 1, last_used_at=func.now())
+                .returning(AnalysisCacheEntry.result)
+            )
+            result = row.scalar_one_or_none()
+            await session.commit()
+
+        if result is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["db_hits"] += 1
+        self.memory.put(key, result)
+        return result
+
+    async def set(self, key: str, model: str, prompt_version: str, result: dict) -> None:
+        self.memory.put(key, result)
+        size = len(json.dumps(result))
+        async with self.session_factory() as session:
+            stmt = insert(AnalysisCacheEntry).values(
+                key=key,
+                model=model,
+                prompt_version=prompt_version,
+                result=result,
+                size_bytes=size,
+                hit_count=0,
+            )
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[AnalysisCacheEntry.key],
+                    set_={"result": stmt.excluded.result, "size_bytes": size, "last_used_at": func.now()},
+                )
+            )
+            await session.commit()
+
+        self.stats["stores"] += 1
+        if self.stats["stores"] % self.evict_every == 0:
+            await self.evict()
+
+    async def evict(self) -> int:
+        """Drop expired entries, then least recently used ones over the size budget"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.max_age_days)
+        async with self.session_factory() as session:
+            expired = await session.execute(
+                delete(AnalysisCacheEntry).where(AnalysisCacheEntry.last_used_at < cutoff)
+            )
+            oversized = await session.execute(
+                text("""
+                    DELETE FROM llm_analysis_cache WHERE key IN (
+                        SELECT key FROM (
+                            SELECT key, SUM(size_bytes) OVER (ORDER BY last_used_at DESC, key) AS running_bytes
+                            FROM llm_analysis_cache
+                        ) ranked
+                        WHERE running_bytes > :max_bytes
+                    )
+                """),
+                {"max_bytes": self.max_bytes},
+            )
+            await session.commit()
+
+        removed = expired.rowcount + oversized.rowcount
+        self.stats["evicted"] += removed
+        if removed:
+            logger.info(f"Evicted {removed} LLM analysis cache entries")
+        return removed
@@ -0,0 +1,200 @@
+import hashlib
+import math
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Optional, Sequence
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.documents import Document
+from app.models.document_chunks import DocumentChunk
+from app.services.llm import get_llm_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = 1536
+
+class EmbeddingProvider(ABC):
+    """Turns batches of texts into unit-length vectors"""
+
+    name = "base"
+    dimensions = EMBEDDING_DIMENSIONS
+
+    @abstractmethod
+    async def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        ...
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    name = "openai"
+
+    def __init__(self, client, model: str = None):
+        self.client = client
+        self.model = model or os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+
+    async def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        response = await self.client.create_embeddings(
+            model=self.model,
+            input=list(texts),
+            dimensions=self.dimensions,
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+class StubEmbeddingProvider(EmbeddingProvider):
+    """Deterministic local embeddings for tests and offline development.
+
+    Each word is hashed onto a signed dimension (the hashing trick), so texts
+    sharing words have a positive cosine similarity.
+    """
+
+    name = "stub"
+
+    async def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        return [self.embed_one(text) for text in texts]
+
+    def embed_one(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimensions
+        for word in re.findall(r"\w+", text.lower()):
+            digest = hashlib.sha256(word.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "big") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        return normalize(vector)
+
+def get_embedding_provider() -> Optional[EmbeddingProvider]:
+    """Provider selected by EMBEDDING_PROVIDER; None when embeddings are unavailable"""
+    name = os.getenv("EMBEDDING_PROVIDER", "openai")
+    if name == "stub":
+        return StubEmbeddingProvider()
+    if name == "openai":
+        api_key = os.getenv("OPENAI_API_KEY")
+        if api_key and api_key != "your-openai-api-key-here":
+            return OpenAIEmbeddingProvider(get_llm_client(api_key))
+        return None
+    raise ValueError(f"Unknown embedding provider '{name}'")
+
+def normalize(vector: Sequence[float]) -> list[float]:
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        return list(vector)
+    return [v / norm for v in vector]
+
+def chunk_text(text: str, chunk_chars: int = None, overlap_chars: int = None) -> list[str]:
+    """Split text into overlapping chunks, preferring paragraph and word boundaries"""
+    chunk_chars = chunk_chars or int(os.getenv("EMBEDDING_CHUNK_CHARS", "2000"))
+    overlap_chars = overlap_chars if overlap_chars is not None else int(os.getenv("EMBEDDING_CHUNK_OVERLAP_CHARS", "200"))
+    text = text.strip()
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + chunk_chars)
+        if end < len(text):
+            # Back off to the last paragraph break, else the last space
+            window = text[start:end]
+            cut = max(window.rfind("\n\n"), window.rfind(" "))
+            if cut > chunk_chars // 2:
+                end = start + cut
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        next_start = max(end - overlap_chars, start + 1)
+        # Start the overlap on a word boundary
+        boundary = text.find(" ", next_start, end)
+        start = boundary + 1 if boundary != -1 else next_start
+    return chunks
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingService:
+    """Chunks document text and stores one embedding per chunk.
+
+    Chunks whose content hash already has an embedding (in this or any other
+    document) reuse it, so only new text is sent to the provider, in batches
+    of ``batch_size`` chunks per request. ``Document.content_embedding`` is
+    set to the normalized mean of its chunk embeddings.
+    """
+
+    def __init__(self, provider: EmbeddingProvider, batch_size: int = None):
+        self.provider = provider
+        self.batch_size = batch_size or int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+    async def embed_documents(self, session: AsyncSession, document_ids: Sequence) -> int:
+        """Embed the given documents; returns the number of chunks sent to the provider"""
+        result = await session.execute(
+            select(Document.id, Document.content_text).where(Document.id.in_(document_ids))
+        )
+        planned = {doc_id: chunk_text(text or "") for doc_id, text in result.all()}
+        hashes = {content_hash(chunk) for chunks in planned.values() for chunk in chunks}
+
+        known: dict[str, list[float]] = {}
+        if hashes:
+            rows = await session.execute(
+                select(DocumentChunk.content_hash, DocumentChunk.embedding)
+                .where(DocumentChunk.content_hash.in_(hashes), DocumentChunk.embedding.isnot(None))
+                .distinct(DocumentChunk.content_hash)
+            )
+            known = {chunk_hash: list(embedding) for chunk_hash, embedding in rows.all()}
+
+        pending = list(dict.fromkeys(
+            chunk for chunks in planned.values() for chunk in chunks if content_hash(chunk) not in known
+        ))
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            vectors = await self.provider.embed(batch)
+            for chunk, vector in zip(batch, vectors):
+                known[content_hash(chunk)] = vector
+
+        for doc_id, chunks in planned.items():
+            await self._store_chunks(session, doc_id, chunks, known)
+
+        await session.commit()
+        logger.info(f"Embedded {len(planned)} documents, {len(pending)} new chunks")
+        return len(pending)
+
+    async def _store_chunks(self, session: AsyncSession, doc_id, chunks: list[str], known: dict) -> None:
+        existing = {
+            chunk.chunk_index: chunk
+            for chunk in (await session.execute(
+                select(DocumentChunk).where(DocumentChunk.document_id == doc_id)
+            )).scalars()
+        }
+        vectors = []
+        for index, chunk in enumerate(chunks):
+            chunk_hash = content_hash(chunk)
+            vector = known[chunk_hash]
+            vectors.append(vector)
+            row = existing.get(index)
+            if row is None:
+                session.add(DocumentChunk(
+                    document_id=doc_id, chunk_index=index, content=chunk, content_hash=chunk_hash, embedding=vector
+                ))
+            elif row.content_hash != chunk_hash or row.embedding is None:
+                row.content = chunk
+                row.content_hash = chunk_hash
+                row.embedding = vector
+
+        await session.execute(
+            delete(DocumentChunk).where(DocumentChunk.document_id == doc_id, DocumentChunk.chunk_index >= len(chunks))
+        )
+
+        document = await session.get(Document, doc_id)
+        if vectors:
+            mean = [sum(values) / len(vectors) for values in zip(*vectors)]
+            document.content_embedding = normalize(mean)
+        else:
+            document.content_embedding = None
+
+async def enqueue_embedding_backfill(session: AsyncSession, queue, batch_size: int = 50) -> int:
+    """Queue embed_documents jobs for every document with text but no embedding"""
+    result = await session.execute(
+        select(Document.id)
+        .where(Document.content_text.isnot(None), Document.content_embedding.is_(None))
+        .order_by(Document.created_at)
+    )
+    document_ids = [str(doc_id) for doc_id in result.scalars()]
+    for start in range(0, len(document_ids), batch_size):
+        await queue.enqueue(session, "embed_documents", {"document_ids": document_ids[start:start + batch_size]})
+    await session.commit()
+    return len(document_ids)
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+import asyncpg
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import DATABASE_URL
+from app.models.inbox_events import InboxEvent
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "inbox_events"
+KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+RETENTION_HOURS = int(os.getenv("INBOX_EVENTS_RETENTION_HOURS", "72"))
+REPLAY_BATCH = 500
+# Ids are assigned at insert but delivered in commit order, so replays after a
+# gap look this far back and skip events already sent
+REPLAY_OVERLAP = 100
+SEEN_IDS = 1000
+
+async def publish_inbox_event(session: AsyncSession, item_id, status: str) -> None:
+    """Record an inbox status change; listeners are notified when the transaction commits"""
+    event_id = await session.scalar(
+        insert(InboxEvent).values(item_id=item_id, status=status).returning(InboxEvent.id)
+    )
+    payload = json.dumps({"id": event_id, "item_id": str(item_id), "status": status})
+    await session.execute(select(func.pg_notify(CHANNEL, payload)))
+
+async def publish_inbox_events(session: AsyncSession, changes: list[tuple]) -> None:
+    """Record several ``(item_id, status)`` changes with one insert and one notify statement"""
+    if not changes:
+        return
+    result = await session.execute(
+        insert(InboxEvent)
+        .values([{"item_id": item_id, "status": status} for item_id, status in changes])
+        .returning(InboxEvent.id, InboxEvent.item_id, InboxEvent.status)
+    )
+    payloads = [
+        json.dumps({"id": row.id, "item_id": str(row.item_id), "status": row.status})
+        for row in result.all()
+    ]
+    await session.execute(
+        text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+        {"channel": CHANNEL, "payloads": payloads},
+    )
+
+async def latest_event_id(session: AsyncSession) -> int:
+    return await session.scalar(select(func.coalesce(func.max(InboxEvent.id), 0)))
+
+async def events_after(session: AsyncSession, event_id: int, limit: int = REPLAY_BATCH) -> list[dict]:
+    result = await session.execute(
+        select(InboxEvent.id, InboxEvent.item_id, InboxEvent.status)
+        .where(InboxEvent.id > event_id)
+        .order_by(InboxEvent.id)
+        .limit(limit)
+    )
+    return [{"id": row.id, "item_id": str(row.item_id), "status": row.status} for row in result.all()]
+
+async def prune_inbox_events(session: AsyncSession, retention_hours: int = None) -> int:
+    """Delete events older than the retention window; clients further behind reload the list"""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=retention_hours or RETENTION_HOURS)
+    result = await session.execute(delete(InboxEvent).where(InboxEvent.created_at < cutoff))
+    await session.commit()
+    return result.rowcount
+
+# Queued to a subscriber that may have missed events and must replay them from the table
+LAGGED = object()
+
+class Subscription:
+    def __init__(self, max_buffered: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+
+    def push(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.mark_lagged()
+
+    def mark_lagged(self) -> None:
+        # Buffered events are dropped; the replay reads them back from the table
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(LAGGED)
+
+class InboxEventBroker:
+    """Fans inbox NOTIFY messages out to the event streams of this process.
+
+    One dedicated asyncpg connection per process LISTENs while anyone is
+    subscribed, so every uvicorn worker sees events published by any other
+    worker or the job worker. Whenever the listener (re)connects, subscribers
+    are told to replay from the ``inbox_events`` table, which covers anything
+    published while nobody was listening.
+    """
+
+    def __init__(self, dsn: str = None, max_buffered: int = 256):
+        self.dsn = dsn or DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+        self.max_buffered = max_buffered
+        self._subscribers: set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.max_buffered)
+        self._subscribers.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def _dispatch(self, connection, pid, channel, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed {CHANNEL} notification: {payload!r}")
+            return
+        for subscription in list(self._subscribers):
+            subscription.push(event)
+
+    def _mark_lagged(self) -> None:
+        for subscription in list(self._subscribers):
+            subscription.mark_lagged()
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        while self._subscribers:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except Exception as e:
+                logger.error(f"Inbox event listener failed to connect: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+
+            delay = 1.0
+            lost = asyncio.Event()
+            connection.add_termination_listener(lambda _: lost.set())
+            try:
+                await connection.add_listener(CHANNEL, self._dispatch)
+                self._mark_lagged()
+                while self._subscribers and not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+            except Exception as e:
+                logger.error(f"Inbox event listener failed: {str(e)}")
+            finally:
+                if not connection.is_closed():
+                    await connection.close()
+            if self._subscribers:
+                logger.warning("Inbox event listener disconnected; reconnecting")
+
+    async def close(self) -> None:
+        self._subscribers.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+inbox_event_broker = InboxEventBroker()
+
+def _remember(seen: dict, event_id: int) -> None:
+    seen[event_id] = None
+    while len(seen) > SEEN_IDS:
+        seen.pop(next(iter(seen)))
+
+def format_event(event: dict) -> str:
+    return f"id: {event['id']}\nevent: inbox\ndata: {json.dumps(event)}\n\n"
+
+async def stream_inbox_events(
+    broker: InboxEventBroker,
+    session_factory,
+    last_event_id: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """Server-sent events for inbox status changes after ``last_event_id``.
+
+    Without ``last_event_id`` only changes from now on are sent. Database
+    sessions are opened only to replay, never held for the stream's lifetime.
+    """
+    subscription = broker.subscribe()
+    seen: dict[int, None] = {}
+    try:
+        async with session_factory() as session:
+            if last_event_id is None:
+                last_event_id = await latest_event_id(session)
+        # Never replay what precedes the client's starting point
+        floor = replay_from = last_event_id
+        yield "retry: 3000\n\n"
+
+        while True:
+            if replay_from is not None:
+                while True:
+                    async with session_factory() as session:
+                        events = await events_after(session, replay_from)
+                    for event in events:
+                        if event["id"] not in seen:
+                            yield format_event(event)
+                            _remember(seen, event["id"])
+                    if len(events) < REPLAY_BATCH:
+                        break
+                    replay_from = events[-1]["id"]
+                replay_from = None
+
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if event is LAGGED:
+                replay_from = max(floor, max(seen, default=floor) - REPLAY_OVERLAP)
+                continue
+            if event["id"] in seen:
+                continue
+            yield format_event(event)
+            _remember(seen, event["id"])
+    finally:
+        broker.unsubscribe(subscription)
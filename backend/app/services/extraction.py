@@ -1,57 +1,243 @@
+import asyncio
 import os
 import json
-from pypdf import PdfReader
-from openai import OpenAI
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Union
 import logging
+from app.services.process_pool import ProcessPool
+from app.services.llm import get_llm_client, count_tokens, split_by_tokens
+from app.services.analysis_cache import AnalysisCache
+from app.services.ocr import OcrService, IMAGE_EXTENSIONS
+from app.services.pdf_engines import get_engine, select_engine
+from app.services.text_store import join_pages
+from app.core.metrics import PAGES_EXTRACTED
+from app.core.profiling import run_in_pool
 
 logger = logging.getLogger(__name__)
 
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
+# Bump whenever SYSTEM_PROMPT or the result schema changes to invalidate cached analyses
+PROMPT_VERSION = "2"
+# Document text sent per LLM request; longer documents are analyzed in chunks
+LLM_CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", "6000"))
+# Invoices up to this many pages are analyzed from their first and last page only
+INVOICE_FAST_PATH_MAX_PAGES = int(os.getenv("LLM_INVOICE_FAST_PATH_MAX_PAGES", "10"))
+INVOICE_PATTERN = re.compile(r"\b(invoice|rechnung|facture|factura)\b", re.IGNORECASE)
+# Pages with less extracted text than this are treated as scans and OCR'd
+OCR_MIN_TEXT_CHARS = int(os.getenv("OCR_MIN_TEXT_CHARS", "20"))
+
+SYSTEM_PROMPT = """You are a legal AI. Extract the following fields from the document text:
+- title: The document title or subject
+- document_date: Date in YYYY-MM-DD format (extract from any date mentions) or null if none found
+- counterparty: The other party involved or null if none found
+- total_value: Numeric monetary amount (e.g., 50000.00) or null if none found
+- summary: Brief summary of the document
+- category: One of: invoice, contract, letter
+
+Return only valid JSON with these fields. Use null for missing values, not placeholder text."""
+
+CHUNK_PROMPT = """
+
+The text is part {part} of {parts} of a longer document. Extract only what this part states and use null for everything else."""
+
+extraction_pool = ProcessPool(
+    max_workers=int(os.getenv("EXTRACTION_POOL_SIZE", "0")) or None,
+    max_tasks_per_child=int(os.getenv("EXTRACTION_MAX_TASKS_PER_CHILD", "0")) or None,
+    name="extraction",
+)
+
+def _extract_pdf_pages(file_path: str, engine: str) -> list[str]:
+    """Parse a PDF and return the text layer of each page; runs inside an extraction pool process"""
+    try:
+        return get_engine(engine).extract_pages(file_path)
+    except ImportError as e:
+        # Installed but not importable, e.g. a native library is missing
+        if engine == "pypdf":
+            raise
+        logger.warning(f"PDF engine '{engine}' failed to import, falling back to pypdf: {str(e)}")
+        return get_engine("pypdf").extract_pages(file_path)
+
+def select_pages_for_analysis(pages: list[str]) -> list[str]:
+    """Pages worth sending to the LLM.
+
+    Header fields and totals of an invoice are on its first and last page,
+    so short invoices skip the line items in between.
+    """
+    if 2 < len(pages) <= INVOICE_FAST_PATH_MAX_PAGES and INVOICE_PATTERN.search(pages[0][:1000]):
+        return [pages[0], pages[-1]]
+    return pages
+
+def split_into_chunks(pages: list[str], max_tokens: int) -> list[str]:
+    """Pack pages into chunks of at most ``max_tokens``, splitting oversized pages by line"""
+    pieces = []
+    for page in pages:
+        if not page:
+            continue
+        if count_tokens(page, LLM_MODEL) <= max_tokens:
+            pieces.append(page)
+            continue
+        for line in page.split("\n"):
+            if count_tokens(line, LLM_MODEL) <= max_tokens:
+                pieces.append(line)
+            else:
+                pieces.extend(split_by_tokens(line, max_tokens, LLM_MODEL))
+
+    chunks = []
+    current = []
+    current_tokens = 0
+    for piece in pieces:
+        tokens = count_tokens(piece, LLM_MODEL)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current = []
+            current_tokens = 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def _most_common(values: list):
+    """Most frequent value, earliest first on ties"""
+    counts = Counter(json.dumps(value, sort_keys=True) for value in values)
+    best = max(counts.values())
+    return next(value for value in values if counts[json.dumps(value, sort_keys=True)] == best)
+
+def merge_results(results: list[dict]) -> dict:
+    """Combine per-chunk extractions, given in document order, into one result"""
+    def present(field: str) -> list:
+        return [result[field] for result in results if result.get(field) not in (None, "")]
+
+    titles, dates, counterparties, totals, summaries, categories = (
+        present(field) for field in ("title", "document_date", "counterparty", "total_value", "summary", "category")
+    )
+    return {
+        "title": titles[0] if titles else None,
+        "document_date": dates[0] if dates else None,
+        "counterparty": _most_common(counterparties) if counterparties else None,
+        # Totals are stated at the end of a document
+        "total_value": totals[-1] if totals else None,
+        "summary": " ".join(str(summary) for summary in summaries) or None,
+        "category": _most_common(categories) if categories else None,
+    }
+
 class DocumentExtractionService:
-    def __init__(self):
+    def __init__(
+        self,
+        pool: ProcessPool = None,
+        timeout: float = None,
+        cache: AnalysisCache = None,
+        ocr: OcrService = None,
+        chunk_tokens: int = None,
+    ):
+        self.pool = pool or extraction_pool
+        self.chunk_tokens = chunk_tokens or LLM_CHUNK_TOKENS
+        if ocr is None and os.getenv("OCR_ENABLED", "true").lower() == "true":
+            ocr = OcrService()
+        self.ocr = ocr
+        self.timeout = timeout or float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "120"))
+        if cache is None and os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true":
+            cache = AnalysisCache()
+        self.cache = cache
+
         api_key = os.getenv("OPENAI_API_KEY")
         if api_key and api_key != "your-openai-api-key-here":
-            self.client = OpenAI(api_key=api_key)
+            self.client = get_llm_client(api_key)
         else:
             self.client = None
 
-    async def extract_text(self, file_path: str) -> str:
-        """Extract text from PDF file"""
+    async def extract_pages(self, file_path: str, content_hash: str = None) -> list[str]:
+        """Extract the text of each page.
+
+        The PDF text layer is parsed in the extraction process pool by the
+        engine ``select_engine`` picks for the file size; pages without a
+        usable text layer, and image files, go through OCR when available.
+        ``content_hash`` of the file keys the OCR cache.
+        """
+        ocr_available = self.ocr is not None and self.ocr.available
+        if Path(file_path).suffix.lower() in IMAGE_EXTENSIONS:
+            if not ocr_available:
+                raise ValueError(f"Cannot extract text from image {file_path} without OCR")
+            pages = [await self.ocr.ocr_image(file_path, content_hash)]
+            PAGES_EXTRACTED.labels("ocr").inc()
+            return pages
+
         try:
-            reader = PdfReader(file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            engine = select_engine(os.path.getsize(file_path))
+            pages = await run_in_pool(self.pool, _extract_pdf_pages, file_path, engine, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Text extraction from {file_path} timed out after {self.timeout}s")
+            raise
         except Exception as e:
             logger.error(f"Failed to extract text from {file_path}: {str(e)}")
             raise
 
-    async def analyze_with_llm(self, text: str) -> dict:
-        """Analyze text with GPT-4o and return structured JSON"""
-        try:
-            system_prompt = """You are a legal AI. Extract the following fields from the document text:
-- title: The document title or subject
-- document_date: Date in YYYY-MM-DD format (extract from any date mentions) or null if none found
-- counterparty: The other party involved or null if none found
-- total_value: Numeric monetary amount (e.g., 50000.00) or null if none found
-- summary: Brief summary of the document
-- category: One of: invoice, contract, letter
+        scanned = [number for number, text in enumerate(pages) if len(text) < OCR_MIN_TEXT_CHARS]
+        if scanned and ocr_available:
+            logger.info(f"Running OCR on {len(scanned)} of {len(pages)} pages of {file_path}")
+            for number, text in (await self.ocr.ocr_pdf_pages(file_path, scanned, content_hash)).items():
+                if len(text) > len(pages[number]):
+                    pages[number] = text
+        PAGES_EXTRACTED.labels(engine).inc(len(pages))
+        return pages
 
-Return only valid JSON with these fields. Use null for missing values, not placeholder text."""
+    async def extract_text(self, file_path: str) -> str:
+        """Extract the full text of a PDF or image"""
+        return join_pages(await self.extract_pages(file_path))
 
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Document text:\n{text}"}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
+    async def analyze_with_llm(self, text: Union[str, list[str]], force: bool = False) -> dict:
+        """Analyze a document's text, or its per-page texts, with the LLM and return structured JSON.
 
-            result = json.loads(response.choices[0].message.content)
-            return result
+        Short invoices are analyzed from their first and last page. Text over
+        ``chunk_tokens`` is split into chunks that are analyzed concurrently,
+        within the LLM client's concurrency and rate limits, and merged.
+        Results are cached by content hash; ``force`` skips the cache lookup
+        and overwrites the cached entry.
+        """
+        pages = select_pages_for_analysis([text] if isinstance(text, str) else text)
+        text = join_pages(pages)
+        cache_key = AnalysisCache.make_key(text, LLM_MODEL, PROMPT_VERSION)
+        if self.cache is not None and not force:
+            try:
+                cached = await self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            except Exception as e:
+                logger.warning(f"LLM analysis cache lookup failed: {str(e)}")
+
+        try:
+            chunks = split_into_chunks(pages, self.chunk_tokens)
+            if len(chunks) <= 1:
+                result = await self._analyze_chunk(text)
+            else:
+                logger.info(f"Analyzing document in {len(chunks)} chunks")
+                partials = await asyncio.gather(*(
+                    self._analyze_chunk(chunk, CHUNK_PROMPT.format(part=part, parts=len(chunks)))
+                    for part, chunk in enumerate(chunks, start=1)
+                ))
+                result = merge_results(partials)
 
         except Exception as e:
             logger.error(f"Failed to analyze text with LLM: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+        if self.cache is not None:
+            try:
+                await self.cache.set(cache_key, LLM_MODEL, PROMPT_VERSION, result)
+            except Exception as e:
+                logger.warning(f"Failed to store LLM analysis in cache: {str(e)}")
+        return result
+
+    async def _analyze_chunk(self, text: str, prompt_suffix: str = "") -> dict:
+        response = await self.client.chat_completion(
+            model=LLM_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT + prompt_suffix},
+                {"role": "user", "content": f"Document text:\n{text}"}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1
+        )
+        return json.loads(response.choices[0].message.content)
\ No newline at end of file
@@ -0,0 +1,236 @@
+import asyncio
+import functools
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from openai import AsyncOpenAI, APIStatusError, APIConnectionError, APITimeoutError
+from app.core.metrics import LLM_REQUEST_DURATION, LLM_REQUESTS, LLM_TOKENS
+import logging
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting; about four characters per token"""
+    return max(1, len(text) // 4)
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # Encodings are downloaded on first use and may be unreachable offline
+        logger.warning(f"tiktoken encoding for {model} unavailable, estimating tokens: {str(e)}")
+        return None
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """Token count from the model's tokenizer when tiktoken is installed, else an estimate"""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def split_by_tokens(text: str, max_tokens: int, model: str = "gpt-4o") -> list[str]:
+    """Cut text into pieces of at most ``max_tokens`` tokens, by the model's tokenizer when available"""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        step = max_tokens * 4
+        return [text[start:start + step] for start in range(0, len(text), step)]
+    tokens = encoding.encode(text, disallowed_special=())
+    pieces = []
+    start = 0
+    while start < len(tokens):
+        end = min(start + max_tokens, len(tokens))
+        # A character can span up to four byte tokens; end the piece before one that is cut off
+        for cut in range(end, max(start, end - 3), -1):
+            try:
+                piece = encoding.decode_bytes(tokens[start:cut]).decode("utf-8")
+                end = cut
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            piece = encoding.decode_bytes(tokens[start:end]).decode("utf-8", errors="replace")
+        pieces.append(piece)
+        start = end
+    return pieces
+
+def parse_retry_after(headers) -> Optional[float]:
+    """Return the server-requested delay in seconds, if any"""
+    if headers is None:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Async token bucket refilled continuously at ``rate`` units per second.
+
+    Requests larger than the bucket capacity are clamped to the capacity so
+    they wait for a full bucket instead of forever. Balances may go negative
+    after ``adjust`` so underestimated requests are paid back by later callers.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        amount = min(amount, self.capacity)
+        # Serialize waiters so a large request isn't starved by small ones
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    def adjust(self, delta: float) -> None:
+        """Charge (positive) or refund (negative) tokens after the fact"""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - delta)
+
+class LLMClient:
+    """Async OpenAI client with process-wide rate limiting and retries.
+
+    Every call passes through a concurrency semaphore plus request-per-minute
+    and token-per-minute buckets. Limits are per process, so divide the
+    account's limits across the number of worker processes. 429 and 5xx
+    responses are retried with jittered exponential backoff; a ``Retry-After``
+    header pauses all callers of this client until it has passed.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = None,
+        max_concurrency: int = None,
+        requests_per_minute: int = None,
+        tokens_per_minute: int = None,
+        max_retries: int = None,
+        backoff_base: float = None,
+        backoff_max: float = None,
+        timeout: float = None,
+    ):
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_MAX_RETRIES", "5"))
+        self.backoff_base = backoff_base or float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1"))
+        self.backoff_max = backoff_max or float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "60"))
+
+        requests_per_minute = requests_per_minute or int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+        tokens_per_minute = tokens_per_minute or int(os.getenv("LLM_TOKENS_PER_MINUTE", "30000"))
+        self.request_bucket = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self.token_bucket = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        self._semaphore = asyncio.Semaphore(max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+        self._resume_at = 0.0
+
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url or os.getenv("OPENAI_BASE_URL") or None,
+            timeout=timeout or float(os.getenv("LLM_TIMEOUT_SECONDS", "120")),
+            # Retries are handled here so they respect the shared limits
+            max_retries=0,
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    async def _wait_for_pause(self) -> None:
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def chat_completion(self, **kwargs):
+        """Call ``chat.completions.create`` within the rate limits"""
+        prompt = "".join(str(m.get("content", "")) for m in kwargs.get("messages", []))
+        estimated = estimate_tokens(prompt) + kwargs.get("max_tokens", 1000)
+        return await self._request(self._client.chat.completions.create, "chat", estimated, **kwargs)
+
+    async def create_embeddings(self, **kwargs):
+        """Call ``embeddings.create`` within the rate limits"""
+        inputs = kwargs.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        estimated = sum(estimate_tokens(text) for text in inputs)
+        return await self._request(self._client.embeddings.create, "embeddings", estimated, **kwargs)
+
+    async def _request(self, create, operation: str, estimated: int, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_pause()
+            await self.request_bucket.acquire()
+            await self.token_bucket.acquire(estimated)
+
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    try:
+                        response = await create(**kwargs)
+                    except Exception:
+                        LLM_REQUESTS.labels(operation, "error").inc()
+                        raise
+                    finally:
+                        LLM_REQUEST_DURATION.labels(operation).observe(time.perf_counter() - started)
+            except APIStatusError as e:
+                # A rejected request did not consume provider tokens
+                self.token_bucket.adjust(-estimated)
+                if e.status_code not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                    raise
+                retry_after = parse_retry_after(e.response.headers)
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                if retry_after is not None:
+                    self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+                logger.warning(f"LLM request failed with {e.status_code}, retrying in {delay:.2f}s")
+            except (APIConnectionError, APITimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"LLM request failed ({type(e).__name__}), retrying in {delay:.2f}s")
+            else:
+                LLM_REQUESTS.labels(operation, "ok").inc()
+                usage = getattr(response, "usage", None)
+                if usage is not None:
+                    LLM_TOKENS.labels(operation, "prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+                    LLM_TOKENS.labels(operation, "completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+                if usage is not None and usage.total_tokens:
+                    self.token_bucket.adjust(usage.total_tokens - estimated)
+                return response
+
+            await asyncio.sleep(delay)
+
+@functools.lru_cache(maxsize=None)
+def get_llm_client(api_key: str) -> LLMClient:
+    """Process-wide client so all callers share one set of limits"""
+    return LLMClient(api_key=api_key)
@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+from functools import cached_property
+from pathlib import Path
+from typing import Awaitable, Callable, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".webp"}
+
+class OcrError(Exception):
+    pass
+
+class OcrService:
+    """OCR for scanned pages using locally installed poppler and Tesseract.
+
+    PDF pages are rasterized with ``pdftoppm`` and recognized with
+    ``tesseract``. Both are separate processes, so up to ``concurrency``
+    pages are processed in parallel without touching the event loop, and a
+    page exceeding ``page_timeout`` has its processes killed without
+    affecting the others. Recognized text is cached on disk, keyed by the
+    hash of the source file, the page, the dpi and the OCR languages, and
+    looked up before a page is rendered.
+    """
+
+    def __init__(
+        self,
+        languages: str = None,
+        dpi: int = None,
+        concurrency: int = None,
+        page_timeout: float = None,
+        cache_dir: str = None,
+    ):
+        self.languages = languages or os.getenv("OCR_LANGUAGES", "eng")
+        self.dpi = dpi or int(os.getenv("OCR_DPI", "300"))
+        self.concurrency = concurrency or int(os.getenv("OCR_CONCURRENCY", "0")) or os.cpu_count() or 1
+        self.page_timeout = page_timeout or float(os.getenv("OCR_PAGE_TIMEOUT_SECONDS", "60"))
+        self.cache_dir = Path(cache_dir or os.getenv("OCR_CACHE_DIR", "byro_data/ocr_cache"))
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    @cached_property
+    def available(self) -> bool:
+        missing = [binary for binary in ("pdftoppm", "tesseract") if shutil.which(binary) is None]
+        if missing:
+            logger.warning(f"OCR disabled, missing binaries: {', '.join(missing)}")
+        return not missing
+
+    async def ocr_pdf_pages(self, file_path: str, page_numbers: Sequence[int], content_hash: str = None) -> dict[int, str]:
+        """OCR the given zero-based pages of a PDF concurrently.
+
+        ``content_hash`` is the SHA-256 of the file; it is computed when not
+        given. Pages that fail or time out map to an empty string.
+        """
+        content_hash = content_hash or await asyncio.to_thread(_file_hash, file_path)
+        texts = await asyncio.gather(*(
+            self._guarded(f"{file_path} page {number}", self._ocr_pdf_page, file_path, content_hash, number)
+            for number in page_numbers
+        ))
+        return dict(zip(page_numbers, texts))
+
+    async def ocr_image(self, file_path: str, content_hash: str = None) -> str:
+        return await self._guarded(file_path, self._ocr_image, file_path, content_hash)
+
+    async def _guarded(self, label: str, fn, *args) -> str:
+        async with self._semaphore:
+            try:
+                return await asyncio.wait_for(fn(*args), self.page_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"OCR of {label} timed out after {self.page_timeout}s")
+            except Exception as e:
+                logger.warning(f"OCR of {label} failed: {str(e)}")
+            return ""
+
+    async def _ocr_pdf_page(self, file_path: str, content_hash: str, page_number: int) -> str:
+        async def render_and_recognize() -> str:
+            with tempfile.TemporaryDirectory(prefix="byro-ocr-") as workdir:
+                return await self._recognize(await self._render_pdf_page(file_path, page_number, Path(workdir)))
+
+        # Checked before rendering, so a cached page costs neither pdftoppm nor Tesseract
+        key = self._cache_key(content_hash, str(page_number), str(self.dpi))
+        return await self._cached(key, render_and_recognize)
+
+    async def _ocr_image(self, file_path: str, content_hash: str = None) -> str:
+        content_hash = content_hash or await asyncio.to_thread(_file_hash, file_path)
+        return await self._cached(self._cache_key(content_hash, "image"), lambda: self._recognize(Path(file_path)))
+
+    async def _render_pdf_page(self, file_path: str, page_number: int, workdir: Path) -> Path:
+        page = str(page_number + 1)
+        output = workdir / f"page-{page}"
+        await self._run([
+            "pdftoppm", "-f", page, "-l", page, "-r", str(self.dpi), "-gray", "-png", "-singlefile",
+            file_path, str(output),
+        ])
+        return output.with_suffix(".png")
+
+    async def _recognize(self, image_path: Path) -> str:
+        stdout = await self._run(["tesseract", str(image_path), "stdout", "-l", self.languages])
+        return stdout.decode("utf-8", errors="replace").strip()
+
+    async def _cached(self, key: str, recognize: Callable[[], Awaitable[str]]) -> str:
+        cache_path = self.cache_dir / key[:2] / f"{key}.txt"
+        cached = await asyncio.to_thread(_read_text, cache_path)
+        if cached is not None:
+            return cached
+        text = await recognize()
+        try:
+            await asyncio.to_thread(_write_text, cache_path, text)
+        except OSError as e:
+            logger.warning(f"Failed to store OCR result in cache: {str(e)}")
+        return text
+
+    def _cache_key(self, content_hash: str, *parts: str) -> str:
+        """Cache key of a source file, the part of it recognized and the OCR languages"""
+        return hashlib.sha256("\0".join((content_hash, *parts, self.languages)).encode("utf-8")).hexdigest()
+
+    async def _run(self, command: list[str]) -> bytes:
+        # One thread per Tesseract process; parallelism comes from running pages side by side
+        return await run_command(command, env={**os.environ, "OMP_THREAD_LIMIT": "1"})
+
+async def run_command(command: list[str], env: dict = None) -> bytes:
+    """Run a command and return its stdout, killing it if the caller is cancelled"""
+    process = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, env=env
+    )
+    try:
+        stdout, stderr = await process.communicate()
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    if process.returncode != 0:
+        raise OcrError(f"{command[0]} exited with {process.returncode}: {stderr.decode(errors='replace').strip()}")
+    return stdout
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_text(path: Path):
+    try:
+        return path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+def _write_text(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique temporary name, as the same page of a file may be recognized concurrently
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+            temp_file.write(text)
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
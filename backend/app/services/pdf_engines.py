@@ -0,0 +1,103 @@
+import importlib.util
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Engine used when PDF_ENGINE is "auto": the first one installed.
+# pypdf is required; pdfium and pdfminer come from requirements-pdf.txt
+AUTO_ENGINE_ORDER = ("pdfium", "pypdf")
+PDF_LARGE_FILE_BYTES = int(os.getenv("PDF_LARGE_FILE_BYTES", str(10 * 1024 * 1024)))
+
+class PdfEngine(ABC):
+    """Extracts the text layer of a PDF, one string per page"""
+
+    name = "base"
+    module = None
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec(cls.module) is not None
+
+    @abstractmethod
+    def extract_pages(self, file_path: str) -> list[str]:
+        ...
+
+class PypdfEngine(PdfEngine):
+    """Pure Python; always installed, and the fallback for the others"""
+
+    name = "pypdf"
+    module = "pypdf"
+
+    def extract_pages(self, file_path: str) -> list[str]:
+        from pypdf import PdfReader
+
+        reader = PdfReader(file_path)
+        return [(page.extract_text() or "").strip() for page in reader.pages]
+
+class PdfminerEngine(PdfEngine):
+    """Pure Python with layout analysis; slowest, best reading order on multi-column pages"""
+
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def extract_pages(self, file_path: str) -> list[str]:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+
+        return [
+            "".join(element.get_text() for element in page if isinstance(element, LTTextContainer)).strip()
+            for page in extract_pages(file_path)
+        ]
+
+class PdfiumEngine(PdfEngine):
+    """Bindings to Chromium's PDFium; fastest"""
+
+    name = "pdfium"
+    module = "pypdfium2"
+
+    def extract_pages(self, file_path: str) -> list[str]:
+        import pypdfium2
+
+        document = pypdfium2.PdfDocument(file_path)
+        try:
+            pages = []
+            for page in document:
+                text_page = page.get_textpage()
+                # PDFium ends lines with CRLF
+                pages.append(text_page.get_text_range().replace("\r\n", "\n").strip())
+                text_page.close()
+                page.close()
+            return pages
+        finally:
+            document.close()
+
+ENGINES: dict[str, type[PdfEngine]] = {
+    engine.name: engine for engine in (PypdfEngine, PdfminerEngine, PdfiumEngine)
+}
+
+def available_engines() -> list[str]:
+    return [name for name, engine in ENGINES.items() if engine.available()]
+
+def get_engine(name: str) -> PdfEngine:
+    return ENGINES[name]()
+
+def select_engine(file_size: int, name: Optional[str] = None) -> str:
+    """Name of the engine to use for a file of ``file_size`` bytes.
+
+    ``PDF_ENGINE`` picks the engine (default ``auto``); files of at least
+    ``PDF_LARGE_FILE_BYTES`` use ``PDF_ENGINE_LARGE`` instead when set. An
+    engine that is unknown or not installed falls back to ``auto``.
+    """
+    if name is None:
+        name = os.getenv("PDF_ENGINE", "auto")
+        if file_size >= PDF_LARGE_FILE_BYTES:
+            name = os.getenv("PDF_ENGINE_LARGE", name)
+    if name != "auto":
+        engine = ENGINES.get(name)
+        if engine is not None and engine.available():
+            return name
+        logger.warning(f"PDF engine '{name}' is not available, falling back to auto")
+    return next(name for name in AUTO_ENGINE_ORDER if ENGINES[name].available())
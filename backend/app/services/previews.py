@@ -0,0 +1,87 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from functools import cached_property
+from pathlib import Path
+from app.services.ocr import run_command
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PreviewService:
+    """Low-resolution page thumbnails rendered with ``pdftoppm``.
+
+    Thumbnails live in a disk cache keyed by the source file's content hash,
+    page number and width, so they never go stale and can be served with
+    immutable caching. Rendering runs in separate processes, at most
+    ``concurrency`` pages at a time.
+    """
+
+    def __init__(self, cache_dir: str = None, width: int = None, max_pages: int = None, concurrency: int = None):
+        self.cache_dir = Path(cache_dir or os.getenv("PREVIEW_CACHE_DIR", "byro_data/previews"))
+        self.width = width or int(os.getenv("PREVIEW_WIDTH", "320"))
+        self.max_pages = max_pages or int(os.getenv("PREVIEW_MAX_PAGES", "50"))
+        self.concurrency = concurrency or int(os.getenv("PREVIEW_CONCURRENCY", "2"))
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    @cached_property
+    def available(self) -> bool:
+        if shutil.which("pdftoppm") is None:
+            logger.warning("Page previews disabled, missing binary: pdftoppm")
+            return False
+        return True
+
+    def thumbnail_path(self, content_hash: str, page: int) -> Path:
+        """Cache location of the thumbnail of a one-based page"""
+        return self.cache_dir / content_hash[:2] / content_hash / f"{self.width}-{page}.jpg"
+
+    async def render_thumbnails(self, file_path: str, content_hash: str, page_count: int) -> int:
+        """Render the thumbnails of the first ``max_pages`` pages that are not cached yet.
+
+        Returns the number of pages rendered; pages that fail are logged and skipped.
+        """
+        if not self.available:
+            return 0
+        pages = [
+            page for page in range(1, min(page_count, self.max_pages) + 1)
+            if not self.thumbnail_path(content_hash, page).exists()
+        ]
+        results = await asyncio.gather(
+            *(self.render_thumbnail(file_path, content_hash, page) for page in pages),
+            return_exceptions=True,
+        )
+        for page, result in zip(pages, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Thumbnail of {file_path} page {page} failed: {str(result)}")
+        rendered = sum(1 for result in results if not isinstance(result, Exception))
+        logger.info(f"Rendered {rendered} thumbnails for {content_hash}")
+        return rendered
+
+    async def render_thumbnail(self, file_path: str, content_hash: str, page: int) -> Path:
+        """Render (or return the cached) thumbnail of a one-based page"""
+        target = self.thumbnail_path(content_hash, page)
+        if target.exists():
+            return target
+        async with self._semaphore:
+            with tempfile.TemporaryDirectory(prefix="byro-preview-") as workdir:
+                output = Path(workdir) / "page"
+                await run_command([
+                    "pdftoppm", "-f", str(page), "-l", str(page), "-scale-to", str(self.width),
+                    "-jpeg", "-jpegopt", "quality=75", "-singlefile", file_path, str(output),
+                ])
+                await asyncio.to_thread(_move_into_cache, output.with_suffix(".jpg"), target)
+        return target
+
+def _move_into_cache(source: Path, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # Move next to the target first so the final rename is atomic; the temporary
+    # name is unique, as concurrent requests may render the same page
+    fd, temp_path = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.move(str(source), temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,164 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a killed or retired worker process to exit
+_JOIN_TIMEOUT = 5
+
+def _serve(conn) -> None:
+    """Worker process loop: run each received call and send back its outcome"""
+    while True:
+        try:
+            fn, args = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            outcome = (True, fn(*args))
+        except BaseException as e:
+            outcome = (False, e)
+        try:
+            conn.send(outcome)
+        except Exception as e:
+            # Unpicklable result or exception
+            conn.send((False, RuntimeError(f"Could not return result: {e!r}")))
+
+class _Worker:
+    """One worker process and the pipe it receives calls on"""
+
+    def __init__(self, context, name: str):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child_conn,), name=name, daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def call(self, fn: Callable[..., Any], args: tuple) -> tuple[bool, Any]:
+        self.conn.send((fn, args))
+        return self.conn.recv()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(_JOIN_TIMEOUT)
+        self.conn.close()
+
+    def retire(self) -> None:
+        # The worker exits once its pipe closes
+        self.conn.close()
+        self.process.join(_JOIN_TIMEOUT)
+        if self.process.is_alive():
+            self.process.kill()
+
+class ProcessPool:
+    """Bounded process pool for CPU-bound work called from async code.
+
+    Each task is sent to one worker process, spawned on demand, and a thread
+    waits for its result. A task that outlives its timeout (or whose caller
+    is cancelled) cannot be interrupted in place, so only its own worker is
+    killed and replaced; tasks on other workers carry on untouched. A worker
+    that dies mid-task raises ``BrokenProcessPool`` for that task alone.
+    """
+
+    def __init__(self, max_workers: int = None, max_tasks_per_child: int = None, name: str = "pool"):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_tasks_per_child = max_tasks_per_child
+        self.name = name
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: list[_Worker] = []
+        self._workers: set[_Worker] = set()
+        self._waiters: list[asyncio.Future] = []
+        self._starting = 0
+        self._lock = threading.Lock()
+
+    async def _acquire(self) -> _Worker:
+        while True:
+            with self._lock:
+                if self._idle:
+                    return self._idle.pop()
+                spawn = len(self._workers) + self._starting < self.max_workers
+                if spawn:
+                    self._starting += 1
+                else:
+                    waiter = asyncio.get_running_loop().create_future()
+                    self._waiters.append(waiter)
+            if spawn:
+                try:
+                    worker = await asyncio.to_thread(_Worker, self._context, f"{self.name}-worker")
+                finally:
+                    with self._lock:
+                        self._starting -= 1
+                with self._lock:
+                    self._workers.add(worker)
+                return worker
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    elif waiter.done():
+                        # Pass on the wake-up this waiter will not use
+                        self._wake_one()
+                raise
+
+    def _wake_one(self) -> None:
+        """Wake the longest waiting caller; called with the lock held"""
+        while self._waiters:
+            waiter = self._waiters.pop(0)
+            if not waiter.done():
+                waiter.get_loop().call_soon_threadsafe(_set_waiter, waiter)
+                return
+
+    def _release(self, worker: _Worker, healthy: bool) -> None:
+        worker.tasks += 1
+        retire = not healthy or (self.max_tasks_per_child and worker.tasks >= self.max_tasks_per_child)
+        with self._lock:
+            if retire:
+                self._workers.discard(worker)
+            else:
+                self._idle.append(worker)
+            self._wake_one()
+        if not healthy:
+            logger.warning(f"Killing {self.name} worker process {worker.process.pid}")
+            _reap(worker.kill)
+        elif retire:
+            _reap(worker.retire)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: float = None) -> Any:
+        """Run ``fn(*args)`` in the pool and wait at most ``timeout`` seconds"""
+        worker = await self._acquire()
+        healthy = False
+        try:
+            ok, value = await asyncio.wait_for(asyncio.to_thread(worker.call, fn, args), timeout)
+            healthy = True
+        except asyncio.TimeoutError:
+            # A subclass of OSError since Python 3.11
+            raise
+        except (EOFError, OSError) as e:
+            raise BrokenProcessPool(f"{self.name} worker process died: {e!r}") from e
+        finally:
+            self._release(worker, healthy)
+        if not ok:
+            raise value
+        return value
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle.clear()
+        for worker in workers:
+            worker.kill()
+
+def _reap(stop: Callable[[], None]) -> None:
+    """Stop a worker from a short-lived thread, as joining its process may block for seconds"""
+    threading.Thread(target=stop, name="process-pool-reaper", daemon=True).start()
+
+def _set_waiter(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
\ No newline at end of file
@@ -0,0 +1,131 @@
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.jobs import Job
+import logging
+
+logger = logging.getLogger(__name__)
+
+class JobQueue:
+    """Postgres-backed job queue.
+
+    Jobs are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so any number of
+    workers can poll the same table without handing out a job twice. A claimed
+    job carries a lease; if the worker dies before finishing, the job becomes
+    claimable again once the lease expires.
+    """
+
+    def __init__(
+        self,
+        lease_seconds: int = None,
+        max_attempts: int = None,
+        backoff_base: float = None,
+        backoff_max: float = None,
+    ):
+        self.lease_seconds = lease_seconds or int(os.getenv("JOB_LEASE_SECONDS", "300"))
+        self.max_attempts = max_attempts or int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+        self.backoff_base = backoff_base or float(os.getenv("JOB_BACKOFF_BASE_SECONDS", "5"))
+        self.backoff_max = backoff_max or float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "600"))
+
+    async def enqueue(
+        self,
+        session: AsyncSession,
+        kind: str,
+        payload: dict,
+        run_after: Optional[datetime] = None,
+    ) -> Job:
+        """Add a job to the session; it becomes visible when the caller commits"""
+        job = Job(
+            kind=kind,
+            payload=payload,
+            status="queued",
+            max_attempts=self.max_attempts,
+        )
+        if run_after is not None:
+            job.run_after = run_after
+        session.add(job)
+        await session.flush()
+        return job
+
+    async def claim(self, session: AsyncSession, worker_id: str) -> Optional[Job]:
+        """Claim the next runnable job, including running jobs whose lease expired"""
+        now = datetime.now(timezone.utc)
+        result = await session.execute(
+            select(Job)
+            .where(
+                or_(
+                    and_(Job.status == "queued", Job.run_after <= now),
+                    and_(Job.status == "running", Job.locked_until < now),
+                )
+            )
+            .order_by(Job.run_after)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = result.scalars().first()
+        if job is None:
+            await session.rollback()
+            return None
+
+        if job.status == "running":
+            logger.warning(f"Reclaiming job {job.id} after lease held by {job.locked_by} expired")
+
+        job.status = "running"
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_until = now + timedelta(seconds=self.lease_seconds)
+        await session.commit()
+        return job
+
+    async def extend_lease(self, session: AsyncSession, job_id: uuid.UUID, worker_id: str) -> bool:
+        """Push out the lease of a job this worker still holds"""
+        result = await session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == "running")
+            .values(locked_until=datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds))
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+    async def complete(self, session: AsyncSession, job_id: uuid.UUID) -> None:
+        """Mark a job as finished"""
+        await session.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(status="done", locked_by=None, locked_until=None, last_error=None)
+        )
+        await session.commit()
+
+    async def fail(self, session: AsyncSession, job: Job, error: str) -> bool:
+        """Record a failed attempt and reschedule with backoff.
+
+        Returns True if the job will be retried, False if it has used up its
+        attempts and was marked as failed.
+        """
+        retry = job.attempts < job.max_attempts
+        values = {"locked_by": None, "locked_until": None, "last_error": error}
+        if retry:
+            delay = self.backoff_delay(job.attempts)
+            values["status"] = "queued"
+            values["run_after"] = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed, retrying in {delay:.1f}s: {error}")
+        else:
+            values["status"] = "failed"
+            logger.error(f"Job {job.id} ({job.kind}) failed after {job.attempts} attempts: {error}")
+
+        await session.execute(update(Job).where(Job.id == job.id).values(**values))
+        await session.commit()
+        return retry
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter for the given (1-based) attempt"""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(ceiling / 2, ceiling)
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
@@ -1,26 +1,142 @@
+import asyncio
+import hashlib
 import os
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
 from fastapi import UploadFile
 
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"Upload exceeds the maximum size of {max_bytes} bytes")
+
+@dataclass
+class StagedFile:
+    """An upload written to a temporary file and hashed, not yet in the store"""
+    temp_path: Path
+    extension: str
+    size: int
+    sha256: str
+
+@dataclass
+class StoredFile:
+    filename: str
+    size: int
+    sha256: str
+    deduplicated: bool = False
+
+def _write_chunk(handle, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    handle.write(chunk)
+
 class LocalStorage:
-    def __init__(self, base_path: str = None):
+    """Content-addressed file store.
+
+    Files are named by the SHA-256 of their content and sharded into two
+    levels of subdirectories (``ab/cd/abcd....pdf``), so an identical upload
+    maps onto the blob that is already stored. Callers own reference
+    counting and call ``delete`` once nothing refers to a blob anymore.
+    """
+
+    def __init__(self, base_path: str = None, max_upload_bytes: int = None, chunk_size: int = None):
         if base_path is None:
             base_path = os.getenv("UPLOAD_DIR", "byro_data/uploads")
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
+        # Kept under base_path so the final rename stays on one filesystem;
+        # ImmutableStaticFiles refuses to serve it
+        self.incoming_path = self.base_path / ".incoming"
+        self.incoming_path.mkdir(exist_ok=True)
+        self.max_upload_bytes = max_upload_bytes or MAX_UPLOAD_BYTES
+        self.chunk_size = chunk_size or UPLOAD_CHUNK_BYTES
+
+    @staticmethod
+    def blob_path(sha256: str, extension: str) -> str:
+        """Relative path of the blob for the given content hash"""
+        return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{extension.lower()}"
+
+    def resolve(self, filename: str) -> Path:
+        """Absolute path of a stored file"""
+        return self.base_path / filename
+
+    async def stage(self, file: UploadFile) -> StagedFile:
+        """Stream an upload to a temporary file in chunks, hashing and counting bytes as it goes.
+
+        Disk writes run in a thread so the event loop is never blocked, and at
+        most one chunk is held in memory. Raises UploadTooLarge as soon as the
+        limit is crossed; partially written files are removed on any failure.
+        """
+        if file.size is not None and file.size > self.max_upload_bytes:
+            raise UploadTooLarge(self.max_upload_bytes)
+
+        temp_path = self.incoming_path / uuid.uuid4().hex
+        digest = hashlib.sha256()
+        size = 0
+        buffer = await asyncio.to_thread(open, temp_path, "wb")
+        try:
+            while chunk := await file.read(self.chunk_size):
+                size += len(chunk)
+                if size > self.max_upload_bytes:
+                    raise UploadTooLarge(self.max_upload_bytes)
+                await asyncio.to_thread(_write_chunk, buffer, digest, chunk)
+            await asyncio.to_thread(buffer.close)
+        except BaseException:
+            buffer.close()
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        return StagedFile(
+            temp_path=temp_path,
+            extension=Path(file.filename or "").suffix,
+            size=size,
+            sha256=digest.hexdigest(),
+        )
+
+    def _place(self, staged: StagedFile, filename: str) -> bool:
+        target = self.resolve(filename)
+        if target.exists():
+            staged.temp_path.unlink(missing_ok=True)
+            return True
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged.temp_path, target)
+        return False
+
+    async def commit(self, staged: StagedFile) -> StoredFile:
+        """Move a staged file to its content-addressed location, reusing an existing blob"""
+        filename = self.blob_path(staged.sha256, staged.extension)
+        deduplicated = await asyncio.to_thread(self._place, staged, filename)
+        # Filename is stored in the database; URL constructed as /static/filename
+        return StoredFile(filename=filename, size=staged.size, sha256=staged.sha256, deduplicated=deduplicated)
+
+    async def discard(self, staged: StagedFile) -> None:
+        await asyncio.to_thread(staged.temp_path.unlink, missing_ok=True)
+
+    async def save(self, file: UploadFile) -> StoredFile:
+        """Stream an upload into the store"""
+        staged = await self.stage(file)
+        return await self.commit(staged)
 
     async def save_file(self, file: UploadFile) -> str:
         """Save uploaded file and return the filename for static file serving"""
-        # Generate unique filename
-        file_extension = Path(file.filename).suffix
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = self.base_path / unique_filename
-
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-
-        # Return filename for database storage (URL constructed as /static/filename)
-        return unique_filename
\ No newline at end of file
+        stored = await self.save(file)
+        return stored.filename
+
+    def _delete(self, filename: str) -> None:
+        path = self.resolve(filename)
+        path.unlink(missing_ok=True)
+        # Prune shard directories left empty
+        for parent in (path.parent, path.parent.parent):
+            if parent == self.base_path:
+                break
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+
+    async def delete(self, filename: str) -> None:
+        """Remove a stored file, ignoring files that are already gone"""
+        await asyncio.to_thread(self._delete, filename)
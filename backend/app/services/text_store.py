@@ -0,0 +1,74 @@
+import json
+import os
+import zlib
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+from app.models.extracted_texts import ExtractedText
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Page texts above this size (encoded JSON) are zlib-compressed
+COMPRESS_MIN_BYTES = int(os.getenv("EXTRACTED_TEXT_COMPRESS_MIN_BYTES", str(16 * 1024)))
+
+def join_pages(pages: list[str]) -> str:
+    """Full document text from its page texts"""
+    return "\n".join(page for page in pages if page)
+
+def encode_pages(pages: list[str]) -> tuple[bytes, str]:
+    raw = json.dumps(pages, ensure_ascii=False).encode("utf-8")
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        return zlib.compress(raw, 6), "zlib"
+    return raw, "none"
+
+def decode_pages(data: bytes, compression: str) -> list[str]:
+    if compression == "zlib":
+        data = zlib.decompress(data)
+    elif compression != "none":
+        raise ValueError(f"Unknown extracted text compression '{compression}'")
+    return json.loads(data.decode("utf-8"))
+
+async def load_pages(session: AsyncSession, content_hash: str) -> Optional[list[str]]:
+    """Stored page texts of a source file, or None when it has not been extracted"""
+    entry = await session.get(ExtractedText, content_hash)
+    if entry is None:
+        return None
+    return decode_pages(entry.data, entry.compression)
+
+async def load_pages_many(session: AsyncSession, content_hashes) -> dict[str, list[str]]:
+    """Stored page texts of several source files in one query, keyed by content hash"""
+    hashes = {content_hash for content_hash in content_hashes if content_hash}
+    if not hashes:
+        return {}
+    result = await session.execute(
+        select(ExtractedText.content_hash, ExtractedText.data, ExtractedText.compression)
+        .where(ExtractedText.content_hash.in_(hashes))
+    )
+    return {row.content_hash: decode_pages(row.data, row.compression) for row in result.all()}
+
+async def save_pages(session: AsyncSession, content_hash: str, pages: list[str]) -> None:
+    """Store (or replace) the page texts of a source file; does not commit"""
+    data, compression = encode_pages(pages)
+    stmt = insert(ExtractedText).values(
+        content_hash=content_hash,
+        data=data,
+        compression=compression,
+        page_count=len(pages),
+        char_count=sum(len(page) for page in pages),
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ExtractedText.content_hash],
+            set_={
+                "data": stmt.excluded.data,
+                "compression": stmt.excluded.compression,
+                "page_count": stmt.excluded.page_count,
+                "char_count": stmt.excluded.char_count,
+                "updated_at": func.now(),
+            },
+        )
+    )
+    logger.info(f"Stored {len(pages)} extracted pages for {content_hash} ({compression}, {len(data)} bytes)")
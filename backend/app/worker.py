@@ -0,0 +1,191 @@
+"""Job worker process.
+
+Run with ``python -m app.worker``. Each worker process runs
+``WORKER_CONCURRENCY`` claim loops against the ``jobs`` table, so throughput
+scales by adding processes or containers without touching the API servers.
+``python -m app.worker backfill-embeddings`` queues embedding jobs for
+documents that have none yet.
+"""
+import argparse
+import asyncio
+import os
+import signal
+from contextlib import nullcontext
+from typing import Awaitable, Callable
+from app.core.database import async_session
+from app.core.query_monitor import track_queries
+from app.core.profiling import profiling, should_profile
+from app.core.metrics import mark_process_dead, observe_stage
+from app.models.jobs import Job
+from app.services.queue import JobQueue, default_worker_id
+import logging
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict, bool], Awaitable[None]]
+
+async def handle_process_inbox_item(payload: dict, final_attempt: bool) -> None:
+    from app.api.endpoints.inbox import process_inbox_item
+    await process_inbox_item(
+        payload["item_id"],
+        payload["file_path"],
+        final_attempt=final_attempt,
+        force=payload.get("force", False),
+    )
+
+async def handle_embed_documents(payload: dict, final_attempt: bool) -> None:
+    from app.services.embeddings import EmbeddingService, get_embedding_provider
+    provider = get_embedding_provider()
+    if provider is None:
+        logger.warning("No embedding provider configured; skipping embed_documents job")
+        return
+    with observe_stage("embed"):
+        async with async_session() as session:
+            await EmbeddingService(provider).embed_documents(session, payload["document_ids"])
+
+async def handle_render_previews(payload: dict, final_attempt: bool) -> None:
+    from app.api.endpoints.inbox import preview_service, storage
+    with observe_stage("thumbnails"):
+        await preview_service.render_thumbnails(
+            str(storage.resolve(payload["file_path"])),
+            payload["content_hash"],
+            payload["page_count"],
+        )
+
+HANDLERS: dict[str, JobHandler] = {
+    "process_inbox_item": handle_process_inbox_item,
+    "embed_documents": handle_embed_documents,
+    "render_previews": handle_render_previews,
+}
+
+class Worker:
+    def __init__(
+        self,
+        handlers: dict[str, JobHandler] = None,
+        concurrency: int = None,
+        poll_interval: float = None,
+        queue: JobQueue = None,
+        session_factory=async_session,
+    ):
+        self.handlers = handlers if handlers is not None else HANDLERS
+        self.concurrency = concurrency or int(os.getenv("WORKER_CONCURRENCY", "4"))
+        self.poll_interval = poll_interval or float(os.getenv("WORKER_POLL_INTERVAL_SECONDS", "1.0"))
+        self.queue = queue or JobQueue()
+        self.session_factory = session_factory
+        self.worker_id = default_worker_id()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Ask the claim loops to exit after their current job"""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        logger.info(f"Worker {self.worker_id} starting with concurrency {self.concurrency}")
+        await asyncio.gather(*(self._loop() for _ in range(self.concurrency)))
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    async def run_once(self) -> bool:
+        """Claim and execute a single job; returns False if the queue was empty"""
+        async with self.session_factory() as session:
+            job = await self.queue.claim(session, self.worker_id)
+        if job is None:
+            return False
+        await self._execute(job)
+        return True
+
+    async def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                worked = await self.run_once()
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} failed to claim a job: {str(e)}")
+                worked = False
+            if not worked:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _execute(self, job: Job) -> None:
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            async with self.session_factory() as session:
+                job.attempts = job.max_attempts
+                await self.queue.fail(session, job, f"No handler registered for job kind '{job.kind}'")
+            return
+
+        if job.attempts > job.max_attempts:
+            # Reclaimed after a crash on its last attempt; don't run it again
+            async with self.session_factory() as session:
+                await self.queue.fail(session, job, job.last_error or "Lease expired on final attempt")
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            profiled = should_profile(requested=job.payload.get("profile", False))
+            async with profiling(f"job {job.kind}") if profiled else nullcontext():
+                with track_queries(f"job {job.kind}"):
+                    await handler(job.payload, job.attempts >= job.max_attempts)
+        except Exception as e:
+            heartbeat.cancel()
+            async with self.session_factory() as session:
+                await self.queue.fail(session, job, str(e))
+            return
+        heartbeat.cancel()
+        async with self.session_factory() as session:
+            await self.queue.complete(session, job.id)
+
+    async def _heartbeat(self, job: Job) -> None:
+        interval = max(self.queue.lease_seconds / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self.session_factory() as session:
+                    if not await self.queue.extend_lease(session, job.id, self.worker_id):
+                        logger.warning(f"Worker {self.worker_id} lost the lease on job {job.id}")
+                        return
+            except Exception as e:
+                logger.error(f"Failed to extend lease on job {job.id}: {str(e)}")
+
+async def backfill_embeddings() -> None:
+    from app.services.embeddings import enqueue_embedding_backfill
+    async with async_session() as session:
+        count = await enqueue_embedding_backfill(session, JobQueue())
+    logger.info(f"Queued embedding backfill for {count} documents")
+
+async def prune_events() -> None:
+    from app.services.events import prune_inbox_events
+    async with async_session() as session:
+        count = await prune_inbox_events(session)
+    logger.info(f"Pruned {count} inbox events")
+
+async def main() -> None:
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    parser = argparse.ArgumentParser(description="Byro job worker")
+    parser.add_argument("command", nargs="?", choices=["run", "backfill-embeddings", "prune-events"], default="run")
+    args = parser.parse_args()
+    if args.command == "backfill-embeddings":
+        await backfill_embeddings()
+        return
+    if args.command == "prune-events":
+        await prune_events()
+        return
+
+    try:
+        await prune_events()
+    except Exception as e:
+        logger.error(f"Failed to prune inbox events: {str(e)}")
+
+    worker = Worker()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        from app.services.extraction import extraction_pool
+        extraction_pool.shutdown()
+        mark_process_dead()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""Benchmark the PDF text extraction engines.
+
+Run from the backend directory:
+
+    python -m scripts.benchmark_pdf_engines [--repeat N] [--engine NAME ...] [PDF ...]
+
+Defaults to the PDFs in tests/fixtures and every installed engine. Reports
+pages per second, peak resident memory growth while extracting, and text
+fidelity against the ``<name>.txt`` reference next to each PDF (word-level
+similarity, pages separated by form feeds). Each engine runs in a fresh
+process so imports and peak memory do not leak between engines.
+"""
+import argparse
+import difflib
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from app.services.pdf_engines import available_engines, get_engine
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+def fidelity(expected: str, actual: str) -> float:
+    """Similarity of the word sequences, 1.0 for identical text"""
+    return difflib.SequenceMatcher(None, expected.split(), actual.split(), autojunk=False).ratio()
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _measure(engine_name: str, files: list[str], repeat: int) -> dict:
+    engine = get_engine(engine_name)
+    # Warm up so imports are not counted against the engine
+    engine.extract_pages(files[0])
+    baseline = _peak_rss_mb()
+
+    pages = 0
+    outputs = {}
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for file_path in files:
+            outputs[file_path] = engine.extract_pages(file_path)
+            pages += len(outputs[file_path])
+    elapsed = time.perf_counter() - started
+
+    scores = []
+    for file_path, extracted in outputs.items():
+        reference = Path(file_path).with_suffix(".txt")
+        if reference.exists():
+            scores.append(fidelity(reference.read_text(encoding="utf-8"), "\f".join(extracted)))
+
+    return {
+        "engine": engine_name,
+        "pages": pages,
+        "seconds": elapsed,
+        "pages_per_second": pages / elapsed if elapsed else float("inf"),
+        "peak_memory_mb": _peak_rss_mb() - baseline,
+        "fidelity": sum(scores) / len(scores) if scores else None,
+    }
+
+def run_benchmark(files: list[str], engines: list[str], repeat: int = 5) -> list[dict]:
+    results = []
+    for engine_name in engines:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results.append(executor.submit(_measure, engine_name, files, repeat).result())
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction engines")
+    parser.add_argument("files", nargs="*", help="PDFs to extract (default: tests/fixtures/*.pdf)")
+    parser.add_argument("--engine", action="append", dest="engines", help="Engine to benchmark; repeatable")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the files per engine")
+    parser.add_argument("--min-fidelity", type=float, default=0.98, help="Fidelity an engine needs to be recommended")
+    args = parser.parse_args()
+
+    files = args.files or [str(path) for path in sorted(FIXTURES.glob("*.pdf"))]
+    engines = args.engines or available_engines()
+    results = run_benchmark(files, engines, args.repeat)
+
+    print(f"{'engine':<10} {'pages':>7} {'pages/s':>10} {'peak MB':>9} {'fidelity':>9}")
+    for result in results:
+        score = "n/a" if result["fidelity"] is None else f"{result['fidelity']:.3f}"
+        print(
+            f"{result['engine']:<10} {result['pages']:>7} {result['pages_per_second']:>10.1f} "
+            f"{result['peak_memory_mb']:>9.1f} {score:>9}"
+        )
+
+    correct = [r for r in results if r["fidelity"] is None or r["fidelity"] >= args.min_fidelity]
+    if correct:
+        best = max(correct, key=lambda r: r["pages_per_second"])
+        print(f"\nFastest engine with fidelity >= {args.min_fidelity}: {best['engine']} (PDF_ENGINE={best['engine']})")
+
+if __name__ == "__main__":
+    main()
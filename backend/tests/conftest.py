@@ -1,6 +1,7 @@
 import pytest
 import asyncio
 from httpx import AsyncClient
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.database import Base, get_db, engine
@@ -43,6 +44,15 @@ async def db_session(test_engine):
         yield session
         await session.rollback()
 
+@pytest.fixture
+async def clean_tables(db_session):
+    """Empty the tables after a test that commits rows, as the schema lives for the whole session"""
+    yield
+    await db_session.rollback()
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables if table.name != "collection_versions")
+    await db_session.execute(text(f"TRUNCATE {tables} CASCADE"))
+    await db_session.commit()
+
 @pytest.fixture
 async def client(db_session):
     """Create test client with test database"""
@@ -0,0 +1,93 @@
+import json
+import pytest
+from types import SimpleNamespace
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.services.analysis_cache import AnalysisCache, LRUCache
+from app.services.extraction import DocumentExtractionService
+
+class FakeCache:
+    """In-memory stand-in for AnalysisCache"""
+
+    def __init__(self):
+        self.entries = {}
+
+    async def get(self, key):
+        return self.entries.get(key)
+
+    async def set(self, key, model, prompt_version, result):
+        self.entries[key] = result
+
+class FakeLLMClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def chat_completion(self, **kwargs):
+        self.calls += 1
+        content = json.dumps({"title": f"call {self.calls}", "category": "invoice"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+@pytest.fixture
+def cached_service():
+    service = DocumentExtractionService(cache=FakeCache())
+    service.client = FakeLLMClient()
+    return service
+
+def test_make_key_covers_text_model_and_prompt_version():
+    """Test cache keys change with any of their inputs"""
+    key = AnalysisCache.make_key("text", "gpt-4o", "1")
+    assert key == AnalysisCache.make_key("text", "gpt-4o", "1")
+    assert len(key) == 64
+    assert key != AnalysisCache.make_key("text ", "gpt-4o", "1")
+    assert key != AnalysisCache.make_key("text", "gpt-4o-mini", "1")
+    assert key != AnalysisCache.make_key("text", "gpt-4o", "2")
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test the in-process LRU keeps only the most recently used entries"""
+    lru = LRUCache(max_entries=2)
+    lru.put("a", {"v": 1})
+    lru.put("b", {"v": 2})
+    assert lru.get("a") == {"v": 1}
+    lru.put("c", {"v": 3})
+    assert lru.get("b") is None
+    assert lru.get("a") == {"v": 1}
+    assert len(lru) == 2
+
+@pytest.mark.asyncio
+async def test_analyze_with_llm_reuses_cached_result(cached_service):
+    """Test identical text is analyzed by the LLM only once"""
+    first = await cached_service.analyze_with_llm("INVOICE 123")
+    second = await cached_service.analyze_with_llm("INVOICE 123")
+    assert first == second
+    assert cached_service.client.calls == 1
+
+    await cached_service.analyze_with_llm("INVOICE 456")
+    assert cached_service.client.calls == 2
+
+@pytest.mark.asyncio
+async def test_analyze_with_llm_force_bypasses_cache(cached_service):
+    """Test forced reprocessing calls the LLM and refreshes the cache"""
+    await cached_service.analyze_with_llm("INVOICE 123")
+    forced = await cached_service.analyze_with_llm("INVOICE 123", force=True)
+    assert cached_service.client.calls == 2
+    assert forced["title"] == "call 2"
+    assert await cached_service.analyze_with_llm("INVOICE 123") == forced
+
+@pytest.mark.asyncio
+async def test_database_cache_hits_misses_and_eviction(test_engine):
+    """Test the persistent cache round-trips results, counts hits and evicts by size"""
+    session_factory = sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    cache = AnalysisCache(session_factory=session_factory, memory_entries=0, max_bytes=100)
+
+    key = AnalysisCache.make_key("some text", "gpt-4o", "1")
+    assert await cache.get(key) is None
+    await cache.set(key, "gpt-4o", "1", {"title": "Lease"})
+    assert await cache.get(key) == {"title": "Lease"}
+    assert cache.stats["misses"] == 1
+    assert cache.stats["db_hits"] == 1
+
+    other = AnalysisCache.make_key("other text", "gpt-4o", "1")
+    await cache.set(other, "gpt-4o", "1", {"summary": "x" * 90})
+    assert await cache.evict() == 1
+    assert await cache.get(other) == {"summary": "x" * 90}
+    assert await cache.get(key) is None
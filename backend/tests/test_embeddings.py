@@ -0,0 +1,79 @@
+import math
+import pytest
+from app.models.documents import Document
+from app.models.matters import Matter
+from app.models.document_chunks import DocumentChunk
+from app.services.embeddings import EmbeddingService, StubEmbeddingProvider, chunk_text
+from sqlalchemy import select
+
+class CountingProvider(StubEmbeddingProvider):
+    """Stub provider that records each batch it is asked to embed"""
+
+    def __init__(self):
+        self.batches = []
+
+    async def embed(self, texts):
+        self.batches.append(list(texts))
+        return await super().embed(texts)
+
+def cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+def test_chunk_text_splits_with_overlap():
+    """Test long text is split on word boundaries with overlapping chunks"""
+    text = " ".join(f"word{i}" for i in range(500))
+    chunks = chunk_text(text, chunk_chars=200, overlap_chars=50)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert all(not chunk.startswith(" ") for chunk in chunks)
+    # Every word survives chunking
+    assert set(" ".join(chunks).split()) == set(text.split())
+
+def test_chunk_text_short_and_empty():
+    """Test short text is a single chunk and empty text has none"""
+    assert chunk_text("short text", chunk_chars=200) == ["short text"]
+    assert chunk_text("   ", chunk_chars=200) == []
+
+@pytest.mark.asyncio
+async def test_stub_provider_is_deterministic_and_normalized():
+    """Test stub embeddings are stable, unit length and reflect shared words"""
+    provider = StubEmbeddingProvider()
+    lease, lease_again, invoice = await provider.embed([
+        "residential lease landlord rent",
+        "residential lease landlord rent",
+        "invoice payment due",
+    ])
+    assert lease == lease_again
+    assert len(lease) == 1536
+    assert math.isclose(sum(v * v for v in lease), 1.0)
+    assert cosine(lease, provider.embed_one("lease with landlord")) > cosine(invoice, provider.embed_one("lease with landlord"))
+
+@pytest.mark.asyncio
+async def test_embed_documents_batches_and_skips_unchanged_chunks(db_session, clean_tables):
+    """Test chunks are embedded in batches and unchanged chunks are not re-embedded"""
+    matter = Matter(title="Lease", category="lease")
+    db_session.add(matter)
+    await db_session.flush()
+    text = " ".join(f"clause{i}" for i in range(2000))
+    document = Document(matter_id=matter.id, title="lease.pdf", content_text=text)
+    duplicate = Document(matter_id=matter.id, title="lease-copy.pdf", content_text=text)
+    db_session.add_all([document, duplicate])
+    await db_session.commit()
+
+    provider = CountingProvider()
+    service = EmbeddingService(provider, batch_size=4)
+    embedded = await service.embed_documents(db_session, [document.id, duplicate.id])
+
+    chunks = chunk_text(text)
+    assert embedded == len(chunks)
+    assert all(len(batch) <= 4 for batch in provider.batches)
+    await db_session.refresh(document)
+    assert document.content_embedding is not None
+
+    rows = (await db_session.execute(
+        select(DocumentChunk).where(DocumentChunk.document_id == duplicate.id)
+    )).scalars().all()
+    assert len(rows) == len(chunks)
+
+    # Re-running without text changes sends nothing to the provider
+    assert await service.embed_documents(db_session, [document.id]) == 0
@@ -0,0 +1,113 @@
+import pytest
+from datetime import datetime, timezone
+from starlette.requests import Request
+from app.core.etag import etag_matches, make_etag
+from app.models.inbox import InboxItem
+from app.models.matters import Matter
+from app.models.documents import Document
+from app.models.collection_versions import collection_version_ddl
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+def test_make_etag_is_stable_and_quoted():
+    """Test equal version markers give the same strong ETag"""
+    updated_at = datetime(2026, 1, 6, 12, 0, tzinfo=timezone.utc)
+    etag = make_etag("inbox", 3, 7, updated_at)
+    assert etag == make_etag("inbox", 3, 7, updated_at)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag != make_etag("inbox", 3, 8, updated_at)
+
+def test_etag_matches_if_none_match():
+    """Test If-None-Match matching handles lists, weak tags and wildcards"""
+    etag = make_etag("inbox", 1)
+    assert not etag_matches(make_request(), etag)
+    assert etag_matches(make_request(etag), etag)
+    assert etag_matches(make_request(f'"other", W/{etag}'), etag)
+    assert etag_matches(make_request("*"), etag)
+    assert not etag_matches(make_request('"other"'), etag)
+
+@pytest.mark.asyncio
+async def test_inbox_conditional_get(client, db_session, clean_tables):
+    """Test GET /inbox answers 304 until an item changes"""
+    item = InboxItem(original_filename="test.pdf", file_path="test/path.pdf", status="processing")
+    db_session.add(item)
+    await db_session.commit()
+
+    response = await client.get("/inbox")
+    etag = response.headers["etag"]
+    response = await client.get("/inbox", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    item.status = "review"
+    await db_session.commit()
+    response = await client.get("/inbox", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+def test_collection_triggers_cover_every_write():
+    """Test each collection table gets a statement trigger for inserts, updates and deletes"""
+    triggers = [statement for statement in collection_version_ddl() if statement.startswith("CREATE TRIGGER")]
+    assert any(" ON inbox_items " in trigger and "('inbox_items')" in trigger for trigger in triggers)
+    assert all("INSERT OR UPDATE OR DELETE" in trigger for trigger in triggers)
+
+@pytest.mark.asyncio
+async def test_inbox_etag_changes_on_delete(client, db_session, clean_tables):
+    """Test deleting an item changes the GET /inbox ETag"""
+    item = InboxItem(original_filename="test.pdf", file_path="test/path.pdf", status="review")
+    db_session.add(item)
+    await db_session.commit()
+
+    etag = (await client.get("/inbox")).headers["etag"]
+    await db_session.delete(item)
+    await db_session.commit()
+    response = await client.get("/inbox", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_inbox_item_conditional_get(client, db_session, clean_tables):
+    """Test GET /inbox/{id} answers 304 for the current version"""
+    item = InboxItem(original_filename="test.pdf", file_path="test/path.pdf", status="processing")
+    db_session.add(item)
+    await db_session.commit()
+
+    response = await client.get(f"/inbox/{item.id}")
+    etag = response.headers["etag"]
+    response = await client.get(f"/inbox/{item.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    item.ai_payload = {"summary": "updated"}
+    await db_session.commit()
+    response = await client.get(f"/inbox/{item.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_matters_conditional_get(client, db_session, clean_tables):
+    """Test GET /matters/ answers 304 until a matter is added"""
+    db_session.add(Matter(title="Lease", category="housing", attributes={}))
+    await db_session.commit()
+
+    response = await client.get("/matters/")
+    etag = response.headers["etag"]
+    response = await client.get("/matters/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    db_session.add(Matter(title="Insurance", category="insurance", attributes={}))
+    await db_session.commit()
+    response = await client.get("/matters/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_matters_etag_changes_when_document_filed(client, db_session, clean_tables):
+    """Test filing a document changes the GET /matters/ ETag, as counts are listed"""
+    matter = Matter(title="Lease", category="housing", attributes={})
+    db_session.add(matter)
+    await db_session.commit()
+
+    etag = (await client.get("/matters/")).headers["etag"]
+    db_session.add(Document(matter_id=matter.id, title="lease.pdf", content_text="lease"))
+    await db_session.commit()
+    response = await client.get("/matters/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
\ No newline at end of file
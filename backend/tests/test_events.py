@@ -0,0 +1,93 @@
+import pytest
+from contextlib import asynccontextmanager
+from app.services import events
+from app.services.events import (
+    LAGGED, InboxEventBroker, Subscription, events_after, latest_event_id, publish_inbox_event, stream_inbox_events
+)
+
+class FakeBroker(InboxEventBroker):
+    """Broker that never opens a LISTEN connection"""
+
+    def subscribe(self):
+        subscription = Subscription(self.max_buffered)
+        self._subscribers.add(subscription)
+        return subscription
+
+@pytest.fixture
+def event_table(monkeypatch):
+    """In-memory inbox_events table behind the replay queries"""
+    table = []
+
+    async def fake_latest(session):
+        return max((event["id"] for event in table), default=0)
+
+    async def fake_after(session, event_id, limit=events.REPLAY_BATCH):
+        return [event for event in table if event["id"] > event_id][:limit]
+
+    monkeypatch.setattr(events, "latest_event_id", fake_latest)
+    monkeypatch.setattr(events, "events_after", fake_after)
+    return table
+
+@asynccontextmanager
+async def fake_session():
+    yield None
+
+def event(event_id, status="review"):
+    return {"id": event_id, "item_id": f"item-{event_id}", "status": status}
+
+def test_subscription_overflow_marks_lagged():
+    """Test a full subscriber buffer is replaced by a replay marker"""
+    subscription = Subscription(max_buffered=2)
+    for event_id in range(3):
+        subscription.push(event(event_id))
+    assert subscription.queue.qsize() == 1
+    assert subscription.queue.get_nowait() is LAGGED
+
+@pytest.mark.asyncio
+async def test_stream_resumes_replays_and_deduplicates(event_table):
+    """Test the stream resumes after Last-Event-ID, follows live events and replays gaps"""
+    event_table.extend([event(1), event(2), event(3)])
+    broker = FakeBroker()
+    stream = stream_inbox_events(broker, fake_session, last_event_id=1)
+
+    assert await stream.__anext__() == "retry: 3000\n\n"
+    assert (await stream.__anext__()).startswith("id: 2\n")
+    assert (await stream.__anext__()).startswith("id: 3\n")
+
+    subscription = next(iter(broker._subscribers))
+    subscription.push(event(3))
+    subscription.push(event(4, "done"))
+    chunk = await stream.__anext__()
+    assert chunk.startswith("id: 4\nevent: inbox\n")
+    assert '"status": "done"' in chunk
+
+    # Published while the listener was away: only found by replaying the table
+    event_table.extend([event(4, "done"), event(5, "error")])
+    subscription.mark_lagged()
+    assert (await stream.__anext__()).startswith("id: 5\n")
+
+    await stream.aclose()
+    assert not broker._subscribers
+
+@pytest.mark.asyncio
+async def test_stream_without_last_event_id_starts_now(event_table, monkeypatch):
+    """Test a fresh stream skips history and sends keepalives while idle"""
+    monkeypatch.setattr(events, "KEEPALIVE_SECONDS", 0.05)
+    event_table.extend([event(1), event(2)])
+    broker = FakeBroker()
+    stream = stream_inbox_events(broker, fake_session)
+
+    assert await stream.__anext__() == "retry: 3000\n\n"
+    assert await stream.__anext__() == ": keepalive\n\n"
+    await stream.aclose()
+
+@pytest.mark.asyncio
+async def test_publish_records_event(db_session):
+    """Test publishing stores an event that replays after its predecessor"""
+    import uuid
+    before = await latest_event_id(db_session)
+    item_id = uuid.uuid4()
+    await publish_inbox_event(db_session, item_id, "review")
+    await db_session.commit()
+    replayed = await events_after(db_session, before)
+    assert [(e["item_id"], e["status"]) for e in replayed] == [(str(item_id), "review")]
\ No newline at end of file
@@ -1,7 +1,15 @@
+import asyncio
+import json
 import pytest
 import tempfile
 import os
-from app.services.extraction import DocumentExtractionService
+from pathlib import Path
+from types import SimpleNamespace
+from app.services.extraction import DocumentExtractionService, merge_results, select_pages_for_analysis, split_into_chunks
+from app.services import llm
+from app.services.llm import count_tokens
+
+FIXTURES = Path(__file__).parent / "fixtures"
 
 @pytest.fixture
 def extraction_service():
@@ -25,6 +33,99 @@ async def test_extract_text_from_pdf(extraction_service):
     finally:
         os.unlink(tmp_path)
 
+@pytest.mark.asyncio
+async def test_extract_text_runs_in_process_pool(extraction_service):
+    """Test PDF text extraction from a real PDF off the event loop"""
+    text = await extraction_service.extract_text(str(FIXTURES / "invoice.pdf"))
+    assert "INVOICE No. 2024-0117" in text
+    assert "Total due: EUR 4,250.00" in text
+
+class RecordingLLMClient:
+    """Fake LLM client that answers per chunk and tracks concurrent requests"""
+
+    def __init__(self):
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    async def chat_completion(self, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        text = kwargs["messages"][1]["content"]
+        self.requests.append(text)
+        result = {
+            "title": "Lease" if "Page 1" in text else None,
+            "category": "contract",
+            "counterparty": "Parkside Estates Ltd",
+            "total_value": 2400.0 if "Page 5" in text else None,
+            "summary": f"part {len(self.requests)}",
+        }
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(result)))])
+
+def test_split_into_chunks_respects_token_budget():
+    """Test pages are packed into chunks within the budget without losing text"""
+    pages = [f"Page {n} " + "clause " * 300 for n in range(1, 6)]
+    chunks = split_into_chunks(pages, max_tokens=800)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 800 for chunk in chunks)
+    assert "\n".join(chunks).split() == "\n".join(pages).split()
+    assert split_into_chunks(["short"], max_tokens=800) == ["short"]
+
+class ByteEncoding:
+    """Tokenizer stand-in with one token per UTF-8 byte"""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text.encode("utf-8"))
+
+    def decode_bytes(self, tokens):
+        return bytes(tokens)
+
+def test_split_into_chunks_cuts_long_lines_by_tokens(monkeypatch):
+    """Test a line over budget is cut by the tokenizer, not by a characters-per-token estimate"""
+    monkeypatch.setattr(llm, "_get_encoding", lambda model: ByteEncoding())
+    line = "4711" * 250 + "ü" * 300
+    chunks = split_into_chunks([line], max_tokens=75)
+    assert all(count_tokens(chunk) <= 75 for chunk in chunks)
+    assert "".join(chunks) == line
+
+def test_merge_results_is_deterministic():
+    """Test partial results merge by first title, majority category and last total"""
+    merged = merge_results([
+        {"title": "Lease", "category": "contract", "total_value": None, "summary": "Start."},
+        {"title": "Annex", "category": "letter", "total_value": 100.0, "summary": None},
+        {"title": None, "category": "contract", "total_value": 2400.0, "summary": "End."},
+    ])
+    assert merged["title"] == "Lease"
+    assert merged["category"] == "contract"
+    assert merged["total_value"] == 2400.0
+    assert merged["summary"] == "Start. End."
+    assert merged["counterparty"] is None
+
+def test_invoice_fast_path_selects_first_and_last_page():
+    """Test short invoices are reduced to their first and last page"""
+    invoice = ["INVOICE No. 1", "line items", "more line items", "Total due: EUR 10.00"]
+    assert select_pages_for_analysis(invoice) == ["INVOICE No. 1", "Total due: EUR 10.00"]
+    contract = ["CONTRACT", "terms", "more terms", "signatures"]
+    assert select_pages_for_analysis(contract) == contract
+
+@pytest.mark.asyncio
+async def test_long_document_is_analyzed_in_parallel_chunks():
+    """Test long documents are chunked, analyzed concurrently and merged"""
+    service = DocumentExtractionService(chunk_tokens=200)
+    service.cache = None
+    service.client = RecordingLLMClient()
+    pages = [f"RESIDENTIAL LEASE AGREEMENT - Page {n}\n" + "The tenant agrees. " * 40 for n in range(1, 6)]
+
+    result = await service.analyze_with_llm(pages)
+
+    assert len(service.client.requests) > 1
+    assert service.client.max_active > 1
+    assert result["title"] == "Lease"
+    assert result["total_value"] == 2400.0
+    assert result["category"] == "contract"
+
 @pytest.mark.asyncio
 async def test_analyze_with_llm_date_extraction(extraction_service):
     """Test F-02: date extraction from various formats"""
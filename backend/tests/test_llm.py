@@ -0,0 +1,149 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from openai import APIStatusError
+from app.services.llm import LLMClient, TokenBucket, parse_retry_after
+
+def completion_body(content: dict) -> bytes:
+    return json.dumps({
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": json.dumps(content)},
+        }],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }).encode()
+
+class FakeOpenAIServer:
+    """Local HTTP server that replays scripted chat completion responses"""
+
+    def __init__(self, responses, delay: float = 0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                body = json.loads(self.rfile.read(length))
+                with server._lock:
+                    server.requests.append((time.monotonic(), body))
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    status, headers = server.responses.pop(0) if server.responses else (200, {})
+                time.sleep(server.delay)
+                payload = completion_body({"ok": True}) if status == 200 else json.dumps(
+                    {"error": {"message": "scripted", "type": "test"}}
+                ).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+                with server._lock:
+                    server.in_flight -= 1
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def make_client(server, **kwargs) -> LLMClient:
+    options = {"max_retries": 3, "backoff_base": 0.01, "backoff_max": 0.05}
+    options.update(kwargs)
+    return LLMClient(api_key="test-key", base_url=server.base_url, **options)
+
+async def ask(client):
+    response = await client.chat_completion(
+        model="gpt-4o",
+        messages=[{"role": "user", "content": "hello"}],
+        max_tokens=10,
+    )
+    return json.loads(response.choices[0].message.content)
+
+def test_parse_retry_after():
+    """Test Retry-After parsing from seconds and millisecond headers"""
+    assert parse_retry_after({"retry-after": "2"}) == 2.0
+    assert parse_retry_after({"retry-after-ms": "250"}) == 0.25
+    assert parse_retry_after({}) is None
+
+@pytest.mark.asyncio
+async def test_token_bucket_throttles_to_rate():
+    """Test acquiring beyond capacity waits for the bucket to refill"""
+    bucket = TokenBucket(capacity=10, rate=100)
+    started = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire(10)
+    # Two refills of 10 tokens at 100/s
+    assert time.monotonic() - started >= 0.18
+
+@pytest.mark.asyncio
+async def test_retries_429_and_honours_retry_after():
+    """Test a 429 is retried after the server-provided Retry-After delay"""
+    with FakeOpenAIServer([(429, {"retry-after": "0.3"}), (200, {})]) as server:
+        client = make_client(server)
+        assert await ask(client) == {"ok": True}
+
+    assert len(server.requests) == 2
+    assert server.requests[1][0] - server.requests[0][0] >= 0.3
+
+@pytest.mark.asyncio
+async def test_retries_server_errors_with_backoff():
+    """Test 5xx responses are retried until success"""
+    with FakeOpenAIServer([(500, {}), (503, {}), (200, {})]) as server:
+        client = make_client(server)
+        assert await ask(client) == {"ok": True}
+    assert len(server.requests) == 3
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_errors():
+    """Test 4xx responses other than 429 fail immediately"""
+    with FakeOpenAIServer([(400, {})]) as server:
+        client = make_client(server)
+        with pytest.raises(APIStatusError):
+            await ask(client)
+    assert len(server.requests) == 1
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    """Test the last error is raised once retries are exhausted"""
+    with FakeOpenAIServer([(503, {})] * 3) as server:
+        client = make_client(server, max_retries=2)
+        with pytest.raises(APIStatusError):
+            await ask(client)
+    assert len(server.requests) == 3
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    """Test no more than max_concurrency requests are in flight at once"""
+    with FakeOpenAIServer([], delay=0.1) as server:
+        client = make_client(server, max_concurrency=2)
+        results = await asyncio.gather(*(ask(client) for _ in range(6)))
+    assert results == [{"ok": True}] * 6
+    assert server.max_in_flight == 2
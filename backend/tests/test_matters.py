@@ -1,7 +1,11 @@
+import uuid
 import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
 from app.models.matters import Matter
 from app.models.documents import Document
 from app.models.inbox import InboxItem
+from app.schemas.matters import TriageDecision
 
 @pytest.mark.asyncio
 async def test_get_matters_empty(client):
@@ -80,4 +84,105 @@ async def test_attach_document_to_matter(client, db_session):
         f"SELECT * FROM documents WHERE matter_id = '{matter.id}'"
     )
     docs = document.fetchall()
-    assert len(docs) == 1
\ No newline at end of file
+    assert len(docs) == 1
+
+@pytest.mark.asyncio
+async def test_single_filing_rejects_filed_and_processing_items(client, db_session, clean_tables):
+    """Test POST /matters and /matters/{id}/documents refuse items that are filed or still processing"""
+    matter = Matter(title="Lease", category="housing")
+    done = InboxItem(original_filename="done.pdf", file_path="test/done.pdf", status="done")
+    processing = InboxItem(original_filename="new.pdf", file_path="test/new.pdf", status="processing")
+    db_session.add_all([matter, done, processing])
+    await db_session.commit()
+
+    for item in (done, processing):
+        response = await client.post(
+            "/matters/", params={"inbox_item_id": str(item.id)}, json={"title": "Lease", "category": "housing"}
+        )
+        assert response.status_code == 409
+        response = await client.post(f"/matters/{matter.id}/documents", params={"inbox_item_id": str(item.id)})
+        assert response.status_code == 409
+
+@pytest.mark.asyncio
+async def test_get_matters_filters_by_attributes(client, db_session):
+    """Test GET /matters filters by attribute containment, key presence and category"""
+    db_session.add_all([
+        Matter(title="Flat lease", category="lease", attributes={"landlord": "Parkside", "rent": 2400}),
+        Matter(title="Office lease", category="lease", attributes={"landlord": "Citywide"}),
+        Matter(title="Car", category="vehicle", attributes={"vin": "WVW123"}),
+    ])
+    await db_session.commit()
+
+    response = await client.get("/matters/", params={"attributes": '{"landlord": "Parkside"}'})
+    assert [m["title"] for m in response.json()] == ["Flat lease"]
+
+    response = await client.get("/matters/", params={"has_key": "vin"})
+    assert [m["title"] for m in response.json()] == ["Car"]
+
+    response = await client.get("/matters/", params={"category": "lease", "limit": 1})
+    assert len(response.json()) == 1
+    assert "X-Next-Cursor" in response.headers
+
+    response = await client.get("/matters/", params={"attributes": "[1, 2]"})
+    assert response.status_code == 400
+
+def test_triage_decision_requires_target():
+    """Test create decisions need a matter and attach decisions a matter_id"""
+    with pytest.raises(ValidationError):
+        TriageDecision(inbox_item_id=uuid.uuid4(), action="create")
+    with pytest.raises(ValidationError):
+        TriageDecision(inbox_item_id=uuid.uuid4(), action="attach")
+
+@pytest.mark.asyncio
+async def test_bulk_triage(client, db_session):
+    """Test POST /matters/triage files items in one request and rejects the rest"""
+    matter = Matter(title="Existing", category="contract")
+    items = [
+        InboxItem(original_filename=f"doc{i}.pdf", file_path=f"test/doc{i}.pdf", status="review")
+        for i in range(3)
+    ]
+    items[2].status = "done"
+    db_session.add_all([matter, *items])
+    await db_session.commit()
+
+    response = await client.post("/matters/triage", json={"decisions": [
+        {"inbox_item_id": str(items[0].id), "action": "create", "matter": {"title": "New", "category": "invoice"}},
+        {"inbox_item_id": str(items[1].id), "action": "attach", "matter_id": str(matter.id)},
+        {"inbox_item_id": str(items[1].id), "action": "attach", "matter_id": str(matter.id)},
+        {"inbox_item_id": str(items[2].id), "action": "attach", "matter_id": str(matter.id)},
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["filed"], data["rejected"]) == (2, 2)
+    assert [result["status"] for result in data["results"]] == ["filed", "filed", "rejected", "rejected"]
+
+    documents = (await db_session.execute(select(Document).where(Document.matter_id == matter.id))).scalars().all()
+    assert [document.title for document in documents] == ["doc1.pdf"]
+    await db_session.refresh(items[0])
+    assert items[0].status == "done"
+
+@pytest.mark.asyncio
+async def test_get_matter_with_documents(client, db_session):
+    """Test GET /matters/{id} returns documents without their text, and the list counts them"""
+    matter = Matter(title="Lease", category="housing")
+    db_session.add(matter)
+    await db_session.flush()
+    db_session.add_all([
+        Document(matter_id=matter.id, title="lease.pdf", content_text="secret"),
+        Document(matter_id=matter.id, title="addendum.pdf", content_text="secret"),
+    ])
+    await db_session.commit()
+
+    response = await client.get(f"/matters/{matter.id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["document_count"] == 2
+    assert sorted(document["title"] for document in data["documents"]) == ["addendum.pdf", "lease.pdf"]
+    assert "content_text" not in data["documents"][0]
+    assert data["last_activity_at"] is not None
+
+    response = await client.get("/matters/")
+    assert response.json()[0]["document_count"] == 2
+
+    response = await client.get(f"/matters/{uuid.uuid4()}")
+    assert response.status_code == 404
\ No newline at end of file
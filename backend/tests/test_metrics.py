@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import REGISTRY
+from prometheus_client.parser import text_string_to_metric_families
+from app.core.metrics import MetricsMiddleware, observe_stage, render_metrics
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_observe_stage_records_failures_too():
+    """Test a stage is timed even when it raises"""
+    before = sample("byro_pipeline_stage_duration_seconds_count", stage="test")
+    with observe_stage("test"):
+        pass
+    with pytest.raises(ValueError), observe_stage("test"):
+        raise ValueError()
+    assert sample("byro_pipeline_stage_duration_seconds_count", stage="test") == before + 2
+
+@pytest.mark.asyncio
+async def test_http_latency_is_labelled_by_route_template():
+    """Test requests are grouped by route template, unknown paths as unmatched"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        return {}
+
+    labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+    before = sample("byro_http_request_duration_seconds_count", **labels)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        await client.get("/items/1")
+        await client.get("/items/2")
+        await client.get("/nowhere")
+    assert sample("byro_http_request_duration_seconds_count", **labels) == before + 2
+    assert sample("byro_http_request_duration_seconds_count", method="GET", route="unmatched", status="404") >= 1
+
+def test_render_metrics_includes_inbox_counts():
+    """Test the scrape output parses and reports inbox items by status"""
+    output = render_metrics({"review": 3, "processing": 1}).decode()
+    families = {family.name: family for family in text_string_to_metric_families(output)}
+    samples = {sample.labels["status"]: sample.value for sample in families["byro_inbox_items"].samples}
+    assert samples == {"processing": 1, "review": 3}
+    assert "byro_pipeline_stage_duration_seconds" in families
+
+def test_multiprocess_metrics_are_aggregated(tmp_path):
+    """Test counters written by separate processes are summed in one scrape"""
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    record = "from app.core.metrics import UPLOAD_BYTES; UPLOAD_BYTES.labels('false').inc(100)"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", record], env=env, check=True)
+    scrape = "import sys; from app.core.metrics import render_metrics; sys.stdout.write(render_metrics({}).decode())"
+    output = subprocess.run([sys.executable, "-c", scrape], env=env, check=True, capture_output=True, text=True).stdout
+    assert 'byro_upload_bytes_total{deduplicated="false"} 200.0' in output
+
+def test_exiting_process_removes_its_files(tmp_path):
+    """Test a process drops its metric files on shutdown, so restarts do not pile them up"""
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    record = (
+        "from app.core.metrics import UPLOAD_BYTES, mark_process_dead; "
+        "UPLOAD_BYTES.labels('false').inc(100); mark_process_dead()"
+    )
+    subprocess.run([sys.executable, "-c", record], env=env, check=True)
+    assert list(tmp_path.iterdir()) == []
\ No newline at end of file
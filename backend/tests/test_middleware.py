@@ -0,0 +1,63 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from fastapi import FastAPI, File, UploadFile
+from app.core.middleware import UploadSizeLimitMiddleware
+
+@pytest.fixture
+def limited_app():
+    """Create a minimal app with a size-limited upload route"""
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=1000, paths=("/upload",), overhead_bytes=0)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    @app.post("/other")
+    async def other(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return app
+
+async def post(app, path, **kwargs):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        return await client.post(path, **kwargs)
+
+@pytest.mark.asyncio
+async def test_small_upload_passes(limited_app):
+    """Test uploads under the limit reach the endpoint"""
+    response = await post(limited_app, "/upload", files={"file": ("a.pdf", b"x" * 100)})
+    assert response.status_code == 200
+    assert response.json() == {"size": 100}
+
+@pytest.mark.asyncio
+async def test_oversized_content_length_rejected(limited_app):
+    """Test a declared Content-Length over the limit is rejected with 413"""
+    response = await post(limited_app, "/upload", files={"file": ("a.pdf", b"x" * 5000)})
+    assert response.status_code == 413
+
+@pytest.mark.asyncio
+async def test_oversized_streamed_body_rejected(limited_app):
+    """Test a chunked body without Content-Length is cut off with 413"""
+    async def body():
+        yield (
+            b"--boundary\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.pdf\"\r\n"
+            b"Content-Type: application/pdf\r\n\r\n"
+        )
+        for _ in range(10):
+            yield b"x" * 500
+        yield b"\r\n--boundary--\r\n"
+
+    response = await post(
+        limited_app,
+        "/upload",
+        content=body(),
+        headers={"content-type": "multipart/form-data; boundary=boundary"},
+    )
+    assert response.status_code == 413
+
+@pytest.mark.asyncio
+async def test_other_paths_unlimited(limited_app):
+    """Test the limit only applies to configured paths"""
+    response = await post(limited_app, "/other", files={"file": ("a.pdf", b"x" * 5000)})
+    assert response.status_code == 200
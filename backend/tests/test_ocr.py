@@ -0,0 +1,88 @@
+import asyncio
+import shutil
+import time
+import pytest
+from pathlib import Path
+from app.services.ocr import OcrService
+from app.services.extraction import DocumentExtractionService
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+class FakeOcrService(OcrService):
+    """OCR service that renders fake images and recognizes them without binaries"""
+
+    available = True
+
+    def __init__(self, delays=None, **kwargs):
+        super().__init__(**kwargs)
+        self.delays = delays or {}
+        self.rendered = []
+        self.recognized = []
+
+    async def _render_pdf_page(self, file_path, page_number, workdir):
+        self.rendered.append(page_number)
+        image_path = workdir / f"page-{page_number}.png"
+        image_path.write_bytes(f"image of page {page_number}".encode())
+        return image_path
+
+    async def _recognize(self, image_path):
+        page_number = int(image_path.stem.split("-")[1])
+        self.recognized.append(page_number)
+        await asyncio.sleep(self.delays.get(page_number, 0))
+        return f"scanned text of page {page_number}"
+
+@pytest.mark.asyncio
+async def test_ocr_pages_run_concurrently_with_per_page_timeout(tmp_path):
+    """Test pages are OCR'd in parallel and a slow page times out alone"""
+    ocr = FakeOcrService(delays={0: 0.3, 1: 0.3, 2: 0.3, 3: 5}, concurrency=4, page_timeout=0.6, cache_dir=str(tmp_path))
+    started = time.monotonic()
+    texts = await ocr.ocr_pdf_pages("scan.pdf", [0, 1, 2, 3], "scan-hash")
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1.5
+    assert texts[0] == "scanned text of page 0"
+    assert texts[2] == "scanned text of page 2"
+    assert texts[3] == ""
+
+@pytest.mark.asyncio
+async def test_ocr_results_are_cached_before_rendering(tmp_path):
+    """Test a page of a file seen before is neither rendered nor recognized again"""
+    ocr = FakeOcrService(cache_dir=str(tmp_path))
+    first = await ocr.ocr_pdf_pages("scan.pdf", [0, 1], "scan-hash")
+    second = await ocr.ocr_pdf_pages("copy-of-scan.pdf", [0, 1], "scan-hash")
+    assert first == second
+    assert sorted(ocr.rendered) == sorted(ocr.recognized) == [0, 1]
+
+    await ocr.ocr_pdf_pages("other-scan.pdf", [0], "other-hash")
+    assert sorted(ocr.rendered) == [0, 0, 1]
+    other_dpi = FakeOcrService(dpi=150, cache_dir=str(tmp_path))
+    await other_dpi.ocr_pdf_pages("scan.pdf", [0], "scan-hash")
+    assert other_dpi.rendered == [0]
+
+@pytest.mark.asyncio
+async def test_run_kills_process_on_timeout(tmp_path):
+    """Test the OCR subprocess is killed when the page times out"""
+    ocr = OcrService(cache_dir=str(tmp_path))
+    started = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(ocr._run(["sleep", "5"]), 0.2)
+    assert time.monotonic() - started < 2
+
+@pytest.mark.asyncio
+async def test_extraction_ocrs_only_pages_without_text(tmp_path):
+    """Test only pages without a text layer are sent to OCR"""
+    ocr = FakeOcrService(cache_dir=str(tmp_path))
+    service = DocumentExtractionService(ocr=ocr)
+    pages = await service.extract_pages(str(FIXTURES / "mixed.pdf"))
+
+    assert ocr.recognized == [1]
+    assert "Monthly rent: EUR 1,200.00" in pages[0]
+    assert pages[1] == "scanned text of page 1"
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("tesseract") is None or shutil.which("pdftoppm") is None, reason="OCR binaries not installed")
+async def test_ocr_renders_and_recognizes_real_pdf(tmp_path):
+    """Test a real PDF page is rendered and recognized by Tesseract"""
+    ocr = OcrService(cache_dir=str(tmp_path))
+    texts = await ocr.ocr_pdf_pages(str(FIXTURES / "invoice.pdf"), [0])
+    assert "INVOICE" in texts[0]
\ No newline at end of file
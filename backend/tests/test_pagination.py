@@ -0,0 +1,30 @@
+import uuid
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from fastapi import HTTPException
+from app.core.pagination import decode_cursor, encode_cursor, next_cursor
+
+def test_cursor_round_trip():
+    """Test cursors decode back to the row they were made from"""
+    created_at = datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    item_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(created_at, item_id)) == (created_at, item_id)
+
+def test_invalid_cursor_is_rejected():
+    """Test malformed cursors produce a 400"""
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+def test_next_cursor_trims_look_ahead_row():
+    """Test only a full page plus one row yields a next cursor"""
+    rows = [SimpleNamespace(created_at=datetime(2025, 1, 3 - i, tzinfo=timezone.utc), id=uuid.uuid4()) for i in range(3)]
+
+    page, cursor = next_cursor(rows, limit=2)
+    assert page == rows[:2]
+    assert decode_cursor(cursor) == (rows[1].created_at, rows[1].id)
+
+    page, cursor = next_cursor(rows[:2], limit=2)
+    assert page == rows[:2]
+    assert cursor is None
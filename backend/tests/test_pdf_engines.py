@@ -0,0 +1,54 @@
+import pytest
+from pathlib import Path
+from app.services import pdf_engines
+from app.services.pdf_engines import available_engines, get_engine, select_engine
+from app.services.extraction import _extract_pdf_pages
+from scripts.benchmark_pdf_engines import fidelity, run_benchmark
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+@pytest.mark.parametrize("engine", available_engines())
+def test_engine_extracts_pages(engine):
+    """Test every installed engine returns the text of each page"""
+    pages = get_engine(engine).extract_pages(str(FIXTURES / "lease.pdf"))
+    assert len(pages) == 5
+    assert "RESIDENTIAL LEASE AGREEMENT - Page 3" in pages[2]
+    assert "Total due: EUR 4,250.00" in get_engine(engine).extract_pages(str(FIXTURES / "invoice.pdf"))[0]
+
+def test_select_engine_by_config_and_size(monkeypatch):
+    """Test PDF_ENGINE and PDF_ENGINE_LARGE choose the engine by file size"""
+    monkeypatch.setenv("PDF_ENGINE", "pypdf")
+    monkeypatch.setenv("PDF_ENGINE_LARGE", "pypdf")
+    assert select_engine(1024) == "pypdf"
+    monkeypatch.delenv("PDF_ENGINE_LARGE")
+    assert select_engine(pdf_engines.PDF_LARGE_FILE_BYTES) == "pypdf"
+    assert select_engine(1024, name="pypdf") == "pypdf"
+
+def test_select_engine_falls_back_when_unavailable(monkeypatch):
+    """Test an unknown or uninstalled engine falls back to the first installed one"""
+    monkeypatch.setattr(pdf_engines.PdfiumEngine, "available", classmethod(lambda cls: False))
+    monkeypatch.setenv("PDF_ENGINE", "pdfium")
+    assert select_engine(1024) == "pypdf"
+    assert select_engine(1024, name="nonexistent") == "pypdf"
+
+def test_extraction_falls_back_to_pypdf_on_import_error(monkeypatch):
+    """Test an engine that cannot be imported is replaced by pypdf"""
+    def broken(self, file_path):
+        raise ImportError("libpdfium.so: cannot open shared object file")
+    monkeypatch.setattr(pdf_engines.PdfiumEngine, "extract_pages", broken)
+    pages = _extract_pdf_pages(str(FIXTURES / "lease.pdf"), "pdfium")
+    assert len(pages) == 5
+
+def test_fidelity():
+    """Test fidelity is 1.0 for identical text and drops with missing words"""
+    assert fidelity("Total due: EUR 4,250.00", "Total  due:\nEUR 4,250.00") == 1.0
+    assert fidelity("Total due: EUR 4,250.00", "Total due:") < 0.7
+
+def test_benchmark_reports_speed_memory_and_fidelity():
+    """Test the benchmark measures each engine over the fixture PDFs"""
+    results = run_benchmark([str(FIXTURES / "invoice.pdf"), str(FIXTURES / "lease.pdf")], ["pypdf"], repeat=1)
+    assert len(results) == 1
+    assert results[0]["pages"] == 6
+    assert results[0]["pages_per_second"] > 0
+    assert results[0]["peak_memory_mb"] >= 0
+    assert results[0]["fidelity"] == 1.0
\ No newline at end of file
@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+from app.core.config import DatabaseSettings
+from app.core.pool import InstrumentedQueuePool, pool_status
+
+def test_database_settings_from_environment(monkeypatch):
+    """Test pool settings and the URL are read from the environment"""
+    monkeypatch.setenv("POSTGRES_USER", "byro")
+    monkeypatch.setenv("POSTGRES_PASSWORD", "secret")
+    monkeypatch.setenv("POSTGRES_HOST", "db")
+    monkeypatch.setenv("POSTGRES_DB", "byro")
+    monkeypatch.setenv("DB_POOL_SIZE", "25")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.setenv("DB_ECHO", "statements")
+
+    settings = DatabaseSettings()
+    assert settings.url == "postgresql+asyncpg://byro:secret@db/byro"
+    assert settings.db_pool_size == 25
+    assert settings.db_pool_pre_ping is False
+    assert settings.echo is True
+
+def test_database_url_overrides_parts(monkeypatch):
+    """Test DATABASE_URL wins over the POSTGRES_* variables and echo defaults to off"""
+    monkeypatch.setenv("DATABASE_URL", "postgresql+asyncpg://u:p@elsewhere/db")
+    settings = DatabaseSettings()
+    assert settings.url == "postgresql+asyncpg://u:p@elsewhere/db"
+    assert settings.echo is False
+
+@pytest.mark.asyncio
+async def test_pool_reports_checkouts_and_timeouts():
+    """Test the pool counts checked-out connections, checkout waits and timeouts"""
+    pool = InstrumentedQueuePool(lambda: MagicMock(), pool_size=1, max_overflow=0, timeout=0.05)
+
+    def exhaust():
+        connection = pool.connect()
+        busy = pool_status(pool)
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+        connection.close()
+        return busy
+
+    busy = await greenlet_spawn(exhaust)
+    assert busy["checked_out"] == 1
+
+    status = pool_status(pool)
+    assert status["checked_out"] == 0
+    assert status["checkouts"] == 2
+    assert status["checkout_timeouts"] == 1
+    assert status["checkout_wait_ms_max"] >= 40
\ No newline at end of file
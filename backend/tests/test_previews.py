@@ -0,0 +1,93 @@
+import asyncio
+import os
+import shutil
+import threading
+import pytest
+from pathlib import Path
+from httpx import ASGITransport, AsyncClient
+from fastapi import FastAPI
+from app.core.static import IMMUTABLE_CACHE_CONTROL, ImmutableStaticFiles
+from app.services import previews as previews_module
+from app.services.previews import PreviewService
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+@pytest.fixture
+def static_app(tmp_path):
+    """Create a minimal app serving a directory of uploads"""
+    (tmp_path / "blob.pdf").write_bytes(bytes(range(256)) * 4)
+    (tmp_path / ".incoming").mkdir()
+    (tmp_path / ".incoming" / "partial").write_bytes(b"in flight")
+    app = FastAPI()
+    app.mount("/static", ImmutableStaticFiles(directory=tmp_path), name="static")
+    return app
+
+async def get(app, path, **kwargs):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        return await client.get(path, **kwargs)
+
+@pytest.mark.asyncio
+async def test_static_files_are_cached_immutably(static_app):
+    """Test uploads are served with a long-lived immutable Cache-Control"""
+    response = await get(static_app, "/static/blob.pdf")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["accept-ranges"] == "bytes"
+
+@pytest.mark.asyncio
+async def test_static_files_answer_range_requests(static_app):
+    """Test a Range request returns only the requested bytes"""
+    response = await get(static_app, "/static/blob.pdf", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == bytes(range(10, 20))
+    assert response.headers["content-range"] == "bytes 10-19/1024"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+@pytest.mark.asyncio
+async def test_static_files_hide_staged_uploads(static_app):
+    """Test in-flight uploads in the staging directory are not served"""
+    response = await get(static_app, "/static/.incoming/partial")
+    assert response.status_code == 404
+
+def test_thumbnail_path_is_keyed_by_content_and_width(tmp_path):
+    """Test thumbnails of different widths or pages never share a cache entry"""
+    small = PreviewService(cache_dir=str(tmp_path), width=160)
+    large = PreviewService(cache_dir=str(tmp_path), width=320)
+    assert small.thumbnail_path("abcd", 1) != large.thumbnail_path("abcd", 1)
+    assert small.thumbnail_path("abcd", 1) != small.thumbnail_path("abcd", 2)
+    assert small.thumbnail_path("abcd", 1).parent == tmp_path / "ab" / "abcd"
+
+@pytest.mark.asyncio
+async def test_concurrent_renders_of_a_page_all_succeed(tmp_path, monkeypatch):
+    """Test requests rendering the same uncached page at once do not collide on a temporary file"""
+    async def fake_pdftoppm(command):
+        await asyncio.sleep(0.01)
+        Path(command[-1]).with_suffix(".jpg").write_bytes(b"\xff\xd8 thumbnail")
+
+    # Hold every render just before its final rename, so all of them are in flight together
+    barrier = threading.Barrier(4, timeout=5)
+    replace = os.replace
+
+    def replace_together(source, target):
+        barrier.wait()
+        replace(source, target)
+
+    monkeypatch.setattr(previews_module, "run_command", fake_pdftoppm)
+    monkeypatch.setattr(os, "replace", replace_together)
+    previews = PreviewService(cache_dir=str(tmp_path), width=120, concurrency=4)
+    paths = await asyncio.gather(*(previews.render_thumbnail("scan.pdf", "deadbeef", 1) for _ in range(4)))
+
+    assert set(paths) == {previews.thumbnail_path("deadbeef", 1)}
+    assert paths[0].read_bytes() == b"\xff\xd8 thumbnail"
+    assert [path.name for path in paths[0].parent.iterdir()] == ["120-1.jpg"]
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("pdftoppm") is None, reason="poppler not installed")
+async def test_render_thumbnails(tmp_path):
+    """Test every page is rendered once and cached pages are skipped"""
+    previews = PreviewService(cache_dir=str(tmp_path), width=120)
+    pdf = str(FIXTURES / "mixed.pdf")
+
+    assert await previews.render_thumbnails(pdf, "deadbeef", page_count=2) == 2
+    assert previews.thumbnail_path("deadbeef", 1).read_bytes()[:2] == b"\xff\xd8"
+    assert await previews.render_thumbnails(pdf, "deadbeef", page_count=2) == 0
\ No newline at end of file
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import time
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from app.services.process_pool import ProcessPool, _Worker
+
+@pytest.fixture
+def pool():
+    """Create a small process pool for testing"""
+    pool = ProcessPool(max_workers=2, name="test")
+    yield pool
+    pool.shutdown()
+
+@pytest.mark.asyncio
+async def test_run_returns_result(pool):
+    """Test work runs in the pool and its result is returned"""
+    assert await pool.run(pow, 2, 10) == 1024
+
+@pytest.mark.asyncio
+async def test_run_propagates_exceptions(pool):
+    """Test exceptions raised in the worker process reach the caller"""
+    with pytest.raises(ValueError):
+        await pool.run(int, "not a number")
+
+@pytest.mark.asyncio
+async def test_timeout_kills_worker(pool):
+    """Test a task that exceeds its timeout is killed and the pool keeps working"""
+    started = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.run(time.sleep, 30, timeout=1)
+    assert time.monotonic() - started < 10
+
+    assert await pool.run(pow, 3, 3) == 27
+
+@pytest.mark.asyncio
+async def test_sibling_tasks_survive_timeout(pool):
+    """Test a timeout kills only its own worker, not tasks running next to it"""
+    # Warm the pool so both tasks start running immediately
+    await asyncio.gather(pool.run(pow, 1, 1), pool.run(pow, 1, 1))
+
+    slow = pool.run(time.sleep, 30, timeout=1)
+    sibling = pool.run(time.sleep, 2)
+    results = await asyncio.gather(slow, sibling, return_exceptions=True)
+
+    assert isinstance(results[0], asyncio.TimeoutError)
+    assert results[1] is None
+
+@pytest.mark.asyncio
+async def test_tasks_beyond_max_workers_wait_for_a_worker(pool):
+    """Test more concurrent tasks than workers all complete on at most max_workers processes"""
+    pids = await asyncio.gather(*(pool.run(os.getpid) for _ in range(6)))
+    assert len(set(pids)) <= 2
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_replaced(pool):
+    """Test a worker dying mid-task fails only that task"""
+    with pytest.raises(BrokenProcessPool):
+        await pool.run(os._exit, 1)
+    assert await pool.run(pow, 2, 3) == 8
+
+@pytest.mark.asyncio
+async def test_workers_are_recycled_after_max_tasks():
+    """Test a worker is replaced after max_tasks_per_child tasks"""
+    pool = ProcessPool(max_workers=1, max_tasks_per_child=2, name="test")
+    try:
+        pids = [await pool.run(os.getpid) for _ in range(4)]
+    finally:
+        pool.shutdown()
+    assert pids[0] == pids[1] != pids[2] == pids[3]
+
+@pytest.mark.asyncio
+async def test_killing_a_worker_does_not_block_the_loop(pool, monkeypatch):
+    """Test a worker that is slow to exit is reaped off the event loop"""
+    kill = _Worker.kill
+
+    def slow_kill(self):
+        time.sleep(2)
+        kill(self)
+
+    monkeypatch.setattr(_Worker, "kill", slow_kill)
+    started = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.run(time.sleep, 30, timeout=0.5)
+    assert time.monotonic() - started < 1.5
\ No newline at end of file
@@ -0,0 +1,113 @@
+import time
+import pytest
+from collections import Counter
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from app.core import profiling
+from app.core.profiling import ProfilingMiddleware, SamplingProfiler, run_in_pool, should_profile, write_profile
+
+def _busy(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+class InlinePool:
+    """Runs submitted functions in this process"""
+
+    async def run(self, fn, *args, timeout=None):
+        return fn(*args)
+
+def test_sampler_records_collapsed_stacks():
+    """Test samples are semicolon-joined stacks ending in the running function"""
+    profiler = SamplingProfiler(interval_ms=1)
+    profiler.start()
+    _busy(0.1)
+    profiler.stop()
+
+    assert profiler.samples
+    stack, _ = profiler.samples.most_common(1)[0]
+    assert stack.split(";")[-1].startswith("_busy (")
+
+def test_write_profile_caps_file_count(tmp_path, monkeypatch):
+    """Test the oldest profiles are removed beyond the file cap"""
+    monkeypatch.setattr(profiling, "PROFILE_MAX_FILES", 2)
+    for index in range(3):
+        write_profile(f"GET /inbox {index}", Counter({"main;work": index + 1}), tmp_path)
+        time.sleep(0.01)
+
+    files = sorted(tmp_path.glob("*.collapsed"))
+    assert len(files) == 2
+    assert {path.read_text() for path in files} == {"main;work 2\n", "main;work 3\n"}
+
+def test_write_profile_keeps_heaviest_stacks_within_size_cap(tmp_path, monkeypatch):
+    """Test an oversized profile keeps its most sampled stacks"""
+    monkeypatch.setattr(profiling, "PROFILE_MAX_BYTES", 20)
+    path = write_profile("job", Counter({"main;rare": 1, "main;hot": 50, "main;warm": 10}), tmp_path)
+
+    assert path.read_text() == "main;hot 50\n"
+
+def test_should_profile_requires_matching_token(monkeypatch):
+    """Test the header only triggers profiling with the configured token"""
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "secret")
+    assert should_profile("secret")
+    assert not should_profile("wrong")
+    assert not should_profile(None)
+    assert should_profile(requested=True)
+
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "")
+    assert not should_profile("")
+
+@pytest.mark.asyncio
+async def test_pool_samples_are_merged_into_active_profile(tmp_path, monkeypatch):
+    """Test work run in the pool while profiling lands under the pool process root"""
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    async with profiling.profiling("job process_inbox_item") as profiler:
+        assert await run_in_pool(InlinePool(), _busy, 0.05) > 0
+
+    assert any(stack.startswith("[pool process];") for stack in profiler.samples)
+    assert len(list(tmp_path.glob("*.collapsed"))) == 1
+
+@pytest.mark.asyncio
+async def test_run_in_pool_without_profile_passes_through():
+    """Test pool calls are unchanged when nothing is being profiled"""
+    assert await run_in_pool(InlinePool(), sum, [1, 2]) == 3
+
+def test_sampler_stops_at_max_seconds():
+    """Test sampling ends after max_seconds even while the work goes on"""
+    profiler = SamplingProfiler(interval_ms=1, max_seconds=0.05)
+    profiler.start()
+    _busy(0.2)
+    sampled = sum(profiler.samples.values())
+    _busy(0.1)
+    profiler.stop()
+    assert sum(profiler.samples.values()) == sampled
+
+@pytest.mark.asyncio
+async def test_event_streams_are_not_profiled(tmp_path, monkeypatch):
+    """Test event-stream responses leave no profile, while other profiled requests do"""
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "secret")
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    async def events():
+        _busy(0.05)
+        yield "data: ready\n\n"
+
+    @app.get("/events")
+    async def stream():
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/work")
+    async def work():
+        return {"total": _busy(0.05)}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        await client.get("/events", headers={"X-Profile": "secret"})
+        assert list(tmp_path.glob("*.collapsed")) == []
+        await client.get("/work", headers={"X-Profile": "secret"})
+    assert len(list(tmp_path.glob("*.collapsed"))) == 1
\ No newline at end of file
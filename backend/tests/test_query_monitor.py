@@ -0,0 +1,71 @@
+import logging
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+from app.core.query_monitor import QueryMonitor, QueryMonitorMiddleware, statement_shape, track_queries
+
+@pytest.fixture
+def sqlite_engine():
+    """In-memory SQLite engine with the query monitor installed"""
+    engine = create_engine("sqlite://")
+    QueryMonitor(slow_ms=10_000, n_plus_one_threshold=3).install(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+    yield engine
+    engine.dispose()
+
+def test_statement_shape_collapses_placeholder_lists():
+    """Test IN lists of different lengths share one statement shape"""
+    assert statement_shape("SELECT * FROM t WHERE id IN ($1, $2, $3)") == statement_shape("SELECT * FROM t WHERE id IN ($1)")
+    assert statement_shape("SELECT *\n  FROM t WHERE a = ?") == "SELECT * FROM t WHERE a = ?"
+
+def test_track_queries_counts_and_flags_n_plus_one(sqlite_engine, caplog):
+    """Test tracked statements are counted and repeated shapes reported once"""
+    with caplog.at_level(logging.WARNING, logger="app.core.query_monitor"):
+        with track_queries("GET /items") as stats, sqlite_engine.connect() as conn:
+            for item_id in range(5):
+                conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+    assert stats.count == 5
+    assert stats.seconds > 0
+    warnings = [record.getMessage() for record in caplog.records if "N+1" in record.getMessage()]
+    assert len(warnings) == 1
+    assert "GET /items" in warnings[0]
+
+def test_failed_statements_do_not_leak_start_times(sqlite_engine):
+    """Test a failing statement removes its start time from the connection"""
+    with sqlite_engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info["query_started"] == []
+
+def test_slow_queries_are_logged_without_parameters(caplog):
+    """Test slow statements are logged with their parameters redacted"""
+    engine = create_engine("sqlite://")
+    QueryMonitor(slow_ms=0, n_plus_one_threshold=10).install(engine)
+    with caplog.at_level(logging.WARNING, logger="app.core.query_monitor"):
+        with track_queries("POST /login"), engine.connect() as conn:
+            conn.execute(text("SELECT :secret"), {"secret": "hunter2"})
+    message = caplog.records[-1].getMessage()
+    assert "Slow query" in message and "POST /login" in message
+    assert "hunter2" not in message
+    assert "1 parameters redacted" in message
+
+@pytest.mark.asyncio
+async def test_middleware_adds_debug_headers(sqlite_engine):
+    """Test responses report the request's query count and DB time in debug mode"""
+    app = FastAPI()
+    app.add_middleware(QueryMonitorMiddleware, debug_headers=True)
+
+    @app.get("/items")
+    async def items():
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return []
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.get("/items")
+    assert response.headers["x-db-query-count"] == "2"
+    assert float(response.headers["x-db-time-ms"]) >= 0
\ No newline at end of file
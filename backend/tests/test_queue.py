@@ -0,0 +1,140 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.models.jobs import Job
+from app.services.queue import JobQueue
+from app.worker import Worker
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakeQueue:
+    """In-memory stand-in for JobQueue to exercise the worker loop"""
+
+    lease_seconds = 300
+
+    def __init__(self, jobs):
+        self.jobs = list(jobs)
+        self.completed = []
+        self.failed = []
+
+    async def claim(self, session, worker_id):
+        if not self.jobs:
+            return None
+        job = self.jobs.pop(0)
+        job.attempts += 1
+        return job
+
+    async def complete(self, session, job_id):
+        self.completed.append(job_id)
+
+    async def fail(self, session, job, error):
+        self.failed.append((job.id, error, job.attempts))
+        return job.attempts < job.max_attempts
+
+    async def extend_lease(self, session, job_id, worker_id):
+        return True
+
+def make_job(kind="test", attempts=0, max_attempts=3):
+    return Job(id=f"job-{kind}-{attempts}", kind=kind, payload={"n": 1}, attempts=attempts, max_attempts=max_attempts)
+
+def test_backoff_delay_grows_and_is_capped():
+    """Test retry delay doubles per attempt and never exceeds the cap"""
+    queue = JobQueue(backoff_base=2, backoff_max=30)
+    for attempt in range(1, 10):
+        ceiling = min(30, 2 * 2 ** (attempt - 1))
+        delay = queue.backoff_delay(attempt)
+        assert ceiling / 2 <= delay <= ceiling
+
+@pytest.mark.asyncio
+async def test_worker_completes_successful_job():
+    """Test worker runs the registered handler and completes the job"""
+    calls = []
+
+    async def handler(payload, final_attempt):
+        calls.append((payload, final_attempt))
+
+    job = make_job()
+    queue = FakeQueue([job])
+    worker = Worker(handlers={"test": handler}, queue=queue, session_factory=FakeSession)
+
+    assert await worker.run_once() is True
+    assert calls == [({"n": 1}, False)]
+    assert queue.completed == [job.id]
+    assert await worker.run_once() is False
+
+@pytest.mark.asyncio
+async def test_worker_records_failure_and_flags_final_attempt():
+    """Test a failing handler is reported to the queue and sees final_attempt on its last try"""
+    seen = []
+
+    async def handler(payload, final_attempt):
+        seen.append(final_attempt)
+        raise RuntimeError("boom")
+
+    job = make_job(attempts=2, max_attempts=3)
+    queue = FakeQueue([job])
+    worker = Worker(handlers={"test": handler}, queue=queue, session_factory=FakeSession)
+
+    await worker.run_once()
+    assert seen == [True]
+    assert queue.failed == [(job.id, "boom", 3)]
+    assert queue.completed == []
+
+@pytest.mark.asyncio
+async def test_worker_fails_unknown_job_kind():
+    """Test jobs without a handler are failed instead of retried forever"""
+    job = make_job(kind="unknown")
+    queue = FakeQueue([job])
+    worker = Worker(handlers={}, queue=queue, session_factory=FakeSession)
+
+    await worker.run_once()
+    assert len(queue.failed) == 1
+    assert "No handler" in queue.failed[0][1]
+
+@pytest.mark.asyncio
+async def test_claim_skips_locked_and_reclaims_expired(db_session):
+    """Test claim hands out queued jobs once and reclaims jobs with an expired lease"""
+    queue = JobQueue(lease_seconds=60)
+    job = await queue.enqueue(db_session, "test", {"n": 1})
+    await db_session.commit()
+
+    claimed = await queue.claim(db_session, "worker-a")
+    assert claimed.id == job.id
+    assert claimed.status == "running"
+    assert claimed.attempts == 1
+
+    # Lease still valid: nothing else to claim
+    assert await queue.claim(db_session, "worker-b") is None
+
+    # Expire the lease and the job becomes claimable again
+    claimed.locked_until = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await db_session.commit()
+    reclaimed = await queue.claim(db_session, "worker-b")
+    assert reclaimed.id == job.id
+    assert reclaimed.locked_by == "worker-b"
+    assert reclaimed.attempts == 2
+
+@pytest.mark.asyncio
+async def test_fail_reschedules_then_marks_failed(db_session):
+    """Test failed attempts are requeued with backoff until max_attempts is reached"""
+    queue = JobQueue(max_attempts=2, backoff_base=1, backoff_max=1)
+    await queue.enqueue(db_session, "test", {})
+    await db_session.commit()
+
+    claimed = await queue.claim(db_session, "worker-a")
+    assert await queue.fail(db_session, claimed, "first") is True
+    await db_session.refresh(claimed)
+    assert claimed.status == "queued"
+    assert claimed.run_after > datetime.now(timezone.utc)
+
+    claimed.run_after = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await db_session.commit()
+    claimed = await queue.claim(db_session, "worker-a")
+    assert await queue.fail(db_session, claimed, "second") is False
+    await db_session.refresh(claimed)
+    assert claimed.status == "failed"
+    assert claimed.last_error == "second"
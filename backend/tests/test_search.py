@@ -0,0 +1,117 @@
+import pytest
+from types import SimpleNamespace
+from app.api.endpoints.search import MAX_EF_SEARCH, best_chunk_per_document, ef_search_for
+from app.models.matters import Matter
+from app.models.documents import Document
+from app.services.embeddings import EmbeddingService, StubEmbeddingProvider
+
+def test_best_chunk_per_document():
+    """Test only the closest chunk of each document is kept, in distance order"""
+    rows = [
+        SimpleNamespace(document_id="a", chunk_index=0, distance=0.4),
+        SimpleNamespace(document_id="b", chunk_index=0, distance=0.2),
+        SimpleNamespace(document_id="a", chunk_index=3, distance=0.1),
+        SimpleNamespace(document_id="c", chunk_index=1, distance=0.9),
+    ]
+    best = best_chunk_per_document(rows, limit=2)
+    assert [(row.document_id, row.chunk_index) for row in best] == [("a", 3), ("b", 0)]
+
+def test_ef_search_is_capped():
+    """Test ef_search covers the rows fetched but never exceeds pgvector's limit"""
+    assert ef_search_for(None, 10) == 40
+    assert ef_search_for(200, 80) == 200
+    assert ef_search_for(None, 4400) == MAX_EF_SEARCH
+
+@pytest.mark.asyncio
+async def test_semantic_search_unconfigured(client, monkeypatch):
+    """Test GET /search/semantic returns 503 without an embedding provider"""
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "openai")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    response = await client.get("/search/semantic", params={"q": "lease"})
+    assert response.status_code == 503
+
+@pytest.mark.asyncio
+async def test_semantic_search_ranks_and_filters(client, db_session, monkeypatch):
+    """Test GET /search/semantic ranks documents by similarity and applies pre-filters"""
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "stub")
+    lease_matter = Matter(title="Flat lease", category="lease")
+    invoice_matter = Matter(title="Plumber", category="invoice")
+    db_session.add_all([lease_matter, invoice_matter])
+    await db_session.flush()
+    lease = Document(matter_id=lease_matter.id, title="lease.pdf", content_text="residential lease landlord tenant rent deposit")
+    invoice = Document(matter_id=invoice_matter.id, title="invoice.pdf", content_text="invoice plumbing repair payment due")
+    db_session.add_all([lease, invoice])
+    await db_session.commit()
+    await EmbeddingService(StubEmbeddingProvider()).embed_documents(db_session, [lease.id, invoice.id])
+
+    response = await client.get("/search/semantic", params={"q": "landlord rent", "ef_search": 100})
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0]["document_id"] == str(lease.id)
+    assert results[0]["matter_title"] == "Flat lease"
+    assert results[0]["score"] > results[-1]["score"]
+
+    response = await client.get("/search/semantic", params={"q": "landlord rent", "category": "invoice"})
+    assert [r["document_id"] for r in response.json()] == [str(invoice.id)]
+
+    response = await client.get("/search/semantic", params={"q": "landlord rent", "matter_id": str(lease_matter.id)})
+    assert [r["document_id"] for r in response.json()] == [str(lease.id)]
+
+@pytest.mark.asyncio
+async def test_hybrid_search_keyword_match_highlight_and_pages(client, db_session, monkeypatch):
+    """Test GET /search/hybrid finds exact identifiers, highlights them and paginates"""
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "stub")
+    matter = Matter(title="Car", category="vehicle")
+    db_session.add(matter)
+    await db_session.flush()
+    registration = Document(matter_id=matter.id, title="registration.pdf", content_text="Vehicle registration VIN WVWZZZ1JZXW000001 owner record")
+    insurance = Document(matter_id=matter.id, title="insurance.pdf", content_text="Insurance policy for vehicle owner")
+    db_session.add_all([registration, insurance])
+    await db_session.commit()
+    await EmbeddingService(StubEmbeddingProvider()).embed_documents(db_session, [registration.id, insurance.id])
+
+    response = await client.get("/search/hybrid", params={"q": "WVWZZZ1JZXW000001"})
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0]["document_id"] == str(registration.id)
+    assert results[0]["keyword_rank"] == 1
+    assert "<mark>" in results[0]["highlight"]
+
+    first = (await client.get("/search/hybrid", params={"q": "vehicle owner", "limit": 1})).json()
+    second = (await client.get("/search/hybrid", params={"q": "vehicle owner", "limit": 1, "offset": 1})).json()
+    assert len(first) == len(second) == 1
+    assert first[0]["document_id"] != second[0]["document_id"]
+
+@pytest.mark.asyncio
+async def test_hybrid_search_keyword_only_without_provider(client, db_session, monkeypatch):
+    """Test GET /search/hybrid falls back to full-text ranking without embeddings"""
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "openai")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    matter = Matter(title="Plumber", category="invoice")
+    db_session.add(matter)
+    await db_session.flush()
+    invoice = Document(matter_id=matter.id, title="invoice.pdf", content_text="Invoice No. 2024-0117 total due")
+    db_session.add(invoice)
+    await db_session.commit()
+
+    response = await client.get("/search/hybrid", params={"q": "2024-0117"})
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["document_id"] for r in results] == [str(invoice.id)]
+    assert results[0]["semantic_rank"] is None
+
+@pytest.mark.asyncio
+async def test_hybrid_search_deep_offset(client, db_session, monkeypatch):
+    """Test GET /search/hybrid accepts the deepest allowed page"""
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "stub")
+    matter = Matter(title="Car", category="vehicle")
+    db_session.add(matter)
+    await db_session.flush()
+    document = Document(matter_id=matter.id, title="registration.pdf", content_text="Vehicle registration owner record")
+    db_session.add(document)
+    await db_session.commit()
+    await EmbeddingService(StubEmbeddingProvider()).embed_documents(db_session, [document.id])
+
+    response = await client.get("/search/hybrid", params={"q": "vehicle", "limit": 100, "offset": 1000})
+    assert response.status_code == 200
+    assert response.json() == []
\ No newline at end of file
@@ -1,9 +1,11 @@
 import pytest
+import hashlib
+import re
 import tempfile
 from pathlib import Path
 from io import BytesIO
 from fastapi import UploadFile
-from app.services.storage import LocalStorage
+from app.services.storage import LocalStorage, UploadTooLarge
 
 @pytest.fixture
 def temp_storage():
@@ -31,7 +33,7 @@ async def test_save_file_saves_content(temp_storage):
     relative_path = await temp_storage.save_file(upload_file)
 
     # Check file was saved
-    full_path = temp_storage.base_path / Path(relative_path).name
+    full_path = temp_storage.base_path / relative_path
     assert full_path.exists()
     assert full_path.is_file()
 
@@ -48,10 +50,9 @@ async def test_save_file_returns_relative_path(temp_storage):
 
     relative_path = await temp_storage.save_file(upload_file)
 
-    # Should start with the expected prefix
-    assert relative_path.startswith("byro_data/uploads/")
-    # Should end with .pdf
-    assert relative_path.endswith(".pdf")
+    # Should be relative to the store, sharded by content hash
+    assert not Path(relative_path).is_absolute()
+    assert re.fullmatch(r"[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.pdf", relative_path)
 
 @pytest.mark.asyncio
 async def test_save_file_generates_unique_filename(temp_storage):
@@ -69,8 +70,8 @@ async def test_save_file_generates_unique_filename(temp_storage):
     assert path1 != path2
 
     # Both files should exist
-    full_path1 = temp_storage.base_path / Path(path1).name
-    full_path2 = temp_storage.base_path / Path(path2).name
+    full_path1 = temp_storage.base_path / path1
+    full_path2 = temp_storage.base_path / path2
     assert full_path1.exists()
     assert full_path2.exists()
 
@@ -93,5 +94,64 @@ async def test_save_file_preserves_extension(temp_storage):
         if expected_ext:
             assert relative_path.endswith(expected_ext)
         else:
-            # For files without extension, should still have a UUID
-            assert len(Path(relative_path).stem) == 36  # UUID length
\ No newline at end of file
+            # For files without extension, should still have a content hash
+            assert len(Path(relative_path).stem) == 64  # SHA-256 hex length
+
+@pytest.mark.asyncio
+async def test_save_streams_hash_and_size(temp_storage):
+    """Test save reports size and SHA-256 computed while streaming"""
+    temp_storage.chunk_size = 4
+    content = b"streamed in several chunks"
+    upload_file = UploadFile(filename="test.pdf", file=BytesIO(content))
+
+    stored = await temp_storage.save(upload_file)
+
+    assert stored.size == len(content)
+    assert stored.sha256 == hashlib.sha256(content).hexdigest()
+    assert temp_storage.resolve(stored.filename).read_bytes() == content
+
+@pytest.mark.asyncio
+async def test_save_rejects_oversized_upload_and_cleans_up(temp_storage):
+    """Test uploads over the limit raise UploadTooLarge and leave no partial file"""
+    temp_storage.max_upload_bytes = 10
+    temp_storage.chunk_size = 4
+    upload_file = UploadFile(filename="big.pdf", file=BytesIO(b"x" * 50))
+
+    with pytest.raises(UploadTooLarge):
+        await temp_storage.save(upload_file)
+
+    assert [p for p in temp_storage.base_path.rglob("*") if p.is_file()] == []
+
+@pytest.mark.asyncio
+async def test_save_file_is_content_addressed(temp_storage):
+    """Test files are named by content hash and sharded into subdirectories"""
+    content = b"content addressed"
+    digest = hashlib.sha256(content).hexdigest()
+
+    relative_path = await temp_storage.save_file(UploadFile(filename="Scan.PDF", file=BytesIO(content)))
+
+    assert relative_path == f"{digest[:2]}/{digest[2:4]}/{digest}.pdf"
+    assert temp_storage.resolve(relative_path).read_bytes() == content
+
+@pytest.mark.asyncio
+async def test_save_deduplicates_identical_content(temp_storage):
+    """Test uploading the same content twice links to one blob"""
+    first = await temp_storage.save(UploadFile(filename="a.pdf", file=BytesIO(b"same bytes")))
+    second = await temp_storage.save(UploadFile(filename="b.pdf", file=BytesIO(b"same bytes")))
+
+    assert first.deduplicated is False
+    assert second.deduplicated is True
+    assert first.filename == second.filename
+    assert len([p for p in temp_storage.base_path.rglob("*.pdf")]) == 1
+    assert list(temp_storage.incoming_path.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_delete_removes_blob_and_empty_shards(temp_storage):
+    """Test deleting a blob prunes its now-empty shard directories"""
+    relative_path = await temp_storage.save_file(UploadFile(filename="a.pdf", file=BytesIO(b"bye")))
+
+    await temp_storage.delete(relative_path)
+
+    assert not temp_storage.resolve(relative_path).exists()
+    assert not temp_storage.resolve(relative_path).parent.parent.exists()
+    assert temp_storage.base_path.exists()
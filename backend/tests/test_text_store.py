@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.models.inbox import InboxItem
+from app.models.documents import Document
+from app.services import text_store
+from app.services.text_store import decode_pages, encode_pages, load_pages, save_pages
+from sqlalchemy import select
+
+def test_encode_pages_round_trip_and_compression():
+    """Test small page lists are stored as-is and large ones compressed"""
+    small = ["INVOICE No. 2024-0117", "Total due: EUR 4,250.00"]
+    data, compression = encode_pages(small)
+    assert compression == "none"
+    assert decode_pages(data, compression) == small
+
+    large = [f"Section {n}. The landlord and the tenant agree as follows. " * 50 for n in range(20)]
+    data, compression = encode_pages(large)
+    assert compression == "zlib"
+    assert len(data) < text_store.COMPRESS_MIN_BYTES
+    assert decode_pages(data, compression) == large
+
+def test_decode_pages_rejects_unknown_compression():
+    """Test unknown compression schemes are refused"""
+    with pytest.raises(ValueError):
+        decode_pages(b"[]", "lz4")
+
+@pytest.mark.asyncio
+async def test_save_and_load_pages(db_session):
+    """Test page texts are stored once per content hash and replaced on re-extraction"""
+    content_hash = "a" * 64
+    assert await load_pages(db_session, content_hash) is None
+    await save_pages(db_session, content_hash, ["page one", ""])
+    await save_pages(db_session, content_hash, ["page one", "page two"])
+    await db_session.commit()
+    db_session.expire_all()
+    assert await load_pages(db_session, content_hash) == ["page one", "page two"]
+
+@pytest.mark.asyncio
+async def test_processing_reuses_stored_text(db_session):
+    """Test processing skips PDF extraction when the file's text is already stored"""
+    from app.api.endpoints import inbox
+    content_hash = "b" * 64
+    item = InboxItem(original_filename="lease.pdf", file_path="bb/bb/lease.pdf", content_hash=content_hash)
+    db_session.add(item)
+    await save_pages(db_session, content_hash, ["RESIDENTIAL LEASE AGREEMENT"])
+    await db_session.commit()
+
+    with patch.object(inbox.extraction_service, "extract_pages", AsyncMock()) as extract, \
+         patch.object(inbox.extraction_service, "analyze_with_llm", AsyncMock(return_value={"title": "Lease"})) as analyze:
+        await inbox.process_inbox_item(str(item.id), item.file_path)
+
+    extract.assert_not_called()
+    analyze.assert_awaited_once_with(["RESIDENTIAL LEASE AGREEMENT"], force=False)
+
+@pytest.mark.asyncio
+async def test_document_copies_extracted_text(client, db_session):
+    """Test filing an inbox item copies its extracted text, not the analysis, into the document"""
+    content_hash = "c" * 64
+    item = InboxItem(
+        original_filename="invoice.pdf",
+        file_path="cc/cc/invoice.pdf",
+        content_hash=content_hash,
+        status="review",
+        ai_payload={"title": "Invoice", "category": "invoice"},
+    )
+    db_session.add(item)
+    await save_pages(db_session, content_hash, ["INVOICE No. 2024-0117", "Total due: EUR 4,250.00"])
+    await db_session.commit()
+
+    response = await client.post(
+        "/matters",
+        params={"inbox_item_id": str(item.id)},
+        json={"title": "Plumber", "category": "invoice", "attributes": {}},
+    )
+    assert response.status_code == 200
+
+    document = (await db_session.execute(
+        select(Document).where(Document.matter_id == response.json()["id"])
+    )).scalars().one()
+    assert document.content_text == "INVOICE No. 2024-0117\nTotal due: EUR 4,250.00"
+    assert document.source_hash == content_hash
\ No newline at end of file
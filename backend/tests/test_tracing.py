@@ -0,0 +1,70 @@
+import json
+import uuid
+import pytest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from app.core import metrics
+from app.core.tracing import InMemorySpanExporter, JsonlSpanExporter, Tracer, get_exporter, trace_id_for
+from app.api.endpoints.inbox import stage_timings
+
+def test_spans_nest_under_the_item_trace():
+    """Test child spans share the root's trace id and point at their parent"""
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter)
+    item_id = uuid.uuid4()
+
+    with tracer.span("process_inbox_item", trace_id=trace_id_for(item_id)) as root:
+        with tracer.span("extract", pages=3):
+            pass
+
+    child, parent = exporter.spans
+    assert parent is root and parent.trace_id == item_id.hex
+    assert child.trace_id == parent.trace_id and child.parent_id == parent.span_id
+    assert child.attributes == {"pages": 3}
+    assert child.duration_ms >= 0
+
+def test_failed_span_is_exported_with_error():
+    """Test a span that raises is still exported, marked as an error"""
+    exporter = InMemorySpanExporter()
+    with pytest.raises(ValueError), Tracer(exporter).span("analyze"):
+        raise ValueError("bad json")
+    assert exporter.spans[0].status == "error"
+    assert exporter.spans[0].error == "ValueError: bad json"
+
+def test_observe_stage_traces_the_stage(monkeypatch):
+    """Test pipeline stages are recorded as child spans"""
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(metrics, "tracer", Tracer(exporter))
+    with metrics.tracer.span("upload_file"), metrics.observe_stage("upload"):
+        pass
+    assert [span.name for span in exporter.spans] == ["upload", "upload_file"]
+    assert exporter.spans[0].parent_id == exporter.spans[1].span_id
+
+def test_jsonl_exporter_writes_one_span_per_line(tmp_path):
+    """Test the file exporter appends spans as JSON lines"""
+    path = tmp_path / "traces" / "spans.jsonl"
+    exporter = JsonlSpanExporter(str(path))
+    tracer = Tracer(exporter)
+    with tracer.span("a"), tracer.span("b"):
+        pass
+    exporter.shutdown()
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [span["name"] for span in spans] == ["b", "a"]
+
+def test_get_exporter_by_import_path():
+    """Test exporters can be plugged in by module path"""
+    assert get_exporter("none") is None
+    assert isinstance(get_exporter("app.core.tracing:InMemorySpanExporter"), InMemorySpanExporter)
+    assert get_exporter("no.such.module:Exporter") is None
+
+def test_stage_timings_replace_earlier_runs():
+    """Test a new run keeps the upload time and drops stale stage figures"""
+    item = SimpleNamespace(
+        timings={"upload_ms": 12.5, "extract_ms": 900.0},
+        created_at=datetime.now(timezone.utc) - timedelta(seconds=2),
+    )
+    summary = stage_timings(item, ["page 1", "page 2"], {"analyze_ms": 1500.0})
+    assert summary["upload_ms"] == 12.5
+    assert "extract_ms" not in summary
+    assert summary["pages"] == 2 and summary["analyze_ms"] == 1500.0
+    assert summary["to_review_ms"] >= 2000
\ No newline at end of file
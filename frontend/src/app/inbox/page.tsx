@@ -2,7 +2,7 @@
 
 import { useState, useRef, useEffect } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { getInboxItems, getInboxItem, uploadFile } from '@/lib/api';
+import { getInboxItems, getInboxItem, uploadFile, subscribeToInboxEvents } from '@/lib/api';
 import { InboxItem } from '@/types';
 import { Badge } from '@/components/ui/badge';
 import { Card, CardContent } from '@/components/ui/card';
@@ -22,10 +22,18 @@ export default function InboxPage() {
   const { data: polledItem } = useQuery({
     queryKey: ['inbox-item', selectedItem?.id],
     queryFn: () => selectedItem ? getInboxItem(selectedItem.id) : null,
-    enabled: !!selectedItem && selectedItem.status === 'processing',
-    refetchInterval: 2000,
+    // List items leave out ai_payload, so load the full item once on selection
+    enabled: !!selectedItem && (selectedItem.status === 'processing' || selectedItem.ai_payload === undefined),
   });
 
+  // Status changes are pushed by the server instead of polled
+  useEffect(() => {
+    return subscribeToInboxEvents((event) => {
+      queryClient.invalidateQueries({ queryKey: ['inbox'] });
+      queryClient.invalidateQueries({ queryKey: ['inbox-item', event.item_id] });
+    });
+  }, [queryClient]);
+
   // Update selectedItem when polled item changes
   useEffect(() => {
     if (polledItem) {
@@ -7,11 +7,19 @@ import 'react-pdf/dist/Page/TextLayer.css';
 
 pdfjs.GlobalWorkerOptions.workerSrc = '/pdf.worker.min.js';
 
+// Fetch only the byte ranges of the pages being shown instead of the whole file
+const documentOptions = {
+  disableAutoFetch: true,
+  rangeChunkSize: 256 * 1024,
+};
+
 interface PdfViewerProps {
   url: string;
+  // Low-resolution image of the first page, shown while the document loads
+  placeholderUrl?: string;
 }
 
-export function PdfViewer({ url }: PdfViewerProps) {
+export function PdfViewer({ url, placeholderUrl }: PdfViewerProps) {
   const [numPages, setNumPages] = useState<number>();
   const [pageNumber, setPageNumber] = useState<number>(1);
   const [error, setError] = useState<string | null>(null);
@@ -36,6 +44,8 @@ export function PdfViewer({ url }: PdfViewerProps) {
           file={url}
           onLoadSuccess={onDocumentLoadSuccess}
           onLoadError={onDocumentLoadError}
+          options={documentOptions}
+          loading={placeholderUrl ? <img src={placeholderUrl} alt="" className="w-full blur-[1px]" /> : undefined}
           className="flex-1 overflow-auto"
         >
           <Page pageNumber={pageNumber} />
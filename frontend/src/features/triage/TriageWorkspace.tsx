@@ -8,7 +8,7 @@ import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
-import { createMatter, attachDocument } from '@/lib/api';
+import { createMatter, attachDocument, getPageThumbnailUrl } from '@/lib/api';
 
 const PdfViewer = dynamic(() => import('@/components/ui/pdf-viewer').then(mod => mod.PdfViewer), { ssr: false });
 
@@ -84,7 +84,10 @@ export function TriageWorkspace({ activeItem }: TriageWorkspaceProps) {
     <div className="grid grid-cols-2 h-full">
       {/* Left Panel - Document Viewer */}
       <div className="border-r border-slate-200 dark:border-slate-700 p-6">
-        <PdfViewer url={`http://localhost:8000/static/${activeItem.file_path}`} />
+        <PdfViewer
+          url={`http://localhost:8000/static/${activeItem.file_path}`}
+          placeholderUrl={getPageThumbnailUrl(activeItem.id, 1)}
+        />
       </div>
 
       {/* Right Panel - Extraction Form */}
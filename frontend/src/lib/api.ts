@@ -1,13 +1,40 @@
 import axios from 'axios';
 import { InboxItem } from '../types';
 
+const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+
 const api = axios.create({
-  baseURL: process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000',
+  baseURL: API_URL,
 });
 
-export const getInboxItems = async (): Promise<InboxItem[]> => {
-  const response = await api.get('/inbox');
-  return response.data;
+// Largest page the API serves (MAX_PAGE_SIZE)
+const PAGE_SIZE = 200;
+
+// Collects every page of a keyset-paginated list by following X-Next-Cursor
+const getAllPages = async <T>(path: string): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await api.get(path, { params: { limit: PAGE_SIZE, cursor } });
+    items.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return items;
+};
+
+export const getInboxItems = async (): Promise<InboxItem[]> => getAllPages<InboxItem>('/inbox');
+
+export type InboxEvent = {
+  id: number;
+  item_id: string;
+  status: InboxItem['status'] | 'deleted';
+};
+
+// EventSource reconnects on its own and resumes from the last received event id
+export const subscribeToInboxEvents = (onEvent: (event: InboxEvent) => void): (() => void) => {
+  const source = new EventSource(`${API_URL}/inbox/events`);
+  source.addEventListener('inbox', (message) => onEvent(JSON.parse((message as MessageEvent).data)));
+  return () => source.close();
 };
 
 export const getInboxItem = async (id: string): Promise<InboxItem> => {
@@ -15,6 +42,9 @@ export const getInboxItem = async (id: string): Promise<InboxItem> => {
   return response.data;
 };
 
+export const getPageThumbnailUrl = (id: string, page: number): string =>
+  `${API_URL}/inbox/${id}/pages/${page}/thumbnail`;
+
 export const createMatter = async (data: { title: string; category: string; attributes?: any }, inboxItemId: string) => {
   const response = await api.post(`/matters?inbox_item_id=${inboxItemId}`, data);
   return response.data;
@@ -25,8 +55,20 @@ export const attachDocument = async (matterId: string, inboxItemId: string) => {
   return response.data;
 };
 
-export const getMatters = async () => {
-  const response = await api.get('/matters');
+export type TriageDecision =
+  | { inbox_item_id: string; action: 'create'; matter: { title: string; category: string; attributes?: any } }
+  | { inbox_item_id: string; action: 'attach'; matter_id: string };
+
+// Files many inbox items in one request; each decision is filed or rejected on its own
+export const bulkTriage = async (decisions: TriageDecision[]) => {
+  const response = await api.post('/matters/triage', { decisions });
+  return response.data;
+};
+
+export const getMatters = async () => getAllPages<any>('/matters/');
+
+export const getMatter = async (id: string) => {
+  const response = await api.get(`/matters/${id}`);
   return response.data;
 };
 
@@ -3,6 +3,7 @@ export type InboxItem = {
   status: 'processing' | 'review' | 'done' | 'error';
   original_filename: string;
   file_path: string;
-  ai_payload: any;
+  // Only present on the single-item endpoint
+  ai_payload?: any;
   created_at: string;
 };
\ No newline at end of file